@@ -0,0 +1,120 @@
+import random
+
+from quilldelta import Delta
+
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+         'eiusmod tempor incididunt ut labore et dolore magna aliqua ut enim '
+         'ad minim veniam quis nostrud exercitation ullamco laboris nisi ut '
+         'aliquip ex ea commodo consequat').split()
+
+INLINE_FORMATS = (
+    {'bold': True},
+    {'italic': True},
+    {'bold': True, 'italic': True},
+    {'underline': True},
+    {'link': 'https://quilljs.com'},
+    {'color': '#e60000'},
+    {'code': True},
+)
+
+BLOCK_FORMATS = (
+    {'header': 1},
+    {'header': 2},
+    {'list': 'bullet'},
+    {'list': 'ordered'},
+    {'blockquote': True},
+    {'code-block': True},
+)
+
+
+def sentence(rnd: random.Random, words: int = None):
+    words = words or rnd.randint(6, 18)
+    text = ' '.join(rnd.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '. '
+
+
+def prose(paragraphs: int = 200, seed: int = 0):
+    rnd = random.Random(seed)
+    delta = Delta()
+
+    for _ in range(paragraphs):
+        delta.insert(''.join(sentence(rnd) for _ in range(rnd.randint(3, 8))))
+        delta.insert('\n')
+
+    return delta
+
+
+def formatted(paragraphs: int = 200, seed: int = 0):
+    rnd = random.Random(seed)
+    delta = Delta()
+
+    for _ in range(paragraphs):
+        for _ in range(rnd.randint(4, 12)):
+            text = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 5)))
+
+            if rnd.random() < 0.4:
+                delta.insert(text, rnd.choice(INLINE_FORMATS))
+            else:
+                delta.insert(text)
+
+            delta.insert(' ')
+
+        if rnd.random() < 0.3:
+            delta.insert('\n', rnd.choice(BLOCK_FORMATS))
+        else:
+            delta.insert('\n')
+
+    return delta
+
+
+def embeds(rows: int = 100, columns: int = 4, seed: int = 0):
+    rnd = random.Random(seed)
+    delta = Delta()
+
+    for row in range(rows):
+        for _ in range(columns):
+            delta.insert(' '.join(rnd.choice(WORDS) for _ in range(3)))
+            delta.insert('\n', {'table': f'row-{row}'})
+
+        if row % 10 == 0:
+            delta.insert({'image': f'https://example.com/{row}.png'},
+                         {'alt': rnd.choice(WORDS)})
+            delta.insert('\n')
+
+    return delta
+
+
+def typing_session(document: Delta, keystrokes: int = 1000, seed: int = 0):
+    rnd = random.Random(seed)
+    length = document.length()
+    cursor = rnd.randint(0, length)
+    changes = []
+
+    for _ in range(keystrokes):
+        if rnd.random() < 0.05:
+            cursor = rnd.randint(0, length)
+
+        if rnd.random() < 0.1 and cursor > 0:
+            cursor -= 1
+            length -= 1
+            changes.append(Delta().retain(cursor).delete(1))
+        else:
+            changes.append(Delta().retain(cursor).insert(rnd.choice(WORDS)[0]))
+            cursor += 1
+            length += 1
+
+    return changes
+
+
+def large_paste(document: Delta, size: int = 100_000, seed: int = 0):
+    rnd = random.Random(seed)
+    text = []
+    total = 0
+
+    while total < size:
+        chunk = ''.join(sentence(rnd) for _ in range(rnd.randint(3, 8))) + '\n'
+        text.append(chunk)
+        total += len(chunk)
+
+    position = rnd.randint(0, document.length())
+    return Delta().retain(position).insert(''.join(text))
@@ -0,0 +1,469 @@
+#!/usr/bin/env python
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+root = Path(__file__).resolve().parent
+sys.path.insert(0, str(root.parent))
+sys.path.insert(0, str(root))
+
+import generators  # noqa: E402
+from quilldelta import Delta, LazyDelta  # noqa: E402
+from quilldelta import embeds, revlog  # noqa: E402
+from quilldelta.coalescer import DeltaCoalescer  # noqa: E402
+from quilldelta.ranges import RangeSet  # noqa: E402
+from quilldelta.render import HtmlRenderer, MarkdownRenderer  # noqa: E402
+
+CASES = {}
+
+# Cases timed again at growing sizes, with the function building one run
+# of the given size. Their time per item must stay about the same.
+LINEAR = {}
+MAX_GROWTH = 2.0
+
+
+def case(name):
+    def decorator(func):
+        CASES[name] = func
+        return func
+
+    return decorator
+
+
+@contextmanager
+def embed_handler(embed_type: str, handler):
+    # Cases register their handlers only while they run
+    previous = embeds.HANDLERS.get(embed_type)
+    embeds.register_embed(embed_type, handler)
+
+    try:
+        yield
+    finally:
+        if previous is None:
+            embeds.unregister_embed(embed_type)
+        else:
+            embeds.register_embed(embed_type, previous)
+
+
+def build_push(size: int):
+    delta = Delta()
+    bold = {'bold': True}
+
+    # Alternating attributes keep push from merging consecutive inserts
+    for i in range(size):
+        delta.insert('x', bold if i % 2 else None)
+
+    return delta
+
+
+@case('construction.push')
+def construction_push(scale):
+    size = 100_000 * scale // 10
+    return lambda: build_push(size)
+
+
+LINEAR['construction.push'] = build_push
+
+
+@case('construction.load_dicts')
+def construction_load_dicts(scale):
+    data = generators.formatted(50 * scale).as_data()
+    return lambda: Delta(json.loads(json.dumps(data)))
+
+
+@case('construction.validate')
+def construction_validate(scale):
+    data = generators.formatted(50 * scale).as_data()
+    return lambda: Delta.validate_and_normalize(
+        json.loads(json.dumps(data)))
+
+
+@case('construction.lazy_forward')
+def construction_lazy_forward(scale):
+    raw = generators.formatted(50 * scale).as_json().encode()
+
+    def run():
+        delta = LazyDelta(raw)
+        delta.length()
+        delta[:20]
+        delta.as_bytes()
+
+    return run
+
+
+@case('compose.typing_session')
+def compose_typing_session(scale):
+    document = generators.prose(20 * scale)
+    changes = generators.typing_session(document, 20 * scale)
+
+    def run():
+        for change in changes:
+            document.compose(change)
+
+    return run
+
+
+@case('compose.chain')
+def compose_chain(scale):
+    document = generators.prose(20 * scale)
+    changes = generators.typing_session(document, 20 * scale)
+
+    def run():
+        result = changes[0]
+        for change in changes[1:]:
+            result = result.compose(change)
+
+    return run
+
+
+@case('compose.large_paste')
+def compose_large_paste(scale):
+    document = generators.prose(20 * scale)
+    paste = generators.large_paste(document, 10_000 * scale)
+    return lambda: document.compose(paste)
+
+
+@case('compose.split_paste')
+def compose_split_paste(scale):
+    document = Delta().insert(generators.large_paste(Delta(), 50_000 * scale)
+                              .ops[-1].value)
+    length = document.length()
+    change = Delta()
+
+    for index in range(0, length - 20, length // 200):
+        change.retain(10, {'bold': True}).delete(length // 200 - 10)
+
+    return lambda: document.compose(change)
+
+
+@case('compose.embed_edits')
+def compose_embed_edits(scale):
+    handler = embeds.DeltaEmbedHandler()
+    cells = generators.prose(5 * scale)
+    document = Delta().insert('Title\n').insert({'table': cells.as_data()})
+    length = cells.length()
+    changes = [
+        Delta().retain(6).retain({'table': Delta()
+                                  .retain(index * length // 200)
+                                  .insert('x').as_data()})
+        for index in range(200)
+    ]
+
+    def run():
+        with embed_handler('table', handler):
+            result = document
+            for change in changes:
+                result = result.compose(change)
+
+    return run
+
+
+@case('transform.positions')
+def transform_positions(scale):
+    document = generators.prose(20 * scale)
+    change = generators.typing_session(document, 200 * scale)[-1].compose(
+        generators.large_paste(document, 1000))
+    positions = sorted(random.Random(0).randrange(document.length())
+                       for _ in range(1000 * scale))
+    return lambda: change.transform_positions(positions)
+
+
+@case('ranges.typing_session')
+def ranges_typing_session(scale):
+    document = generators.prose(20 * scale)
+    changes = generators.typing_session(document, 20 * scale)
+    rnd = random.Random(0)
+    spans = [(start, start + rnd.randint(0, 50)) for start in sorted(
+        rnd.randrange(document.length() - 50) for _ in range(1000 * scale))]
+
+    def run():
+        ranges = RangeSet()
+
+        for start, end in spans:
+            ranges.add(start, end)
+
+        for change in changes:
+            ranges.apply(change)
+
+    return run
+
+
+@case('broadcast.coalesced')
+def broadcast_coalesced(scale):
+    document = generators.prose(20 * scale)
+    changes = generators.typing_session(document, 20 * scale)
+    subscribers = [lambda document, payload: None] * 50
+
+    def run():
+        coalescer = DeltaCoalescer(max_delay=None, max_changes=10)
+
+        for subscriber in subscribers:
+            coalescer.subscribe('doc', subscriber)
+
+        for change in changes:
+            coalescer.add('doc', change)
+
+        coalescer.flush()
+
+    return run
+
+
+@case('slice.middle')
+def slice_middle(scale):
+    document = generators.formatted(50 * scale)
+    length = document.length()
+    return lambda: document.slice(length // 3, 2 * length // 3)
+
+
+@case('slice.mmap')
+def slice_mmap(scale):
+    document = generators.formatted(50 * scale)
+    length = document.length()
+    directory = tempfile.TemporaryDirectory()
+    path = str(Path(directory.name) / 'document.qd')
+    document.write_mmap(path)
+
+    def run():
+        with Delta.open_mmap(path) as stored:
+            stored.slice(length // 3, length // 3 + 500)
+            stored.line(stored.line_count() // 2)
+
+    run.directory = directory
+    return run
+
+
+@case('each_line.formatted')
+def each_line_formatted(scale):
+    document = generators.formatted(50 * scale)
+    return lambda: document.each_line(lambda line, attributes, index: None)
+
+
+@case('text.find')
+def text_find(scale):
+    document = generators.formatted(50 * scale)
+
+    # A fresh copy per run, so find() builds the text projection again
+    # without the document growing between runs.
+    def run():
+        edited = document.copy()
+        edited.insert('x')
+        edited.find('lorem')
+
+    return run
+
+
+@case('render.html')
+def render_html(scale):
+    document = generators.formatted(50 * scale)
+    return lambda: HtmlRenderer().render(document)
+
+
+@case('render.markdown')
+def render_markdown(scale):
+    document = generators.formatted(50 * scale)
+    return lambda: MarkdownRenderer().render(document)
+
+
+@case('render.markdown_incremental')
+def render_markdown_incremental(scale):
+    document = generators.formatted(50 * scale)
+    middle = document.length() // 2
+    insert = Delta().retain(middle).insert('edited ')
+    delete = Delta().retain(middle).delete(7)
+    tracked = MarkdownRenderer().track(document)
+
+    def run():
+        tracked.apply(insert)
+        tracked.apply(delete)
+        return tracked.getvalue()
+
+    return run
+
+
+@case('serialize.revlog')
+def serialize_revlog(scale):
+    document = generators.prose(20 * scale)
+    changes = generators.typing_session(document, 20 * scale)
+    return lambda: revlog.decode(revlog.encode(changes))
+
+
+@case('serialize.as_json')
+def serialize_as_json(scale):
+    document = generators.formatted(50 * scale)
+    return document.as_json
+
+
+@case('serialize.embeds_as_json')
+def serialize_embeds_as_json(scale):
+    document = generators.embeds(25 * scale)
+    return document.as_json
+
+
+def measure(func, repeat: int, min_time: float):
+    loops = 1
+
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    timings = [elapsed / loops]
+
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+
+    tracemalloc.start()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'loops': loops,
+        'min': min(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'peak_bytes': peak,
+    }
+
+
+def growth(build, size: int, repeat: int = 3) -> float:
+    timings = []
+
+    for count in (size // 8, size // 4, size // 2, size):
+        best = None
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(count)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        timings.append((count, best))
+
+    # Time per item at the largest size over the smallest, 1.0 is linear
+    (small, small_time), (large, large_time) = timings[0], timings[-1]
+    return (large_time / small_time) / (large / small)
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base: dict, results: dict, threshold: float):
+    print(f'\n{"case":<32} {"base":>10} {"current":>10} {"ratio":>7}')
+
+    for name, result in results.items():
+        previous = base.get('results', {}).get(name)
+
+        if not previous or 'min' not in previous or 'min' not in result:
+            continue
+
+        ratio = result['min'] / previous['min']
+        flag = '  slower' if ratio > threshold else ''
+        print(f'{name:<32} {previous["min"] * 1000:9.3f}ms '
+              f'{result["min"] * 1000:9.3f}ms {ratio:6.2f}x{flag}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run quilldelta benchmarks')
+    parser.add_argument('-k', '--filter', default='*',
+                        help='glob pattern of case names to run')
+    parser.add_argument('-s', '--scale', type=int, default=10,
+                        help='document size multiplier')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='minimum seconds per timing sample')
+    parser.add_argument('--quick', action='store_true',
+                        help='small documents and short samples')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='JSON file for the results')
+    parser.add_argument('--compare', type=Path,
+                        help='JSON results of a previous run')
+    parser.add_argument('--threshold', type=float, default=1.1)
+    parser.add_argument('--max-growth', type=float, default=MAX_GROWTH,
+                        help='largest growth vs linear for linear cases')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.scale, args.repeat, args.min_time = 1, 3, 0.01
+
+    results = {}
+    failures = []
+
+    for name, factory in CASES.items():
+        if not fnmatch.fnmatch(name, args.filter):
+            continue
+
+        try:
+            result = measure(factory(args.scale), args.repeat, args.min_time)
+        except Exception as error:
+            results[name] = {'error': f'{type(error).__name__}: {error}'}
+            print(f'{name:<32} error: {results[name]["error"]}')
+            continue
+
+        results[name] = result
+        print(f'{name:<32} {result["min"] * 1000:9.3f}ms '
+              f'± {result["stdev"] * 1000:7.3f}ms '
+              f'peak {result["peak_bytes"] / 1024:9.1f}KiB')
+
+        if name in LINEAR:
+            size = 100_000 * args.scale // 10
+            result['growth'] = growth(LINEAR[name], size)
+            print(f'{"":<32} growth vs linear {result["growth"]:.2f}x')
+
+            if result['growth'] > args.max_growth:
+                failures.append(name)
+
+    report = {
+        'meta': {
+            'commit': commit(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'scale': args.scale,
+        },
+        'results': results,
+    }
+
+    name = report['meta']['commit'] or 'latest'
+    output = args.output or root / 'results' / f'{name}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, sort_keys=True))
+    print(f'\nResults written to {output}')
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), results, args.threshold)
+
+    if failures:
+        print(f'\nNot linear: {", ".join(failures)}')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+from importlib.util import find_spec
+
+import pytest
+from run import CASES, MAX_GROWTH, build_push, growth
+
+from quilldelta.embeds import HANDLERS
+
+needs_plugin = pytest.mark.skipif(find_spec('pytest_benchmark') is None,
+                                  reason='pytest-benchmark is not installed')
+
+
+@needs_plugin
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_benchmark(benchmark, name):
+    benchmark(CASES[name](1))
+
+
+def test_construction_is_linear():
+    assert growth(build_push, 100_000) < MAX_GROWTH
+
+
+def test_setup_has_no_side_effects():
+    handlers = dict(HANDLERS)
+
+    for name in sorted(CASES):
+        CASES[name](1)
+
+    assert HANDLERS == handlers
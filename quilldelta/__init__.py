@@ -1 +1,2 @@
-from .delta import Delete, Delta, Insert, Retain
+from .delta import Delete, Delta, FrozenDelta, Insert, Retain
+from .lazy import LazyDelta
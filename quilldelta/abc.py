@@ -1,6 +1,6 @@
 import asyncio
 from abc import ABC, abstractmethod
-from collections import Sized
+from collections.abc import Sized
 
 
 class SequenceReader(Sized, ABC):
@@ -112,3 +112,23 @@ class SequenceReader(Sized, ABC):
     @abstractmethod
     def readitem(self):
         pass
+
+
+class EmbedHandler(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def compose(self, a, b, keep_null: bool):
+        pass
+
+    @abstractmethod
+    def transform(self, a, b, priority: bool):
+        pass
+
+    @abstractmethod
+    def invert(self, a, base):
+        pass
+
+    def validate(self, value):
+        # Raises ValueError when value can not be composed or transformed
+        pass
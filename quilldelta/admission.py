@@ -0,0 +1,110 @@
+from collections import namedtuple
+from typing import Iterable
+
+from .types import is_delete, is_insert
+from .validation import normalize
+
+__all__ = ['DeltaCost', 'AdmissionError', 'AdmissionPolicy',
+           'ACCEPT', 'REJECT', 'DEFER', 'COALESCE']
+
+ACCEPT, REJECT, DEFER, COALESCE = 'accept', 'reject', 'defer', 'coalesce'
+
+DeltaCost = namedtuple('DeltaCost', 'ops, inserted, attributes, span, work')
+
+
+def measure_cost(ops: Iterable, document_length: int = None) -> DeltaCost:
+    count = inserted = attributes = span = 0
+
+    for op in ops:
+        count += 1
+
+        if is_insert(op):
+            inserted += len(op.value) if isinstance(op.value, str) else 1
+        else:
+            span += op.length
+
+        if not is_delete(op) and op.attributes:
+            attributes += len(op.attributes)
+
+    # Compose walks the document op by op up to the end of the span and
+    # copies the rest in bulk, so the span bounds the document side.
+    if document_length is not None:
+        span = min(span, document_length)
+
+    return DeltaCost(count, inserted, attributes, span,
+                     count + attributes + span)
+
+
+class AdmissionError(ValueError):
+    def __init__(self, cost: DeltaCost, limit: str):
+        super().__init__(f'Delta rejected, {limit} above the limit: {cost}')
+        self.cost = cost
+        self.limit = limit
+
+
+class AdmissionPolicy:
+    def __init__(self, max_ops: int = None, max_inserted: int = None,
+                 max_attributes: int = None, max_work: int = None,
+                 action: str = REJECT, executor=None):
+        if action not in (REJECT, DEFER, COALESCE):
+            raise ValueError(f'Invalid action {action!r}')
+
+        if action == DEFER and executor is None:
+            raise ValueError('Deferring requires an executor')
+
+        self.max_ops = max_ops
+        self.max_inserted = max_inserted
+        self.max_attributes = max_attributes
+        self.max_work = max_work
+        self.action = action
+        self.executor = executor
+
+    def exceeded(self, cost: DeltaCost):
+        for limit, value in (('ops', cost.ops),
+                             ('inserted', cost.inserted),
+                             ('attributes', cost.attributes),
+                             ('work', cost.work)):
+            maximum = getattr(self, f'max_{limit}')
+
+            if maximum is not None and value > maximum:
+                return limit
+
+        return None
+
+    def evaluate(self, delta, document_length: int = None):
+        cost = delta.cost(document_length)
+
+        if self.exceeded(cost) is None:
+            return ACCEPT, cost
+
+        return self.action, cost
+
+    def admit(self, delta, document_length: int = None):
+        action, cost = self.evaluate(delta, document_length)
+
+        if action == COALESCE:
+            delta = coalesce(delta)
+            cost = delta.cost(document_length)
+            action = ACCEPT if self.exceeded(cost) is None else REJECT
+
+        if action == REJECT:
+            raise AdmissionError(cost, self.exceeded(cost))
+
+        return action, delta
+
+    def apply(self, document, delta, document_length: int = None):
+        if document_length is None:
+            document_length = document.length()
+
+        action, delta = self.admit(delta, document_length)
+
+        if action == DEFER:
+            return self.executor.submit(document.compose, delta)
+
+        return document.compose(delta)
+
+
+def coalesce(delta):
+    from .delta import Delta
+
+    return Delta(normalize(delta.ops)).chop()
@@ -0,0 +1,125 @@
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+from .unicode import get_length_unit
+
+__all__ = ['ComposeCache']
+
+CacheEntry = namedtuple('CacheEntry', 'delta, operands, ops, bytes')
+
+
+def json_size(ops) -> int:
+    return len(json.dumps([op.as_data() for op in ops]))
+
+
+class ComposeCache:
+    def __init__(self, max_ops: int = 1_000_000, max_bytes: int = None):
+        assert max_ops is None or max_ops > 0, f'Invalid max_ops {max_ops}'
+        assert max_bytes is None or max_bytes > 0, \
+            f'Invalid max_bytes {max_bytes}'
+
+        self.max_ops = max_ops
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_ops = 0
+        self.total_bytes = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(self.key(*key))
+        return entry is not None and self._matches(entry, *key)
+
+    @staticmethod
+    def key(this, other):
+        # Composing splits text by length, which depends on the unit
+        return hash(this.ops), len(this.ops), hash(other.ops), \
+            len(other.ops), get_length_unit()
+
+    @staticmethod
+    def _matches(entry: CacheEntry, this, other):
+        # Content hashes can collide, a hit must hold the same operands
+        this_ops, other_ops = entry.operands
+        return this_ops == this.ops and other_ops == other.ops
+
+    def compose(self, this, other):
+        key = self.key(this, other)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and self._matches(entry, this, other):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.delta.copy()
+
+            self.misses += 1
+
+        result = this.compose(other)
+        self.put(key, result, (this.ops.copy(), other.ops.copy()))
+
+        return result.copy()
+
+    def put(self, key, delta, operands):
+        # The operands are kept to tell collisions apart, so they count
+        # towards the limits as much as the result does
+        ops = len(delta.ops) + sum(len(item) for item in operands)
+        size = 0
+
+        if self.max_bytes is not None:
+            size = json_size(delta.ops) + sum(json_size(item)
+                                              for item in operands)
+
+        entry = CacheEntry(delta, operands, ops, size)
+
+        if self.max_ops is not None and entry.ops > self.max_ops:
+            return
+        if self.max_bytes is not None and entry.bytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+
+            if previous is not None:
+                self.total_ops -= previous.ops
+                self.total_bytes -= previous.bytes
+
+            self._entries[key] = entry
+            self.total_ops += entry.ops
+            self.total_bytes += entry.bytes
+
+            while self.overflow():
+                key, evicted = self._entries.popitem(last=False)
+                self.total_ops -= evicted.ops
+                self.total_bytes -= evicted.bytes
+                self.evictions += 1
+
+    def overflow(self):
+        if self.max_ops is not None and self.total_ops > self.max_ops:
+            return True
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            return True
+        return False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_ops = self.total_bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'ops': self.total_ops,
+            'bytes': self.total_bytes,
+        }
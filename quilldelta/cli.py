@@ -0,0 +1,315 @@
+import argparse
+import json
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from . import utils as _
+from .delta import Delta
+from .revlog import RevisionLogReader
+from .storage import MmapDelta, write_mmap
+from .validation import Limits
+
+__all__ = ['main']
+
+SUFFIXES = {
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.qd': 'mmap',
+    '.qdrl': 'revlog',
+}
+
+Item = Tuple[str, str, str, str]
+
+
+def iter_lines(name: str, stem: str, stream) -> Iterator[Item]:
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            yield f'{name}:{number}', f'{stem}-{number}', 'json', line
+
+
+def iter_inputs(paths) -> Iterator[Item]:
+    # Items are (name, stem, kind, data), where data is the JSON text or
+    # the path of a binary file, so they are cheap to send to workers.
+    for path in paths:
+        if path == '-':
+            yield from iter_lines('<stdin>', 'stdin', sys.stdin)
+            continue
+
+        path = Path(path)
+
+        # Files found in a directory keep their path below it as the stem,
+        # so outputs mirror the input tree.
+        if path.is_dir():
+            files = sorted(child for child in path.rglob('*')
+                           if child.suffix in SUFFIXES and child.is_file())
+            stems = [file.relative_to(path).with_suffix('').as_posix()
+                     for file in files]
+        else:
+            files = [path]
+            stems = [path.stem]
+
+        for file, stem in zip(files, stems):
+            kind = SUFFIXES.get(file.suffix, 'json')
+
+            if kind == 'jsonl':
+                with file.open() as stream:
+                    yield from iter_lines(str(file), stem, stream)
+            elif kind == 'json':
+                yield str(file), stem, kind, file.read_text()
+            else:
+                yield str(file), stem, kind, str(file)
+
+
+def claim_outputs(items: Iterator[Item]) -> Iterator[Item]:
+    # Separate inputs can still share a stem, the later ones fail instead
+    # of overwriting the first output.
+    claimed = {}
+
+    for name, stem, kind, data in items:
+        if stem in claimed:
+            yield name, stem, 'collision', claimed[stem]
+        else:
+            claimed[stem] = name
+            yield name, stem, kind, data
+
+
+def load_document(kind: str, data: str) -> Delta:
+    if kind == 'mmap':
+        with MmapDelta(data) as stored:
+            return stored.to_delta()
+    elif kind == 'revlog':
+        with open(data, 'rb') as stream:
+            return RevisionLogReader(stream).replay()
+
+    return Delta(json.loads(data))
+
+
+def compose(kind: str, data: str, options: dict):
+    if kind == 'json':
+        document = Delta()
+
+        for change in json.loads(data):
+            document = document.compose(Delta(change))
+    else:
+        document = load_document(kind, data)
+
+    return {'document': document.as_data()}, document.as_json()
+
+
+def render(kind: str, data: str, options: dict):
+    document = load_document(kind, data)
+    output_format = options['format']
+
+    if output_format == 'html':
+        output = document.as_html()
+    elif output_format == 'markdown':
+        output = document.as_markdown()
+    else:
+        output = document.as_text()
+
+    return {'output': output}, output
+
+
+def validate(kind: str, data: str, options: dict):
+    if kind == 'json':
+        delta = Delta.validate_and_normalize(json.loads(data),
+                                             options['limits'])
+    else:
+        delta = load_document(kind, data)
+
+    return {'valid': True, 'ops': len(delta.ops)}, None
+
+
+def stats(kind: str, data: str, options: dict):
+    document = load_document(kind, data)
+    cost = document.cost()
+
+    return {
+        'ops': len(document.ops),
+        'length': document.length(),
+        'lines': document.as_text().count('\n'),
+        'cost': cost._asdict(),
+    }, None
+
+
+def convert(kind: str, data: str, options: dict):
+    document = load_document(kind, data)
+
+    if options['to'] == 'json':
+        return {'document': document.as_data()}, document.as_json()
+
+    return {}, document
+
+
+COMMANDS = {
+    'compose': (compose, '.json'),
+    'render': (render, None),
+    'validate': (validate, None),
+    'stats': (stats, None),
+    'convert': (convert, None),
+}
+
+# Commands writing a file per input with --output-dir
+OUTPUTS = {'compose', 'render', 'convert'}
+
+EXTENSIONS = {
+    'html': '.html',
+    'markdown': '.md',
+    'text': '.txt',
+    'json': '.json',
+    'binary': '.qd',
+}
+
+
+def run_item(command: str, options: dict, item: Item):
+    name, stem, kind, data = item
+    func, extension = COMMANDS[command]
+    result = {'name': name}
+
+    try:
+        if kind == 'collision':
+            raise FileExistsError(f'Output {stem} is already written for '
+                                  f'{data}')
+        record, output = func(kind, data, options)
+    except (ValueError, TypeError, KeyError, AssertionError,
+            OSError) as error:
+        result['error'] = f'{type(error).__name__}: {error}'
+        return result, item_size(kind, data)
+
+    output_dir = options['output_dir']
+
+    if output_dir is not None and output is not None:
+        extension = extension or EXTENSIONS[
+            options.get('format') or options.get('to')]
+        path = Path(output_dir) / f'{stem}{extension}'
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(output, Delta):
+            write_mmap(output, str(path))
+        else:
+            path.write_text(output)
+
+        record = {'path': str(path)}
+
+    result.update(record)
+    return result, item_size(kind, data)
+
+
+def item_size(kind: str, data: str) -> int:
+    if kind == 'json':
+        return len(data)
+
+    try:
+        return Path(data).stat().st_size
+    except OSError:
+        return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m quilldelta',
+        description='Process quill deltas in bulk')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes, 1 runs inline '
+                             '(default: one per core)')
+    parser.add_argument('--chunksize', type=int, default=16)
+    parser.add_argument('-o', '--output', type=argparse.FileType('w'),
+                        default=sys.stdout,
+                        help='JSON lines report (default: stdout)')
+    parser.add_argument('-d', '--output-dir', type=Path,
+                        help='write one output file per input')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not report throughput')
+
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    command = commands.add_parser(
+        'compose', help='compose revision logs or lists of changes')
+    command.add_argument('inputs', nargs='+')
+
+    command = commands.add_parser('render', help='render documents')
+    command.add_argument('inputs', nargs='+')
+    command.add_argument('-f', '--format', default='html',
+                         choices=('html', 'markdown', 'text'))
+
+    command = commands.add_parser('validate', help='validate deltas')
+    command.add_argument('inputs', nargs='+')
+    command.add_argument('--max-ops', type=int, default=None)
+    command.add_argument('--max-text', type=int, default=None)
+    command.add_argument('--max-length', type=int, default=None)
+    command.add_argument('--max-embed-size', type=int, default=None)
+    command.add_argument('--allowed-attributes', default=None,
+                         help='comma separated attribute names')
+
+    command = commands.add_parser('stats', help='document statistics')
+    command.add_argument('inputs', nargs='+')
+
+    command = commands.add_parser('convert',
+                                  help='convert between json and binary')
+    command.add_argument('inputs', nargs='+')
+    command.add_argument('-t', '--to', default='json',
+                         choices=('json', 'binary'))
+
+    return parser
+
+
+def command_options(args) -> dict:
+    options = {
+        'output_dir': str(args.output_dir) if args.output_dir else None,
+        'format': getattr(args, 'format', None),
+        'to': getattr(args, 'to', None),
+        'limits': None,
+    }
+
+    if args.command == 'validate':
+        limits = {'max_ops': args.max_ops, 'max_text': args.max_text,
+                  'max_length': args.max_length,
+                  'max_embed_size': args.max_embed_size}
+        options['limits'] = Limits(
+            allowed_attributes=args.allowed_attributes.split(',')
+            if args.allowed_attributes else None,
+            **{key: value for key, value in limits.items()
+               if value is not None})
+
+    return options
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'convert' and args.to == 'binary' and \
+            args.output_dir is None:
+        raise SystemExit('Binary output needs --output-dir')
+
+    if args.output_dir is not None:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    worker = partial(run_item, args.command, command_options(args))
+    inputs = iter_inputs(args.inputs)
+    items = errors = size = 0
+    start = time.perf_counter()
+
+    if args.output_dir is not None and args.command in OUTPUTS:
+        inputs = claim_outputs(inputs)
+
+    for result, item_size in _.process_map(worker, inputs, args.jobs,
+                                           args.chunksize):
+        items += 1
+        size += item_size
+        errors += 'error' in result
+        args.output.write(json.dumps(result) + '\n')
+
+    args.output.flush()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        sys.stderr.write(
+            f'{items} items, {errors} errors in {elapsed:.2f}s '
+            f'({items / elapsed if elapsed else 0:.1f} items/s, '
+            f'{size / elapsed / 1e6 if elapsed else 0:.2f} MB/s)\n')
+
+    return 1 if errors else 0
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable
+
+__all__ = ['DeltaCoalescer']
+
+Subscriber = Callable[[Hashable, bytes], Any]
+
+
+class Pending:
+    __slots__ = ('delta', 'changes', 'ops', 'since')
+
+    def __init__(self, delta, since: float):
+        self.delta = delta
+        self.changes = 1
+        self.ops = len(delta.ops)
+        self.since = since
+
+
+class Channel:
+    # Changes of one document are composed and delivered under its own
+    # lock, so batches reach subscribers in order and documents do not
+    # wait on each other.
+    __slots__ = ('lock', 'pending', 'closed')
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.pending = None
+        self.closed = False
+
+
+class DeltaCoalescer:
+    def __init__(self, max_delay: float = 0.05, max_changes: int = 100,
+                 max_ops: int = None, clock: Callable[[], float] = None):
+        assert max_delay is None or max_delay >= 0, \
+            f'Invalid max_delay {max_delay}'
+        assert max_changes is None or max_changes > 0, \
+            f'Invalid max_changes {max_changes}'
+
+        self.max_delay = max_delay
+        self.max_changes = max_changes
+        self.max_ops = max_ops
+        self.clock = clock or time.monotonic
+
+        self.changes = 0
+        self.broadcasts = 0
+        self.ops_in = 0
+        self.ops_out = 0
+        self.bytes_out = 0
+        self.deliveries = 0
+
+        self._channels = {}
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(1 for channel in list(self._channels.values())
+                   if channel.pending is not None)
+
+    def subscribe(self, document: Hashable, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers[document].append(subscriber)
+
+    def unsubscribe(self, document: Hashable, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(document)
+
+            if subscribers and subscriber in subscribers:
+                subscribers.remove(subscriber)
+
+                if not subscribers:
+                    del self._subscribers[document]
+
+    def _channel(self, document: Hashable) -> Channel:
+        with self._lock:
+            channel = self._channels.get(document)
+
+            if channel is None:
+                channel = self._channels[document] = Channel()
+
+            return channel
+
+    def _close(self, document: Hashable, channel: Channel):
+        # Called with the channel lock held once its batch is delivered
+        with self._lock:
+            if self._channels.get(document) is channel:
+                del self._channels[document]
+
+        channel.closed = True
+
+    def add(self, document: Hashable, change):
+        now = self.clock()
+
+        with self._lock:
+            self.changes += 1
+            self.ops_in += len(change.ops)
+
+        while True:
+            channel = self._channel(document)
+
+            with channel.lock:
+                # Raced with a flush that retired this channel
+                if channel.closed:
+                    continue
+
+                pending = channel.pending
+
+                if pending is None:
+                    pending = channel.pending = Pending(change, now)
+                else:
+                    pending.delta = pending.delta.compose(change)
+                    pending.changes += 1
+                    pending.ops += len(change.ops)
+
+                if not self._full(pending, now):
+                    return None
+
+                return self._broadcast(document, channel)
+
+    def _full(self, pending: Pending, now: float):
+        if self.max_changes is not None and \
+                pending.changes >= self.max_changes:
+            return True
+        if self.max_ops is not None and pending.ops >= self.max_ops:
+            return True
+        if self.max_delay is not None and now - pending.since >= \
+                self.max_delay:
+            return True
+        return False
+
+    def flush(self, document: Hashable = None) -> Dict[Hashable, bytes]:
+        with self._lock:
+            if document is None:
+                channels = list(self._channels.items())
+            elif document in self._channels:
+                channels = [(document, self._channels[document])]
+            else:
+                channels = []
+
+        return self._flush(channels, None)
+
+    def flush_expired(self) -> Dict[Hashable, bytes]:
+        now = self.clock()
+
+        with self._lock:
+            channels = list(self._channels.items())
+
+        return self._flush(channels, now)
+
+    def _flush(self, channels, now: float = None) -> Dict[Hashable, bytes]:
+        flushed = {}
+
+        for document, channel in channels:
+            with channel.lock:
+                pending = channel.pending
+
+                if pending is None or channel.closed:
+                    continue
+                if now is not None and not self._full(pending, now):
+                    continue
+
+                flushed[document] = self._broadcast(document, channel)
+
+        return flushed
+
+    def _broadcast(self, document: Hashable, channel: Channel) -> bytes:
+        pending = channel.pending
+        channel.pending = None
+
+        # Every subscriber gets the very same encoded bytes
+        payload = pending.delta.as_json().encode()
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(document, ()))
+            self.broadcasts += 1
+            self.ops_out += len(pending.delta.ops)
+            self.bytes_out += len(payload)
+            self.deliveries += len(subscribers)
+
+        try:
+            for subscriber in subscribers:
+                subscriber(document, payload)
+        finally:
+            if channel.pending is None:
+                self._close(document, channel)
+
+        return payload
+
+    def stats(self):
+        return {
+            'changes': self.changes,
+            'broadcasts': self.broadcasts,
+            'pending': len(self),
+            'deliveries': self.deliveries,
+            'ops_in': self.ops_in,
+            'ops_out': self.ops_out,
+            'bytes_out': self.bytes_out,
+            'change_ratio': self.changes / self.broadcasts
+            if self.broadcasts else 0.0,
+            'op_ratio': self.ops_in / self.ops_out if self.ops_out else 0.0,
+        }
@@ -1,13 +1,25 @@
 import json
 from collections.abc import Sized
+from difflib import SequenceMatcher
 from functools import reduce
-from typing import Dict, Iterable, List, TypeVar, Union
+from typing import Dict, Iterable, List, Pattern, TypeVar, Union
 
 from . import utils as _
-from .operations import OperationsList, OperationsReader
+from .admission import measure_cost
+from .embeds import compose_embed, invert_embed, transform_embed
+from .operations import (FrozenOperationsList, OperationsIterator,
+                         OperationsList, OperationsView, thaw_operation)
+from .parsers import parse_html
+from .positions import transform_index, transform_positions
+from .render import html_renderer, markdown_renderer
 from .types import (Delete, Insert, OperationType, Retain,
                     is_delete, is_insert, is_retain,
-                    it_insert_text, load_operation)
+                    it_insert_text, it_retain_embed, load_operation)
+from .unicode import (UTF16, TextView, astral_index, get_length_unit,
+                      to_units)
+from .validation import Limits, validate
+
+NULL_CHARACTER = '\0'
 
 DeltaOperationsType = Union[List, Dict, TypeVar('Delta'), OperationsList]
 
@@ -25,14 +37,30 @@ class Delta(Sized, Iterable):
             ops = ops['ops']
         elif isinstance(ops, Delta):
             ops = ops.ops
-        elif isinstance(ops, OperationsList):
-            ops = ops
+
+        if isinstance(ops, OperationsList):
+            self.ops = ops.copy()
         elif isinstance(ops, List):
-            ops = [load_operation(op) for op in ops]
-        elif not ops:
-            ops = []
+            self.ops = OperationsList([load_operation(op) for op in ops])
+        else:
+            self.ops = OperationsList(ops)
+
+    @classmethod
+    def validate_and_normalize(cls, data: Union[List, Dict],
+                               limits: Limits = None):
+        delta = cls()
+        delta.ops.extend(validate(data, limits))
+        return delta
+
+    @classmethod
+    def open_mmap(cls, path: str):
+        from .storage import MmapDelta
 
-        self.ops = OperationsList(ops)
+        return MmapDelta(path)
+
+    @classmethod
+    def from_html(cls, source: Union[str, Iterable[str]]):
+        return parse_html(cls(), source)
 
     def __repr__(self):
         return f'<Delta {self.ops} at 0x{id(self)}>'
@@ -55,7 +83,10 @@ class Delta(Sized, Iterable):
         return len(self.ops)
 
     def copy(self):
-        return Delta([op for op in self.ops])
+        return Delta(self.ops)
+
+    def freeze(self):
+        return FrozenDelta(self)
 
     def length(self):
         return reduce(lambda length, op: op.length + length, self.ops, 0)
@@ -64,16 +95,33 @@ class Delta(Sized, Iterable):
         return [op.as_data() for op in self.ops]
 
     def as_text(self):
-        return ''.join(self.ops.filter(it_insert_text))
+        return self.ops.text_projection().text
+
+    def text_projection(self):
+        return self.ops.text_projection()
+
+    def find(self, pattern: Union[str, Pattern], start: int = 0):
+        return self.ops.text_projection().find(pattern, start)
 
     def as_json(self):
         return json.dumps(self.as_data())
 
     def as_markdown(self):
-        raise NotImplementedError
+        return markdown_renderer.render(self)
+
+    def write_markdown(self, sink):
+        markdown_renderer.write(self, sink)
 
     def as_html(self):
-        raise NotImplementedError
+        return html_renderer.render(self)
+
+    def write_html(self, sink):
+        html_renderer.write(self, sink)
+
+    def write_mmap(self, target):
+        from .storage import write_mmap
+
+        write_mmap(self, target)
 
     def insert(self, value: Union[str, Dict], attributes: dict = None):
         if not attributes:
@@ -87,11 +135,11 @@ class Delta(Sized, Iterable):
 
         return self
 
-    def retain(self, length: int, attributes: dict = None):
+    def retain(self, length: Union[int, Dict], attributes: dict = None):
         if not attributes:
             attributes = None
 
-        if length > 0:
+        if isinstance(length, Dict) or length > 0:
             self.push(Retain(length, attributes))
 
         return self
@@ -103,7 +151,8 @@ class Delta(Sized, Iterable):
         return self
 
     def chop(self):
-        return Delta(self.ops.chop())
+        self.ops.chop()
+        return self
 
     def partition(self, func):
         passed, failed = [], []
@@ -116,16 +165,37 @@ class Delta(Sized, Iterable):
 
         return passed, failed
 
+    def ops_view(self):
+        return OperationsView(self.ops)
+
     def reduce(self, func, initial=0):
-        return reduce(func, self.ops, initial=initial)
+        return reduce(func, self.ops, initial)
 
     def concat(self, other):
-        delta = Delta(self.ops)
+        # Linear in both self and other: the result gets its own list
+        # holding our operations followed by theirs.
+        return self.copy()._extend(other.ops)
 
-        for op in other.ops:
-            delta.push(op)
+    def _extend(self, ops: List[OperationType]):
+        # Only the first operation can merge with our last one, the rest
+        # is already normalized. Inserts landing before a trailing delete
+        # are the exception, so those are pushed one by one.
+        index = 0
 
-        return delta
+        while index < len(ops):
+            self.push(ops[index])
+            index += 1
+
+            if not is_delete(self.ops.last):
+                break
+
+        if index < len(ops):
+            self.ops.extend(ops[index:])
+
+        return self
+
+    def cost(self, document_length: int = None):
+        return measure_cost(self.ops, document_length)
 
     def change_length(self):
         def reducer(length, op):
@@ -140,6 +210,10 @@ class Delta(Sized, Iterable):
 
     def push(self, value: OperationType):
         new_op = load_operation(value)
+
+        if is_insert(new_op) and isinstance(new_op.value, TextView):
+            new_op = Insert(str(new_op.value), new_op.attributes)
+
         index = len(self.ops)
         last_op = self.ops.last
 
@@ -150,12 +224,13 @@ class Delta(Sized, Iterable):
 
             if is_insert(new_op) and is_delete(last_op):
                 index -= 1
-                previous_op = self.ops[index - 1]
 
-                if it_insert_text(previous_op):
-                    self.ops[index - 1] = previous_op + new_op
+                if index == 0:
+                    self.ops.insert(0, new_op)
                     return self
 
+                last_op = self.ops[index - 1]
+
             op_types = type(new_op), type(last_op)
 
             if Delete not in op_types:
@@ -167,7 +242,9 @@ class Delta(Sized, Iterable):
                         self.ops[index - 1] = last_op + new_op
                         return self
 
-                    if is_retain(last_op) and is_retain(new_op):
+                    if is_retain(last_op) and is_retain(new_op) and \
+                            not it_retain_embed(last_op) and \
+                            not it_retain_embed(new_op):
                         self.ops[index - 1] = last_op + new_op
                         return self
 
@@ -178,88 +255,334 @@ class Delta(Sized, Iterable):
 
         return self
 
-    def compose(self, other: TypeVar('Delta')):
+    def compose(self, other: TypeVar('Delta'), cache=None):
+        if cache is not None:
+            return cache.compose(self, other)
+
         delta = Delta()
-        this_reader = OperationsReader(self.ops)
-        other_reader = OperationsReader(other.ops)
+        this_iter = OperationsIterator(self.ops)
+        other_iter = OperationsIterator(other.ops)
+
+        # Inserts covered by a leading plain retain of other are unchanged
+        first = other_iter.peek()
+
+        if first is not None and is_retain(first) and \
+                not first.attributes and not it_retain_embed(first):
+            left = first.length
+
+            while this_iter.peek_type() is Insert and \
+                    this_iter.peek_length() <= left:
+                left -= this_iter.peek_length()
+                this_iter.next()
+
+            delta.ops.extend(self.ops[:this_iter.index])
+
+            if first.length > left:
+                other_iter.next(first.length - left)
+
+        while this_iter.has_next() or other_iter.has_next():
+            if not other_iter.has_next():
+                return delta._extend(this_iter.rest()).chop()
+            elif not this_iter.has_next():
+                return delta._extend(other_iter.rest()).chop()
+            elif other_iter.peek_type() is Insert:
+                delta.push(other_iter.next())
+            elif this_iter.peek_type() is Delete:
+                delta.push(this_iter.next())
+            else:
+                length = min(this_iter.peek_length(), other_iter.peek_length())
+                this_op = this_iter.next(length)
+                other_op = other_iter.next(length)
+
+                if is_retain(other_op):
+                    attributes = _.compose_attributes(
+                        this_op.attributes, other_op.attributes,
+                        keep_null=is_retain(this_op))
+                    value = this_op.value
+
+                    # An embed retain edits the embed it lands on through
+                    # its registered handler.
+                    if it_retain_embed(other_op):
+                        if is_retain(this_op) and \
+                                not it_retain_embed(this_op):
+                            value = other_op.value
+                        else:
+                            value = compose_embed(value, other_op.value,
+                                                  is_retain(this_op))
 
-        while this_reader.not_eof or other_reader.not_eof:
-            this_peek = this_reader.peek()
-            other_peek = other_reader.peek()
+                    delta.push(type(this_op)(value, attributes))
 
-            if is_insert(other_peek):
-                delta.push(other_reader.readitem())
-            elif is_delete(this_peek):
-                delta.push(this_reader.readitem())
+                elif is_delete(other_op) and is_retain(this_op):
+                    delta.push(other_op)
+
+        return delta.chop()
+
+    def slice(self, start=0, end=None):
+        delta = Delta()
+        iterator = OperationsIterator(self.ops)
+        index = 0
+
+        while iterator.has_next() and (end is None or index < end):
+            if index < start:
+                op = iterator.next(start - index)
+            elif end is None:
+                return delta._extend(iterator.rest())
             else:
-                length = min(this_reader.length() or 0,
-                             other_reader.length() or 0)
-                length = length if length > 0 else None
+                op = iterator.next(end - index)
+                delta.push(op)
 
-                a = this_reader.readitem(length)
-                b = other_reader.readitem(length)
+            index += op.length
 
-                if is_retain(b):
-                    op = _.merge_dicts(a.attributes if a else None,
-                                       b.attributes if b else None)
+        return delta
 
-                    if is_retain(a):
-                        op['retain'] = length or self.length()
-                    else:
-                        op['insert'] = a.value
+    def diff(self, other: TypeVar('Delta')):
+        if self.ops is other.ops or self == other:
+            return Delta()
 
-                    delta.push(load_operation(op))
+        texts = []
 
-                elif is_delete(b) and is_retain(a):
-                    delta.push(b)
+        for document in (self, other):
+            chunks = []
 
-        delta.chop()
+            for op in document.ops:
+                if not is_insert(op):
+                    raise ValueError('diff() called on a non-document delta')
 
-        return delta
+                chunks.append(op.value if it_insert_text(op)
+                              else NULL_CHARACTER)
 
-    def slice(self, start=0, end=None):
-        reader = OperationsReader(self.ops)
-        return Delta([op for op in reader][start:end])
+            texts.append(''.join(chunks))
+
+        a, b = texts
+        unit = get_length_unit()
+        index_a, index_b = (astral_index(a), astral_index(b)) \
+            if unit == UTF16 else (None, None)
+        delta = Delta()
+        this_iter = OperationsIterator(self.ops)
+        other_iter = OperationsIterator(other.ops)
+        matcher = SequenceMatcher(None, a, b, autojunk=False)
+
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ('insert', 'replace'):
+                if j2 == len(b):
+                    delta._extend(other_iter.rest())
+                else:
+                    length = to_units(b, j2, unit, index_b) - \
+                        to_units(b, j1, unit, index_b)
+
+                    while length > 0:
+                        op = other_iter.next(length)
+                        delta.push(op)
+                        length -= op.length
+
+            if tag in ('delete', 'replace'):
+                length = to_units(a, i2, unit, index_a) - \
+                    to_units(a, i1, unit, index_a)
+                delta.delete(length)
+
+                while length > 0:
+                    length -= this_iter.next(length).length
+
+            if tag == 'equal':
+                length = to_units(a, i2, unit, index_a) - \
+                    to_units(a, i1, unit, index_a)
+
+                while length > 0:
+                    op_length = min(this_iter.peek_length(),
+                                    other_iter.peek_length(), length)
+                    this_op = this_iter.next(op_length)
+                    other_op = other_iter.next(op_length)
+
+                    if this_op.value == other_op.value:
+                        delta.retain(op_length, _.diff_attributes(
+                            this_op.attributes, other_op.attributes))
+                    else:
+                        delta.push(other_op).delete(op_length)
+
+                    length -= op_length
 
-    def diff(self, other, index):
-        raise NotImplementedError
+        return delta.chop()
 
     def each_line(self, func, newline='\n'):
-        reader = OperationsReader(self.ops)
         line = Delta()
         i = 0
 
-        while reader.not_eof:
-            if not is_insert(reader.peek()):
+        for op in self.ops:
+            if not is_insert(op):
                 return
 
-            self_op = reader.readitem()
-            start = self_op.length - reader.length()
+            if not it_insert_text(op):
+                line.push(op)
+                continue
 
-            if it_insert_text(self_op):
-                try:
-                    index = self_op.value.index(newline, start) - start
-                except ValueError:
-                    index = -1
-            else:
-                index = -1
+            start = 0
 
-            if index < 0:
-                line.push(reader.readitem())
-            elif index > 0:
-                line.push(reader.readitem(index))
-            else:
-                if not func(line, reader.readitem(1).attributes, i):
+            while True:
+                index = op.value.find(newline, start)
+
+                if index < 0:
+                    if start < len(op.value):
+                        line.push(Insert(op.value[start:], op.attributes))
+                    break
+
+                if index > start:
+                    line.push(Insert(op.value[start:index], op.attributes))
+
+                if func(line, op.attributes or {}, i) is False:
                     return
 
                 i += 1
+                start = index + len(newline)
                 line = Delta()
 
         if line.length() > 0:
             func(line, {}, i)
 
-    def transform(self, other, priority):
-        raise NotImplementedError
+    def transform(self, other: Union[int, TypeVar('Delta')],
+                  priority: bool = False):
+        if isinstance(other, int):
+            return self.transform_position(other, priority)
 
-    def transform_position(self, index, priority):
-        raise NotImplementedError
+        delta = Delta()
+        this_iter = OperationsIterator(self.ops)
+        other_iter = OperationsIterator(other.ops)
+
+        while this_iter.has_next() or other_iter.has_next():
+            if not other_iter.has_next():
+                # Whatever is left of this only produces retains
+                break
+            elif this_iter.peek_type() is Insert and (
+                    priority or other_iter.peek_type() is not Insert):
+                delta.retain(this_iter.next().length)
+            elif other_iter.peek_type() is Insert:
+                delta.push(other_iter.next())
+            elif not this_iter.has_next():
+                return delta._extend(other_iter.rest()).chop()
+            else:
+                length = min(this_iter.peek_length(), other_iter.peek_length())
+                this_op = this_iter.next(length)
+                other_op = other_iter.next(length)
+
+                if is_delete(this_op):
+                    # Our delete makes theirs redundant or drops their retain
+                    continue
+                elif is_delete(other_op):
+                    delta.push(other_op)
+                else:
+                    value = length
+
+                    if it_retain_embed(other_op):
+                        value = other_op.value
+
+                        if it_retain_embed(this_op):
+                            value = transform_embed(this_op.value, value,
+                                                    priority)
+
+                    delta.retain(value, _.transform_attributes(
+                        this_op.attributes, other_op.attributes, priority))
+
+        return delta.chop()
+
+    def invert(self, base: TypeVar('Delta')):
+        inverted = Delta()
+        base_iter = OperationsIterator(base.ops)
+
+        for op in self.ops:
+            if is_insert(op):
+                inverted.delete(op.length)
+            elif it_retain_embed(op):
+                base_op = base_iter.next(1)
+                inverted.retain(
+                    invert_embed(op.value, base_op.value),
+                    _.invert_attributes(op.attributes, base_op.attributes))
+            else:
+                length = op.length
+
+                while length > 0 and base_iter.has_next():
+                    base_op = base_iter.next(length)
+                    length -= base_op.length
+
+                    if is_delete(op):
+                        inverted.push(base_op)
+                    elif op.attributes:
+                        inverted.retain(base_op.length, _.invert_attributes(
+                            op.attributes, base_op.attributes))
+                    else:
+                        inverted.retain(base_op.length)
+
+        return inverted.chop()
+
+    def transform_position(self, index: int, priority: bool = False):
+        return transform_index(self.ops, index, priority)
+
+    def transform_positions(self, positions: Iterable[int],
+                            priority: bool = False):
+        return transform_positions(self.ops, positions, priority)
+
+
+class FrozenDelta(Delta):
+    __slots__ = ('_length', '_json')
+
+    def __init__(self, ops: DeltaOperationsType = None):
+        if isinstance(ops, FrozenDelta):
+            ops = ops.ops
+        elif not isinstance(ops, (Delta, OperationsList)):
+            ops = Delta(ops).ops
+        elif isinstance(ops, Delta):
+            ops = ops.ops
+
+        frozen = FrozenOperationsList(self._frozen(op) for op in ops)
+
+        object.__setattr__(self, 'ops', frozen)
+        object.__setattr__(self, '_length', (None, 0))
+        object.__setattr__(self, '_json', None)
+
+    @staticmethod
+    def _frozen(op):
+        if is_delete(op):
+            return op
+        return type(op)(_.immutable(op.value), _.immutable(op.attributes))
+
+    def __setattr__(self, key, value):
+        raise TypeError('FrozenDelta is immutable')
+
+    def __repr__(self):
+        return f'<FrozenDelta {self.ops} at 0x{id(self)}>'
+
+    def __reduce__(self):
+        return type(self), (self.as_data(),)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('FrozenDelta is immutable')
+
+    insert = retain = delete = push = chop = _immutable
+
+    def copy(self):
+        return self
+
+    def freeze(self):
+        return self
+
+    def thaw(self):
+        return Delta(self)
+
+    def concat(self, other):
+        return self.thaw()._extend(other.ops)
+
+    def as_data(self):
+        return [thaw_operation(op).as_data() for op in self.ops]
+
+    def length(self):
+        # Lengths depend on the unit in effect, so they're cached per unit
+        unit, length = self._length
+        if unit != get_length_unit():
+            unit = get_length_unit()
+            length = Delta.length(self)
+            object.__setattr__(self, '_length', (unit, length))
+        return length
+
+    def as_json(self):
+        # Racing threads can only ever store the same string
+        if self._json is None:
+            object.__setattr__(self, '_json', Delta.as_json(self))
+        return self._json
@@ -0,0 +1,82 @@
+from typing import Dict
+
+from .abc import EmbedHandler
+
+__all__ = ['DeltaEmbedHandler', 'register_embed', 'unregister_embed',
+           'get_handler']
+
+HANDLERS = {}
+
+
+def register_embed(embed_type: str, handler: EmbedHandler):
+    assert isinstance(handler, EmbedHandler), \
+        f'Wrong type {type(handler)} expected {EmbedHandler}'
+    HANDLERS[embed_type] = handler
+
+
+def unregister_embed(embed_type: str):
+    HANDLERS.pop(embed_type, None)
+
+
+def get_handler(embed_type: str) -> EmbedHandler:
+    try:
+        return HANDLERS[embed_type]
+    except KeyError:
+        raise ValueError(f'No handler registered for the '
+                         f'{embed_type!r} embed') from None
+
+
+def embed_type(value: Dict) -> str:
+    if not isinstance(value, Dict) or not value:
+        raise TypeError(f'Expected an embed object, not {value!r}')
+    return next(iter(value))
+
+
+def matching_type(a: Dict, b: Dict) -> str:
+    a_type, b_type = embed_type(a), embed_type(b)
+
+    if a_type != b_type:
+        raise ValueError(f'Embed types do not match: {a_type!r} != '
+                         f'{b_type!r}')
+
+    return a_type
+
+
+def compose_embed(a: Dict, b: Dict, keep_null: bool = False) -> Dict:
+    key = matching_type(a, b)
+    return {key: get_handler(key).compose(a[key], b[key], keep_null)}
+
+
+def transform_embed(a: Dict, b: Dict, priority: bool = False) -> Dict:
+    key = matching_type(a, b)
+    return {key: get_handler(key).transform(a[key], b[key], priority)}
+
+
+def invert_embed(a: Dict, base: Dict) -> Dict:
+    key = matching_type(a, base)
+    return {key: get_handler(key).invert(a[key], base[key])}
+
+
+class DeltaEmbedHandler(EmbedHandler):
+    # Embeds whose content is itself a list of delta operations
+    __slots__ = ()
+
+    @staticmethod
+    def _delta(data):
+        from .delta import Delta
+
+        return Delta(list(data))
+
+    def compose(self, a, b, keep_null: bool):
+        return self._delta(a).compose(self._delta(b)).as_data()
+
+    def transform(self, a, b, priority: bool):
+        return self._delta(a).transform(self._delta(b), priority).as_data()
+
+    def invert(self, a, base):
+        return self._delta(a).invert(self._delta(base)).as_data()
+
+    def validate(self, value):
+        from .validation import validate
+
+        validate(value)
@@ -0,0 +1,187 @@
+import sys
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+from . import utils
+from .delta import Delta
+from .operations import OperationsIterator
+
+__all__ = ['enable', 'disable', 'is_enabled', 'snapshot', 'reset', 'profile']
+
+
+def _ops(instance, *args, **kwargs):
+    return len(instance.ops)
+
+
+def _compose_ops(instance, other, *args, **kwargs):
+    return len(instance.ops) + len(other.ops)
+
+
+def _one(*args, **kwargs):
+    return 1
+
+
+def _merge_ops(*args):
+    return len(args)
+
+
+TARGETS = (
+    (Delta, 'compose', 'Delta.compose', _compose_ops),
+    (Delta, 'push', 'Delta.push', _one),
+    (Delta, 'slice', 'Delta.slice', _ops),
+    (Delta, 'each_line', 'Delta.each_line', _ops),
+    (Delta, 'as_data', 'Delta.as_data', _ops),
+    (Delta, 'as_json', 'Delta.as_json', _ops),
+    (Delta, 'as_html', 'Delta.as_html', _ops),
+    (Delta, 'as_markdown', 'Delta.as_markdown', _ops),
+    (OperationsIterator, 'next', 'OperationsIterator.next', _one),
+    (utils, 'merge_dicts', 'merge_dicts', _merge_ops),
+)
+
+
+class Counters:
+    __slots__ = ('_counters', '_lock')
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ops: int, elapsed: float):
+        with self._lock:
+            counter = self._counters.get(name)
+
+            if counter is None:
+                counter = self._counters[name] = [0, 0, 0.0]
+
+            counter[0] += 1
+            counter[1] += ops
+            counter[2] += elapsed
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {'calls': calls, 'ops': ops, 'time': elapsed}
+                    for name, (calls, ops, elapsed)
+                    in self._counters.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+
+
+_counters = Counters()
+_originals = {}
+_local = threading.local()
+_lock = threading.Lock()
+
+# Instrumentation stays on while enable() is in effect or any profile is
+# open, and audit events while any of them asked for them.
+_enabled = False
+_audit = False
+_profiles = 0
+_audit_profiles = 0
+
+
+def _record(name: str, ops: int, elapsed: float):
+    _counters.add(name, ops, elapsed)
+
+    for profile_counters in getattr(_local, 'profiles', ()):
+        profile_counters.add(name, ops, elapsed)
+
+    if _audit or _audit_profiles:
+        sys.audit(f'quilldelta.{name}', ops, elapsed)
+
+
+def _instrument(func, name: str, count):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, count(*args, **kwargs), perf_counter() - start)
+
+    return wrapper
+
+
+def _install():
+    if _originals:
+        return
+
+    for owner, attribute, name, count in TARGETS:
+        func = getattr(owner, attribute)
+        _originals[name] = (owner, attribute, func)
+        setattr(owner, attribute, _instrument(func, name, count))
+
+
+def _uninstall():
+    if _enabled or _profiles:
+        return
+
+    for owner, attribute, func in _originals.values():
+        setattr(owner, attribute, func)
+
+    _originals.clear()
+
+
+def _check_audit(audit: bool):
+    if audit and not hasattr(sys, 'audit'):
+        raise RuntimeError('sys.audit events require Python 3.8+')
+
+
+def enable(audit: bool = False):
+    global _enabled, _audit
+    _check_audit(audit)
+
+    with _lock:
+        _enabled = True
+        _audit = _audit or audit
+        _install()
+
+
+def disable():
+    global _enabled, _audit
+
+    with _lock:
+        _enabled = _audit = False
+        _uninstall()
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def snapshot():
+    return _counters.snapshot()
+
+
+def reset():
+    _counters.reset()
+
+
+@contextmanager
+def profile(audit: bool = False):
+    global _profiles, _audit_profiles
+    _check_audit(audit)
+    counters = Counters()
+
+    with _lock:
+        _profiles += 1
+        _audit_profiles += bool(audit)
+        _install()
+
+    if not hasattr(_local, 'profiles'):
+        _local.profiles = []
+
+    _local.profiles.append(counters)
+
+    try:
+        yield counters
+    finally:
+        _local.profiles.remove(counters)
+
+        with _lock:
+            _profiles -= 1
+            _audit_profiles -= bool(audit)
+            _uninstall()
@@ -0,0 +1,172 @@
+import json
+import re
+from typing import Dict, List, Union
+
+from .delta import Delta
+from .operations import OperationsList
+from .types import load_operation
+from .unicode import text_length
+
+__all__ = ['LazyDelta']
+
+RAW_LIST = re.compile(r'\s*\[')
+RAW_BYTES_LIST = re.compile(rb'\s*\[')
+
+RawType = Union[bytes, bytearray, memoryview, str, List, Dict]
+
+
+class LazyDelta(Delta):
+    __slots__ = ('_raw', '_data', '_loaded', '_ops', '_built')
+
+    def __init__(self, data: RawType):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            raw, data = bytes(data), None
+        elif isinstance(data, str):
+            raw, data = data, None
+        elif isinstance(data, (List, Dict)):
+            raw = None
+        else:
+            raise TypeError(f'Wrong type {type(data)} for a lazy delta')
+
+        self._raw = raw
+        self._data = None
+        self._loaded = None
+        self._ops = None
+        self._built = None
+
+        if data is not None:
+            self._data = self._unwrap(data)
+
+    @staticmethod
+    def _unwrap(data):
+        if isinstance(data, Dict):
+            assert 'ops' in data, 'Unknown form, missing "ops" key.'
+            data = data['ops']
+
+        assert isinstance(data, List), f'Wrong type {type(data)} for ops'
+        return data
+
+    def _decoded(self) -> List:
+        if self._data is None:
+            self._data = self._unwrap(json.loads(self._raw))
+        return self._data
+
+    @property
+    def ops(self) -> OperationsList:
+        if self._ops is None:
+            data = self._decoded()
+            loaded = self._loaded or ()
+            ops = OperationsList()
+
+            for index, op in enumerate(data):
+                if index < len(loaded) and loaded[index] is not None:
+                    op = loaded[index]
+                ops.append(op)
+
+            self._ops = ops
+            self._loaded = None
+            self._built = ops, ops.version
+
+        return self._ops
+
+    @ops.setter
+    def ops(self, value: OperationsList):
+        self._ops = value
+
+    def __repr__(self):
+        state = 'loaded' if self._ops is not None else 'lazy'
+        return f'<LazyDelta {state} at 0x{id(self)}>'
+
+    def __len__(self):
+        if self._ops is not None:
+            return len(self._ops)
+        return len(self._decoded())
+
+    def __getitem__(self, index: Union[int, slice]):
+        if self._ops is not None:
+            return self._ops[index]
+
+        data = self._decoded()
+
+        if isinstance(index, slice):
+            return [self[position]
+                    for position in range(*index.indices(len(data)))]
+
+        if self._loaded is None:
+            self._loaded = [None] * len(data)
+
+        op = self._loaded[index]
+
+        if op is None:
+            op = self._loaded[index] = load_operation(data[index])
+
+        return op
+
+    def __iter__(self):
+        if self._ops is not None:
+            return iter(self._ops)
+        return (self[index] for index in range(len(self._decoded())))
+
+    @property
+    def loaded(self) -> bool:
+        return self._ops is not None
+
+    def modified(self) -> bool:
+        if self._ops is None:
+            return False
+        elif self._built is None:
+            return True
+
+        # Any write bumps the version, a replaced list is a different object
+        ops, version = self._built
+        return self._ops is not ops or self._ops.version != version
+
+    def copy(self):
+        if self.modified():
+            return Delta(self.ops)
+        return LazyDelta(self._raw if self._raw is not None else self._data)
+
+    def length(self):
+        if self._ops is not None:
+            return Delta.length(self)
+
+        # Sums the raw dicts without building any operation
+        length = 0
+
+        for op in self._decoded():
+            if 'insert' in op:
+                value = op['insert']
+                length += text_length(value) if isinstance(value, str) else 1
+            elif 'retain' in op:
+                value = op['retain']
+                length += 1 if isinstance(value, Dict) else value
+            else:
+                length += op['delete']
+
+        return length
+
+    def as_data(self):
+        return [op.as_data() for op in self]
+
+    def _passthrough(self) -> bool:
+        # Only an unmodified bare list of operations is output as is, the
+        # {"ops": [...]} form is not what Delta.as_json returns.
+        if self._raw is None or self.modified():
+            return False
+
+        match = RAW_LIST.match(self._raw) if isinstance(self._raw, str) \
+            else RAW_BYTES_LIST.match(self._raw)
+        return match is not None
+
+    def as_json(self):
+        if self._passthrough():
+            if isinstance(self._raw, bytes):
+                return self._raw.decode()
+            return self._raw
+
+        return json.dumps(self.as_data())
+
+    def as_bytes(self) -> bytes:
+        if isinstance(self._raw, bytes) and self._passthrough():
+            return self._raw
+        return self.as_json().encode()
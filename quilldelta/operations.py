@@ -1,52 +1,212 @@
-from collections.abc import Sequence, Set
+from collections.abc import Sequence
+from functools import reduce
+from math import inf
 from typing import Iterable, List, TypeVar, Union
 
-from .abc import SequenceReader
-from .types import (Delete, Insert, OperationType, Retain, is_delete, is_insert,
-                    is_retain, it_insert_text, load_operation)
-from .utils import (chainable, truncate_repr)
+from .types import (Delete, Insert, OperationType, Retain, hash_operation,
+                    is_delete, is_retain, it_insert_text, it_retain_embed,
+                    load_operation)
+from .text import TextProjection
+from .unicode import TextView
+from .utils import FrozenDict, mutable, truncate_repr
 
 
-class OperationsReader(SequenceReader):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._offset = 0
+class OperationsIterator:
+    __slots__ = ('ops', 'index', 'offset', '_op', '_length', '_view')
 
-    def length(self):
-        if self.eof:
-            return None
+    def __init__(self, ops: Sequence):
+        self.ops = ops
+        self.index = 0
+        self.offset = 0
+        self._op = None
+        self._length = 0
+        self._view = None
 
-        return self.peek().length - self._offset
+    def _measure(self, op) -> int:
+        # An operation read in parts is measured, and its text wrapped, only
+        # once instead of on every read.
+        if op is not self._op:
+            self._op = op
+            self._length = op.length
+            self._view = None
+        return self._length
 
-    def writable(self):
-        return True
+    def has_next(self) -> bool:
+        return self.index < len(self.ops)
 
-    def write(self, value):
-        pass
+    def peek(self):
+        if self.index < len(self.ops):
+            return self.ops[self.index]
+        return None
 
-    def readitem(self, length: int = None):
-        peek = self.peek()
+    def peek_length(self):
+        if self.index < len(self.ops):
+            return self._measure(self.ops[self.index]) - self.offset
+        return inf
 
-        if peek is None:
-            return Retain(-1, None)
+    def peek_type(self):
+        if self.index < len(self.ops):
+            return type(self.ops[self.index])
+        return Retain
 
-        op = self.read()  # type: Union[Insert, Retain, Delete]
+    def next(self, length=inf):
+        if self.index >= len(self.ops):
+            return Retain(inf, None)
 
-        if length is None:
-            self._offset = 0
+        op = self.ops[self.index]  # type: Union[Insert, Retain, Delete]
+        op_length = self._measure(op)
+        offset = self.offset
+
+        if length >= op_length - offset:
+            length = op_length - offset
+            self.index += 1
+            self.offset = 0
         else:
-            self.seek(self._index - 1)
-            self._offset += length
+            self.offset += length
+
+        if offset == 0 and length == op_length:
+            return op
+        elif is_delete(op):
+            return Delete(length)
+        elif is_retain(op):
+            return Retain(length, op.attributes)
+        elif it_insert_text(op):
+            # Partial reads share the insert text instead of copying it
+            view = self._view
+
+            if view is None:
+                view = op.value
+                if not isinstance(view, TextView):
+                    view = TextView(view)
+                self._view = view
 
-        if is_delete(op):
-            return Delete(op.length)
+            return Insert(view.slice(offset, length), op.attributes)
         else:
-            if is_retain(op):
-                return Retain(length or -1, op.attributes)
-            if it_insert_text(op):
-                return Insert(op.value[self._offset:], op.attributes)
-            elif is_insert(op):
-                return Insert(op.value, op.attributes)
+            return Insert(op.value, op.attributes)
+
+    def rest(self) -> list:
+        if self.index >= len(self.ops):
+            return []
+        elif self.offset == 0:
+            return list(self.ops[self.index:])
+
+        # Only the partially consumed operation needs to be split, the
+        # position is restored so rest() can be called without consuming.
+        index, offset = self.index, self.offset
+        first = self.next()
+        ops = [first]
+        ops.extend(self.ops[self.index:])
+        self.index, self.offset = index, offset
+        return ops
+
+
+FILTER, MAP, TAKEWHILE = 'filter', 'map', 'takewhile'
+
+
+class OperationsView(Sequence):
+    def __init__(self, source: Iterable, stages: tuple = ()):
+        self._source = source
+        self._stages = stages
+        self._items = None
+
+    def __repr__(self):
+        items = truncate_repr(self.materialize())
+        return f'<OperationsView {items} at {id(self)}>'
+
+    def __iter__(self):
+        if self._items is not None:
+            yield from self._items
+        else:
+            yield from self._pipeline()
+
+    def _pipeline(self):
+        stages = self._stages
+
+        if not stages:
+            yield from self._source
+            return
+
+        # All stages run inside a single loop, so every operation goes
+        # through the whole pipeline without intermediate iterators.
+        for op in self._source:
+            for stage, func in stages:
+                if stage is MAP:
+                    op = func(op)
+                elif stage is FILTER:
+                    if not func(op):
+                        break
+                elif not func(op):
+                    return
+            else:
+                yield op
+
+    def __len__(self):
+        return len(self.materialize())
+
+    def __getitem__(self, item):
+        return self.materialize()[item]
+
+    def __eq__(self, other):
+        return self.materialize() == list(other)
+
+    def materialize(self):
+        if self._items is None:
+            self._items = list(self._pipeline())
+        return self._items
+
+    def _chain(self, stage, func):
+        return OperationsView(self._source, self._stages + ((stage, func),))
+
+    def filter(self, func):
+        return self._chain(FILTER, func)
+
+    def map(self, func):
+        return self._chain(MAP, func)
+
+    def takewhile(self, func):
+        return self._chain(TAKEWHILE, func)
+
+    def partition(self, func):
+        passed, failed = [], []
+
+        for op in self:
+            if func(op):
+                passed.append(op)
+            else:
+                failed.append(op)
+
+        return passed, failed
+
+    def reduce(self, func, initial=0):
+        return reduce(func, self, initial)
+
+    def to_list(self):
+        return OperationsList(self)
+
+    def to_delta(self):
+        from .delta import Delta
+
+        delta = Delta()
+        push = delta.push
+
+        for op in self:
+            push(op)
+
+        return delta
+
+
+def thaw_operation(op: OperationType) -> OperationType:
+    # Operations read from a frozen list get mutable values back before
+    # they go into another one.
+    # The last field is the attributes, or the length of a delete
+    if type(op[-1]) is FrozenDict or isinstance(op[0], (FrozenDict, tuple)):
+        return type(op)(mutable(op.value), mutable(op.attributes))
+    return op
+
+
+HASH_MODULUS = (1 << 61) - 1
+HASH_BASE = 0x5bd1e995
+HASH_INVERSE = pow(HASH_BASE, HASH_MODULUS - 2, HASH_MODULUS)
 
 
 class OperationsList(Sequence):
@@ -56,16 +216,43 @@ class OperationsList(Sequence):
                 List, Iterable)), f'Wrong type {type(items)} for items'
 
         self._items = []
+        self._shared = False
+        self._text = None
+        self._hash = 0
+        self._power = 1
         self.last = None
+        self.version = 0
 
         if not items:
             items = []
 
         for item in items:
-            self.append.inner(self, item)
+            self.append(item)
 
     def __hash__(self):
-        return Set._hash(self)
+        return self._hash
+
+    def __reduce__(self):
+        # The content hash comes from hash(), which is seeded per process,
+        # so it is rebuilt from the operations when unpickled.
+        return type(self), (list(self._items),)
+
+    def _before_write(self):
+        self._text = None
+        self.version += 1
+
+        # Copies share their storage until one of them is mutated
+        if self._shared:
+            self._items = list(self._items)
+            self._shared = False
+
+    def _rehash(self, index: int, old: OperationType, new: OperationType):
+        # The content hash is sum(hash(op_i) * BASE ** i), so replacing or
+        # removing a single operation is a constant time update.
+        delta = (hash_operation(new) if new is not None else 0) - \
+                (hash_operation(old) if old is not None else 0)
+        power = pow(HASH_BASE, index, HASH_MODULUS)
+        self._hash = (self._hash + delta * power) % HASH_MODULUS
 
     def __repr__(self):
         return f'<Operations {truncate_repr(self._items)} at {id(self)}>'
@@ -77,8 +264,11 @@ class OperationsList(Sequence):
         return self._items[item]
 
     def __setitem__(self, key: int, value: OperationType):
-        value = load_operation(value)
-        self._items[key] = value
+        value = thaw_operation(load_operation(value))
+        index = range(len(self._items))[key]
+        self._before_write()
+        self._rehash(index, self._items[index], value)
+        self._items[index] = value
         self.last = self._items[-1]
 
     def __eq__(self, other: Union[TypeVar('OperationsList'), List]):
@@ -86,6 +276,8 @@ class OperationsList(Sequence):
                           (OperationsList, list)), f'Wrong type {type(other)}'
 
         if isinstance(other, OperationsList):
+            if self._hash != other._hash:
+                return False
             return self._items == other._items
         elif isinstance(other, list):
             return self._items == other
@@ -99,27 +291,99 @@ class OperationsList(Sequence):
         elif isinstance(other, list):
             return OperationsList(self._items + other)
 
-    @chainable
     def append(self, value: OperationType):
-        value = load_operation(value)
+        return self._append(thaw_operation(load_operation(value)))
+
+    def _append(self, value: OperationType):
+        self._before_write()
+        self._hash = (self._hash + hash_operation(value) * self._power) \
+            % HASH_MODULUS
+        self._power = self._power * HASH_BASE % HASH_MODULUS
         self._items.append(value)
         self.last = value
 
-    @chainable
+        return self
+
     def insert(self, index: int, value: OperationType):
-        value = load_operation(value)
+        value = thaw_operation(load_operation(value))
+        if index < 0:
+            index = max(len(self._items) + index, 0)
+        index = min(index, len(self._items))
+        self._before_write()
+
+        # Operations after the index shift one position to the right
+        for position in range(len(self._items) - 1, index - 1, -1):
+            op = self._items[position]
+            self._rehash(position, op, None)
+            self._rehash(position + 1, None, op)
+
+        self._rehash(index, None, value)
+        self._power = self._power * HASH_BASE % HASH_MODULUS
         self._items.insert(index, value)
         self.last = self._items[-1]
 
-    @chainable
+        return self
+
+    def extend(self, values: Iterable[OperationType]):
+        for value in values:
+            self.append(value)
+
+        return self
+
+    def copy(self):
+        other = OperationsList.__new__(OperationsList)
+        other._items = self._items
+        other._hash = self._hash
+        other._power = self._power
+        other.last = self.last
+        other.version = 0
+        other._text = self._text
+        other._shared = self._shared = True
+        return other
+
+    def text_projection(self):
+        if self._text is None:
+            self._text = TextProjection(self._items)
+        return self._text
+
     def filter(self, func):
-        return OperationsList(filter(func, self))
+        return OperationsView(self).filter(func)
 
-    @chainable
     def map(self, func):
-        return OperationsList(map(func, self))
+        return OperationsView(self).map(func)
 
-    @chainable
     def chop(self):
-        if self.last and is_retain(self.last) and not self.last.attributes:
-            self._items.pop()
+        if self.last and is_retain(self.last) and \
+                not self.last.attributes and not it_retain_embed(self.last):
+            self._before_write()
+            self._rehash(len(self._items) - 1, self._items.pop(), None)
+            self._power = self._power * HASH_INVERSE % HASH_MODULUS
+            self.last = self._items[-1] if self._items else None
+
+        return self
+
+
+class FrozenOperationsList(OperationsList):
+    def __init__(self, items: Union[List, Iterable] = None):
+        super().__init__()
+
+        for item in items or ():
+            self._append(load_operation(item))
+
+    def __eq__(self, other: Union[TypeVar('OperationsList'), List]):
+        if isinstance(other, OperationsList) and self._hash != other._hash:
+            return False
+
+        # Embed lists are stored as tuples, compare in the mutable form
+        return [thaw_operation(op) for op in self._items] == \
+            [thaw_operation(op) for op in other]
+
+    __hash__ = OperationsList.__hash__
+
+    def copy(self):
+        return OperationsList(self._items)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f'{type(self).__name__} is immutable')
+
+    __setitem__ = append = insert = extend = chop = _immutable
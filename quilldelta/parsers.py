@@ -0,0 +1,256 @@
+import re
+from html.parser import HTMLParser
+from typing import Iterable, Union
+
+from . import utils as _
+
+__all__ = ['DeltaHTMLParser', 'parse_html']
+
+INLINE_TAGS = {
+    'b': ('bold', True),
+    'strong': ('bold', True),
+    'i': ('italic', True),
+    'em': ('italic', True),
+    'u': ('underline', True),
+    's': ('strike', True),
+    'strike': ('strike', True),
+    'del': ('strike', True),
+    'code': ('code', True),
+    'sub': ('script', 'sub'),
+    'sup': ('script', 'super'),
+}
+
+BLOCK_TAGS = {
+    'p': None,
+    'div': None,
+    'li': None,
+    'h1': ('header', 1),
+    'h2': ('header', 2),
+    'h3': ('header', 3),
+    'h4': ('header', 4),
+    'h5': ('header', 5),
+    'h6': ('header', 6),
+    'blockquote': ('blockquote', True),
+    'pre': ('code-block', True),
+}
+
+LIST_TAGS = {'ul': 'bullet', 'ol': 'ordered'}
+VOID_TAGS = {'br', 'img', 'hr', 'input', 'meta', 'link', 'source', 'wbr',
+             'base'}
+# Only elements that are always closed, <head> may end without </head>
+IGNORED_TAGS = {'script', 'style', 'title', 'template'}
+
+whitespace_re = re.compile(r'\s+')
+style_re = re.compile(r'\s*([\w-]+)\s*:\s*([^;]+?)\s*(?:;|$)')
+
+
+class DeltaHTMLParser(HTMLParser):
+    def __init__(self, delta):
+        super().__init__(convert_charrefs=True)
+        self.delta = delta
+
+        self._inline = []  # type: list
+        self._blocks = []  # type: list
+        self._lists = []  # type: list
+        self._interned = {}
+        self._attributes = None
+        self._ignore = 0
+
+        self._text = []
+        self._text_attributes = None
+        self._line_has_content = False
+        self._newlines = 0
+
+    def intern(self, attributes: dict):
+        if not attributes:
+            return None
+
+        return self._interned.setdefault(_.freeze(attributes), attributes)
+
+    def close(self):
+        super().close()
+
+        if self._line_has_content:
+            self.newline()
+
+        self.flush()
+        return self.delta
+
+    def flush(self):
+        if self._text:
+            self.delta.insert(''.join(self._text), self._text_attributes)
+            self._text = []
+
+    def write(self, text: str):
+        if self._text and self._text_attributes is not self._attributes:
+            self.flush()
+
+        self._text_attributes = self._attributes
+        self._text.append(text)
+        self._line_has_content = True
+
+    def embed(self, value: dict, attributes: dict = None):
+        self.flush()
+        merged = dict(self._attributes or {}, **(attributes or {}))
+        self.delta.insert(value, self.intern(merged))
+        self._line_has_content = True
+
+    def newline(self):
+        if self._text and not self.in_pre():
+            self._text[-1] = self._text[-1].rstrip()
+
+        self.flush()
+        self.delta.insert('\n', self.block_attributes())
+        self._line_has_content = False
+        self._newlines += 1
+
+    def block_attributes(self):
+        attributes = {}
+
+        for tag, format, start in self._blocks:
+            if format:
+                attributes[format[0]] = format[1]
+            if tag == 'li' and self._lists:
+                attributes['list'] = self._lists[-1]
+                if len(self._lists) > 1:
+                    attributes['indent'] = len(self._lists) - 1
+
+        return self.intern(attributes)
+
+    def in_pre(self):
+        return any(block[0] == 'pre' for block in self._blocks)
+
+    def update_attributes(self):
+        attributes = {}
+
+        for tag, format in self._inline:
+            attributes.update(format)
+
+        self._attributes = self.intern(attributes)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in IGNORED_TAGS or self._ignore and tag == 'iframe':
+            self._ignore += 1
+            return
+        elif self._ignore:
+            # Nothing inside an ignored tag is content, embeds and line
+            # breaks included.
+            return
+
+        attrs = dict(attrs)
+
+        if tag == 'br':
+            self.newline()
+        elif tag == 'img':
+            if attrs.get('src'):
+                extra = {name: attrs[name] for name in ('alt', 'width', 'height')
+                         if attrs.get(name)}
+                self.embed({'image': attrs['src']}, extra)
+        elif tag == 'iframe':
+            if attrs.get('src'):
+                self.embed({'video': attrs['src']})
+            self._ignore += 1
+        elif tag in LIST_TAGS:
+            if self._line_has_content:
+                self.newline()
+            self._lists.append(LIST_TAGS[tag])
+        elif tag in BLOCK_TAGS:
+            if self._line_has_content:
+                self.newline()
+            self._blocks.append((tag, BLOCK_TAGS[tag], self._newlines))
+        elif tag not in VOID_TAGS:
+            self._inline.append((tag, self.inline_format(tag, attrs)))
+            self.update_attributes()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in IGNORED_TAGS or tag == 'iframe':
+            self._ignore = max(self._ignore - 1, 0)
+        elif self._ignore:
+            return
+        elif tag in LIST_TAGS:
+            if self._line_has_content:
+                self.newline()
+            if self._lists:
+                self._lists.pop()
+        elif tag in BLOCK_TAGS:
+            index = self.find(self._blocks, tag)
+
+            if index is not None:
+                if self._line_has_content or \
+                        self._blocks[index][2] == self._newlines:
+                    self.newline()
+                del self._blocks[index:]
+        elif tag not in VOID_TAGS:
+            index = self.find(self._inline, tag)
+
+            if index is not None:
+                del self._inline[index:]
+                self.update_attributes()
+
+    def handle_data(self, data):
+        if self._ignore:
+            return
+
+        if self.in_pre():
+            lines = data.split('\n')
+
+            for index, line in enumerate(lines):
+                if index:
+                    self.newline()
+                if line:
+                    self.write(line)
+            return
+
+        data = whitespace_re.sub(' ', data)
+
+        if not self._line_has_content:
+            data = data.lstrip()
+
+        if data:
+            self.write(data)
+
+    @staticmethod
+    def find(stack: list, tag: str):
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index][0] == tag:
+                return index
+
+    @staticmethod
+    def inline_format(tag: str, attrs: dict):
+        format = {}
+
+        if tag in INLINE_TAGS:
+            name, value = INLINE_TAGS[tag]
+            format[name] = value
+        elif tag == 'a' and attrs.get('href'):
+            format['link'] = attrs['href']
+
+        for name, value in style_re.findall(attrs.get('style') or ''):
+            if name == 'color':
+                format['color'] = value
+            elif name == 'background-color':
+                format['background'] = value
+            elif name == 'font-weight' and value in ('bold', '700'):
+                format['bold'] = True
+            elif name == 'font-style' and value == 'italic':
+                format['italic'] = True
+
+        return format
+
+
+def parse_html(delta, source: Union[str, Iterable[str]]):
+    parser = DeltaHTMLParser(delta)
+
+    if isinstance(source, str):
+        parser.feed(source)
+    else:
+        for chunk in source:
+            parser.feed(chunk)
+
+    return parser.close()
@@ -0,0 +1,125 @@
+from typing import List, Sequence
+
+from .types import is_delete, is_insert
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+__all__ = ['transform_index', 'transform_positions']
+
+
+def transform_index(ops: Sequence, index: int, priority: bool = False,
+                    op_index: int = 0, offset: int = 0) -> int:
+    count = len(ops)
+
+    while op_index < count and offset <= index:
+        op = ops[op_index]
+        length = op.length
+        op_index += 1
+
+        if is_delete(op):
+            index -= min(length, index - offset)
+            continue
+        elif is_insert(op) and (offset < index or not priority):
+            index += length
+
+        offset += length
+
+    return index
+
+
+def transform_sorted(ops: Sequence, positions: Sequence[int],
+                     priority: bool = False) -> List[int]:
+    count = len(ops)
+    result = []
+    op_index = offset = shift = 0
+
+    for position in positions:
+        index = position + shift
+
+        # Operations that move every later position the same way are
+        # consumed once for all of them. Only a position that falls inside
+        # a delete, or on a priority insert, finishes on its own.
+        while op_index < count and offset <= index:
+            op = ops[op_index]
+            length = op.length
+
+            if is_delete(op):
+                if length > index - offset:
+                    index = transform_index(ops, index, priority,
+                                            op_index, offset)
+                    break
+
+                index -= length
+                shift -= length
+            elif is_insert(op):
+                if offset == index and priority:
+                    break
+
+                index += length
+                shift += length
+                offset += length
+            else:
+                offset += length
+
+            op_index += 1
+
+        result.append(index)
+
+    return result
+
+
+def transform_array(ops: Sequence, positions, priority: bool = False):
+    insert_at, insert_run, insert_lengths = [], [], []
+    delete_at, delete_lengths = [], []
+    base = run = 0
+
+    # A delete followed by an insert puts every position of the deleted
+    # range on the insert, so inserts also keep where that run started.
+    for op in ops:
+        length = op.length
+
+        if is_insert(op):
+            insert_at.append(base)
+            insert_run.append(base - run)
+            insert_lengths.append(length)
+        elif is_delete(op):
+            delete_at.append(base)
+            delete_lengths.append(length)
+            base += length
+            run += length
+        else:
+            base += length
+            run = 0
+
+    positions = numpy.asarray(positions, dtype=numpy.int64)
+    inserted = numpy.concatenate(([0], numpy.cumsum(insert_lengths,
+                                                    dtype=numpy.int64)))
+
+    if priority:
+        index = numpy.searchsorted(insert_at, positions, side='left')
+    else:
+        index = numpy.searchsorted(insert_run, positions, side='right')
+
+    result = positions + inserted[index]
+
+    if delete_at:
+        starts = numpy.asarray(delete_at, dtype=numpy.int64)
+        lengths = numpy.asarray(delete_lengths, dtype=numpy.int64)
+        deleted = numpy.concatenate(([0], numpy.cumsum(lengths)))
+        index = numpy.searchsorted(starts, positions, side='right')
+        last = numpy.maximum(index - 1, 0)
+        partial = numpy.clip(positions - starts[last], 0, lengths[last])
+        result -= numpy.where(index > 0, deleted[last] + partial, 0)
+
+    return result
+
+
+def transform_positions(ops: Sequence, positions: Sequence[int],
+                        priority: bool = False):
+    if numpy is not None and isinstance(positions, numpy.ndarray):
+        return transform_array(ops, positions, priority)
+
+    return transform_sorted(ops, positions, priority)
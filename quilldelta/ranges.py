@@ -0,0 +1,338 @@
+from collections import namedtuple
+from itertools import count
+from typing import Any, Iterator, List, Tuple
+
+from .positions import transform_positions
+from .types import is_insert, is_retain
+
+__all__ = ['Range', 'RangeSet']
+
+Range = namedtuple('Range', 'start, end, data')
+
+INFINITY = float('inf')
+
+# Ranges added after the index was built are kept aside and scanned, the
+# index is only rebuilt once there are more than this many.
+BUFFERED = 64
+
+
+class IntervalIndex:
+    __slots__ = ('ids', 'leaves', 'removed', '_size', '_low', '_high',
+                 '_reach', '_shift')
+
+    def __init__(self, ranges: dict):
+        ids = sorted(ranges, key=lambda key: ranges[key][:2])
+
+        self.ids = ids
+        self.leaves = {key: leaf for leaf, key in enumerate(ids)}
+        self.removed = 0
+
+        # Segment tree over the ranges sorted by start. Every node keeps the
+        # smallest and largest start and the largest end below it, so whole
+        # subtrees can be skipped or shifted at once. A shift that still has
+        # to reach the children of a node is kept in _shift.
+        size = 1
+        while size < len(ids):
+            size *= 2
+
+        low = [INFINITY] * (2 * size)
+        high = [-INFINITY] * (2 * size)
+        reach = [-INFINITY] * (2 * size)
+
+        for leaf, key in enumerate(ids, size):
+            low[leaf] = high[leaf] = ranges[key].start
+            reach[leaf] = ranges[key].end
+
+        for node in range(size - 1, 0, -1):
+            low[node] = min(low[2 * node], low[2 * node + 1])
+            high[node] = max(high[2 * node], high[2 * node + 1])
+            reach[node] = max(reach[2 * node], reach[2 * node + 1])
+
+        self._size = size
+        self._low = low
+        self._high = high
+        self._reach = reach
+        self._shift = [0] * size
+
+    def _move(self, node: int, shift: int):
+        self._low[node] += shift
+        self._high[node] += shift
+        self._reach[node] += shift
+
+        if node < self._size:
+            self._shift[node] += shift
+
+    def _push(self, node: int):
+        shift = self._shift[node]
+
+        if shift:
+            self._move(2 * node, shift)
+            self._move(2 * node + 1, shift)
+            self._shift[node] = 0
+
+    def _pull(self, node: int):
+        low, high, reach = self._low, self._high, self._reach
+        left, right = 2 * node, 2 * node + 1
+
+        low[node] = min(low[left], low[right])
+        high[node] = max(high[left], high[right])
+        reach[node] = max(reach[left], reach[right])
+
+    def _path(self, leaf: int) -> List[int]:
+        return [leaf >> depth
+                for depth in range(self._size.bit_length() - 1, 0, -1)]
+
+    def get(self, key: int) -> Tuple[int, int]:
+        leaf = self.leaves[key] + self._size
+        shift = sum(self._shift[node] for node in self._path(leaf))
+
+        return self._low[leaf] + shift, self._reach[leaf] + shift
+
+    def set(self, key: int, start: int, end: int):
+        leaf = self.leaves[key] + self._size
+        path = self._path(leaf)
+
+        for node in path:
+            self._push(node)
+
+        self._low[leaf] = self._high[leaf] = start
+        self._reach[leaf] = end
+
+        for node in reversed(path):
+            self._pull(node)
+
+    def remove(self, key: int):
+        self.set(key, INFINITY, -INFINITY)
+        self.ids[self.leaves.pop(key)] = None
+        self.removed += 1
+
+    def items(self) -> Iterator[Tuple[int, int, int]]:
+        for node in range(1, self._size):
+            self._push(node)
+
+        for leaf, key in enumerate(self.ids, self._size):
+            if key is not None:
+                yield key, self._low[leaf], self._reach[leaf]
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        low, reach, size = self._low, self._reach, self._size
+        found = []
+        stack = [1]
+
+        while stack:
+            node = stack.pop()
+
+            if low[node] > end or reach[node] < start:
+                continue
+
+            if node >= size:
+                found.append(self.ids[node - size])
+            else:
+                self._push(node)
+                stack.append(2 * node + 1)
+                stack.append(2 * node)
+
+        return found
+
+    def shift_after(self, position: int, shift: int, node: int = 1):
+        # Starts are sorted, so only the nodes on the border between the
+        # ranges starting up to position and the ones after it are split.
+        if self._high[node] <= position:
+            return
+
+        if self._low[node] > position:
+            self._move(node, shift)
+            return
+
+        self._push(node)
+        self.shift_after(position, shift, 2 * node)
+        self.shift_after(position, shift, 2 * node + 1)
+        self._pull(node)
+
+
+class RangeSet:
+    def __init__(self, document=None, expand_start: bool = False,
+                 expand_end: bool = False, drop_empty: bool = False):
+        self.expand_start = expand_start
+        self.expand_end = expand_end
+        self.drop_empty = drop_empty
+        self.document = document
+
+        self._data = {}
+        self._added = {}
+        self._ids = count()
+        self._index = None
+
+    @property
+    def document(self):
+        return self._document
+
+    @document.setter
+    def document(self, document):
+        self._document = document
+        self._length = None if document is None else document.length()
+
+    def __repr__(self):
+        return f'<RangeSet {len(self._data)} ranges at {id(self)}>'
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: int):
+        return key in self._data
+
+    def __getitem__(self, key: int) -> Range:
+        data = self._data[key]
+
+        if key in self._added:
+            return self._added[key]
+
+        return Range(*self._index.get(key), data)
+
+    def __iter__(self) -> Iterator[Tuple[int, Range]]:
+        return iter(sorted(self._items().items(),
+                           key=lambda item: item[1][:2]))
+
+    def _items(self) -> dict:
+        ranges = {}
+
+        if self._index is not None:
+            for key, start, end in self._index.items():
+                ranges[key] = Range(start, end, self._data[key])
+
+        ranges.update(self._added)
+
+        return ranges
+
+    def index(self) -> IntervalIndex:
+        if self._index is None or self._added:
+            self._index = IntervalIndex(self._items())
+            self._added.clear()
+        return self._index
+
+    def add(self, start: int, end: int, data: Any = None) -> int:
+        if not 0 <= start <= end:
+            raise ValueError(f'Invalid range ({start}, {end})')
+
+        if self._length is not None and end > self._length:
+            raise ValueError(f'Range ({start}, {end}) is past the end of '
+                             f'the document')
+
+        key = next(self._ids)
+        self._data[key] = data
+        self._added[key] = Range(start, end, data)
+
+        return key
+
+    def remove(self, key: int) -> Range:
+        removed = self[key]
+        del self._data[key]
+
+        if key in self._added:
+            del self._added[key]
+        else:
+            self._index.remove(key)
+
+            if self._index.removed > len(self._index.leaves):
+                self._added = self._items()
+                self._index = None
+
+        return removed
+
+    def clear(self):
+        self._data.clear()
+        self._added.clear()
+        self._index = None
+
+    def overlapping(self, start: int, end: int = None) -> List[int]:
+        end = start if end is None else end
+
+        if self._index is None:
+            self.index()
+
+        found = self._index.overlapping(start, end)
+        found.extend(key for key, item in self._added.items()
+                     if item.start <= end and item.end >= start)
+
+        return found
+
+    def apply(self, change):
+        ops = change.ops
+
+        if self._document is not None:
+            self._document = self._document.compose(change)
+
+        # Only inserts and deletes move positions. Everything before the
+        # first one stays, everything after the last one moves by the
+        # same amount.
+        position = shift = 0
+        first = last = None
+
+        for op in ops:
+            if is_retain(op):
+                position += op.length
+                continue
+
+            if first is None:
+                first = position
+
+            if is_insert(op):
+                shift += op.length
+            else:
+                shift -= op.length
+                position += op.length
+
+            last = position
+
+        if self._length is not None:
+            self._length += shift
+
+        if first is None or not self._data:
+            return self
+
+        if self._index is None or len(self._added) > BUFFERED:
+            self.index()
+
+        index = self._index
+        touched = {key: index.get(key)
+                   for key in index.overlapping(first, last)}
+
+        if shift:
+            index.shift_after(last, shift)
+
+        for key, item in self._added.items():
+            touched[key] = item[:2]
+
+        keys = list(touched)
+        starts = sorted(keys, key=lambda key: touched[key][0])
+        ends = sorted(keys, key=lambda key: touched[key][1])
+
+        moved_starts = transform_positions(
+            ops, [touched[key][0] for key in starts], self.expand_start)
+        moved_ends = transform_positions(
+            ops, [touched[key][1] for key in ends], not self.expand_end)
+
+        moved = {key: [start] for key, start in zip(starts, moved_starts)}
+        for key, end in zip(ends, moved_ends):
+            moved[key].append(end)
+
+        dropped = []
+
+        for key, (start, end) in moved.items():
+            previous = touched[key]
+
+            if start > end:
+                start = end
+
+            if self.drop_empty and start == end and \
+                    previous[0] < previous[1]:
+                dropped.append(key)
+            elif key in self._added:
+                self._added[key] = Range(start, end, self._data[key])
+            else:
+                index.set(key, start, end)
+
+        for key in dropped:
+            self.remove(key)
+
+        return self
@@ -0,0 +1,528 @@
+import io
+import re
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import OrderedDict
+from html import escape
+from itertools import accumulate
+
+from . import utils as _
+from .types import is_insert, is_retain, it_insert_text, it_retain_embed
+
+__all__ = ['LineRenderer', 'HtmlRenderer', 'MarkdownRenderer',
+           'RenderedDocument', 'html_renderer', 'markdown_renderer',
+           'sanitize_url']
+
+LINK_PROTOCOLS = ('http', 'https', 'mailto', 'tel', 'sms')
+IMAGE_PROTOCOLS = ('http', 'https', 'data')
+SANITIZED_URL = 'about:blank'
+
+# Browsers ignore control characters and spaces inside a scheme
+URL_IGNORED = re.compile(r'[\x00-\x20\x7f]')
+URL_SCHEME = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.\-]*):')
+
+
+def sanitize_url(url, protocols=LINK_PROTOCOLS) -> str:
+    url = str(url)
+    match = URL_SCHEME.match(URL_IGNORED.sub('', url))
+
+    # Relative URLs have no scheme and are kept as they are
+    if match is not None and match.group(1).lower() not in protocols:
+        return SANITIZED_URL
+
+    return url
+
+
+def header_level(attributes: dict):
+    level = attributes.get('header')
+
+    if type(level) is int and 1 <= level <= 6:
+        return level
+
+    return None
+
+
+def indent_level(attributes: dict) -> int:
+    level = attributes.get('indent')
+
+    if type(level) is int and level > 0:
+        return level
+
+    return 0
+
+
+class LineRenderer(ABC):
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, delta) -> str:
+        sink = io.StringIO()
+        self.write(delta, sink)
+        return sink.getvalue()
+
+    def write(self, delta, sink):
+        group = None
+
+        def visit(line, attributes, index):
+            nonlocal group
+            line_group = self.line_group(attributes)
+
+            if line_group != group:
+                if group is not None:
+                    sink.write(self.close_group(group))
+                if line_group is not None:
+                    sink.write(self.open_group(line_group))
+                group = line_group
+
+            sink.write(self.cached_line(line, attributes))
+
+        delta.each_line(visit)
+
+        if group is not None:
+            sink.write(self.close_group(group))
+
+    def cached_line(self, line, attributes: dict) -> str:
+        key = (_.freeze_typed(tuple(line.ops)), _.freeze_typed(attributes))
+
+        with self._lock:
+            value = self._cache.get(key)
+
+            if value is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return value
+
+            self.misses += 1
+
+        value = self.render_line(line, attributes)
+
+        with self._lock:
+            self._cache[key] = value
+
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def track(self, document):
+        return RenderedDocument(self, document)
+
+    def transition(self, previous, group) -> str:
+        if group == previous:
+            return ''
+
+        output = ''
+        if previous is not None:
+            output += self.close_group(previous)
+        if group is not None:
+            output += self.open_group(group)
+        return output
+
+    def line_group(self, attributes: dict):
+        return None
+
+    def open_group(self, group) -> str:
+        return ''
+
+    def close_group(self, group) -> str:
+        return ''
+
+    @abstractmethod
+    def render_line(self, line, attributes: dict) -> str:
+        pass
+
+
+class HtmlRenderer(LineRenderer):
+    inline_tags = (
+        ('link', 'a'),
+        ('script', None),
+        ('bold', 'strong'),
+        ('italic', 'em'),
+        ('underline', 'u'),
+        ('strike', 's'),
+        ('code', 'code'),
+    )
+    inline_styles = (
+        ('color', 'color'),
+        ('background', 'background-color'),
+        ('font', 'font-family'),
+        ('size', 'font-size'),
+    )
+
+    def line_group(self, attributes: dict):
+        if attributes.get('code-block'):
+            return 'pre'
+        if attributes.get('list') == 'ordered':
+            return 'ol'
+        if attributes.get('list'):
+            return 'ul'
+
+    def open_group(self, group) -> str:
+        return f'<{group}>'
+
+    def close_group(self, group) -> str:
+        return f'</{group}>'
+
+    def render_line(self, line, attributes: dict) -> str:
+        if attributes.get('code-block'):
+            return ''.join(escape(op.value, quote=False) for op in line.ops
+                           if it_insert_text(op)) + '\n'
+
+        content = ''.join(self.render_op(op) for op in line.ops) or '<br>'
+
+        if header_level(attributes):
+            tag = f'h{header_level(attributes)}'
+        elif attributes.get('list'):
+            tag = 'li'
+        elif attributes.get('blockquote'):
+            tag = 'blockquote'
+        else:
+            tag = 'p'
+
+        return f'<{tag}{self.block_classes(attributes)}>{content}</{tag}>'
+
+    def block_classes(self, attributes: dict) -> str:
+        classes = []
+
+        if attributes.get('indent'):
+            classes.append(f'ql-indent-{attributes["indent"]}')
+        if attributes.get('align'):
+            classes.append(f'ql-align-{attributes["align"]}')
+        if attributes.get('direction'):
+            classes.append(f'ql-direction-{attributes["direction"]}')
+
+        if classes:
+            return f' class="{escape(" ".join(classes))}"'
+        return ''
+
+    def render_op(self, op) -> str:
+        attributes = op.attributes or {}
+
+        if it_insert_text(op):
+            content = escape(op.value, quote=False)
+        else:
+            content = self.render_embed(op.value, attributes)
+
+        styles = ';'.join(f'{prop}:{escape(str(attributes[name]))}'
+                          for name, prop in self.inline_styles
+                          if attributes.get(name))
+
+        if styles:
+            content = f'<span style="{styles}">{content}</span>'
+
+        for name, tag in reversed(self.inline_tags):
+            value = attributes.get(name)
+
+            if not value:
+                continue
+
+            if name == 'link':
+                href = escape(sanitize_url(value))
+                content = f'<a href="{href}">{content}</a>'
+            elif name == 'script':
+                tag = 'sub' if value == 'sub' else 'sup'
+                content = f'<{tag}>{content}</{tag}>'
+            else:
+                content = f'<{tag}>{content}</{tag}>'
+
+        return content
+
+    def render_embed(self, value, attributes: dict) -> str:
+        if not isinstance(value, dict):
+            return ''
+
+        if 'image' in value:
+            extra = ''.join(f' {name}="{escape(str(attributes[name]))}"'
+                            for name in ('alt', 'width', 'height')
+                            if attributes.get(name))
+            src = sanitize_url(value['image'], IMAGE_PROTOCOLS)
+            return f'<img src="{escape(src)}"{extra}>'
+        elif 'video' in value:
+            return (f'<iframe class="ql-video" frameborder="0" '
+                    f'allowfullscreen="true" '
+                    f'src="{escape(sanitize_url(value["video"]))}">'
+                    f'</iframe>')
+        elif 'formula' in value:
+            return (f'<span class="ql-formula">'
+                    f'{escape(str(value["formula"]), quote=False)}</span>')
+
+        return ''
+
+
+class RenderedDocument:
+    # Keeps the rendered output of a document line by line, so applying a
+    # change only composes and renders the lines it touches.
+    __slots__ = ('renderer', 'lines', 'attributes', 'lengths', 'rendered',
+                 'groups', 'chunks', '_starts')
+
+    def __init__(self, renderer: LineRenderer, document):
+        self.renderer = renderer
+        self.lines = []
+        self.attributes = []
+        self.lengths = []
+        self.rendered = []
+        self.groups = []
+        self.chunks = []
+        self._starts = None
+
+        self._replace(0, 0, document)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __str__(self):
+        return self.getvalue()
+
+    def _split(self, region):
+        lines, attributes, lengths = [], [], []
+
+        def visit(line, line_attributes, index):
+            lines.append(line)
+            attributes.append(line_attributes)
+            lengths.append(line.length() + 1)
+
+        region.each_line(visit)
+
+        # each_line does not tell an unterminated last line apart
+        if lengths and sum(lengths) > region.length():
+            lengths[-1] -= 1
+            attributes[-1] = None
+
+        return lines, attributes, lengths
+
+    def _replace(self, start: int, end: int, region):
+        lines, attributes, lengths = self._split(region)
+        renderer = self.renderer
+        rendered = [renderer.cached_line(line, line_attributes or {})
+                    for line, line_attributes in zip(lines, attributes)]
+        groups = [renderer.line_group(line_attributes or {})
+                  for line_attributes in attributes]
+
+        self.lines[start:end] = lines
+        self.attributes[start:end] = attributes
+        self.lengths[start:end] = lengths
+        self.rendered[start:end] = rendered
+        self.groups[start:end] = groups
+        self._starts = None
+
+        # Group markers depend on the previous line, so the line after the
+        # replaced ones gets its chunk again too.
+        stop = min(start + len(lines) + 1, len(self.lines))
+        self.chunks[start:end] = [None] * len(lines)
+
+        for index in range(start, stop):
+            previous = self.groups[index - 1] if index else None
+            self.chunks[index] = renderer.transition(
+                previous, self.groups[index]) + self.rendered[index]
+
+    def starts(self):
+        if self._starts is None:
+            self._starts = [0]
+            self._starts.extend(accumulate(self.lengths))
+        return self._starts
+
+    def _line_at(self, position: int) -> int:
+        return min(bisect_right(self.starts(), position) - 1,
+                   len(self.lines) - 1)
+
+    def region(self, start: int, end: int):
+        from .delta import Delta
+
+        region = Delta()
+
+        for index in range(start, end):
+            region._extend(self.lines[index].ops)
+
+            if self.attributes[index] is not None:
+                region.insert('\n', self.attributes[index])
+
+        return region
+
+    def apply(self, change):
+        position = 0
+        first = end = None
+
+        # Only the span between the first and the last operation that is
+        # not a plain retain can change.
+        for op in change.ops:
+            if is_retain(op) and not op.attributes and \
+                    not it_retain_embed(op):
+                position += op.length
+                continue
+
+            if first is None:
+                first = position
+            if not is_insert(op):
+                position += op.length
+            end = position
+
+        if end is None:
+            return self
+        elif not self.lines:
+            self._replace(0, 0, self.document().compose(change))
+            return self
+
+        start_line = self._line_at(first)
+        end_line = self._line_at(end)
+        offset = self.starts()[start_line]
+
+        local = change.slice(offset) if offset else change
+        region = self.region(start_line, end_line + 1).compose(local)
+        self._replace(start_line, end_line + 1, region)
+
+        return self
+
+    def document(self):
+        return self.region(0, len(self.lines))
+
+    def write(self, sink):
+        for chunk in self.chunks:
+            sink.write(chunk)
+
+        if self.groups and self.groups[-1] is not None:
+            sink.write(self.renderer.close_group(self.groups[-1]))
+
+    def getvalue(self) -> str:
+        sink = io.StringIO()
+        self.write(sink)
+        return sink.getvalue()
+
+
+html_renderer = HtmlRenderer()
+
+
+class MarkdownRenderer(LineRenderer):
+    inline_marks = (
+        ('code', '`'),
+        ('strike', '~~'),
+        ('italic', '_'),
+        ('bold', '**'),
+    )
+    escape_chars = re.compile(r'([\\`*_\[\]#<>~|])')
+    # List markers and thematic breaks not already escaped as inline text
+    block_start = re.compile(r' {0,3}(?:[-+]|\d+[.)])')
+    backticks = re.compile(r'`+')
+    url_chars = str.maketrans({' ': '%20', '(': '%28', ')': '%29',
+                               '\n': '%0A', '<': '%3C', '>': '%3E'})
+
+    def escape(self, text: str) -> str:
+        return self.escape_chars.sub(r'\\\1', text)
+
+    def escape_block(self, content: str) -> str:
+        match = self.block_start.match(content)
+
+        if match is None:
+            return content
+
+        end = match.end() - 1
+        return f'{content[:end]}\\{content[end:]}'
+
+    def code_span(self, text: str) -> str:
+        # The fence has to be longer than any run of backticks inside
+        fence = '`' * (max(map(len, self.backticks.findall(text)),
+                           default=0) + 1)
+
+        if text.startswith('`') or text.endswith('`'):
+            text = f' {text} '
+
+        return f'{fence}{text}{fence}'
+
+    def url(self, url, protocols=LINK_PROTOCOLS) -> str:
+        return sanitize_url(url, protocols).translate(self.url_chars)
+
+    def line_group(self, attributes: dict):
+        if attributes.get('code-block'):
+            return 'code'
+        if attributes.get('list'):
+            return 'list'
+
+    def open_group(self, group) -> str:
+        return '```\n' if group == 'code' else ''
+
+    def close_group(self, group) -> str:
+        return '```\n\n' if group == 'code' else '\n'
+
+    def render_line(self, line, attributes: dict) -> str:
+        if attributes.get('code-block'):
+            return ''.join(op.value for op in line.ops
+                           if it_insert_text(op)) + '\n'
+
+        content = self.escape_block(
+            ''.join(self.render_op(op) for op in line.ops))
+        indent = '    ' * indent_level(attributes)
+
+        if attributes.get('list') == 'ordered':
+            return f'{indent}1. {content}\n'
+        elif attributes.get('list'):
+            marker = {'checked': '- [x]', 'unchecked': '- [ ]'}.get(
+                attributes['list'], '-')
+            return f'{indent}{marker} {content}\n'
+        elif not content:
+            return ''
+        elif header_level(attributes):
+            return f'{"#" * header_level(attributes)} {content}\n\n'
+        elif attributes.get('blockquote'):
+            return f'> {content}\n\n'
+
+        return f'{content}\n\n'
+
+    def render_op(self, op) -> str:
+        attributes = op.attributes or {}
+
+        if it_insert_text(op):
+            if attributes.get('code'):
+                content = op.value
+            else:
+                content = self.escape(op.value)
+        else:
+            content = self.render_embed(op.value, attributes)
+
+        stripped = content.strip()
+
+        if not stripped:
+            return content
+
+        # Emphasis markers must hug the text, so keep surrounding spaces out
+        head, content, tail = content.partition(stripped)
+
+        for name, mark in self.inline_marks:
+            if not attributes.get(name):
+                continue
+
+            if name == 'code':
+                content = self.code_span(content)
+            else:
+                content = f'{mark}{content}{mark}'
+
+        if attributes.get('link'):
+            content = f'[{content}]({self.url(attributes["link"])})'
+
+        return f'{head}{content}{tail}'
+
+    def render_embed(self, value, attributes: dict) -> str:
+        if not isinstance(value, dict):
+            return ''
+
+        if 'image' in value:
+            alt = self.escape(str(attributes.get('alt') or ''))
+            return f'![{alt}]({self.url(value["image"], IMAGE_PROTOCOLS)})'
+        elif 'video' in value:
+            url = self.url(value['video'])
+            return f'[{self.escape(url)}]({url})'
+        elif 'formula' in value:
+            return f'${value["formula"]}$'
+
+        return ''
+
+
+markdown_renderer = MarkdownRenderer()
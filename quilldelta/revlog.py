@@ -0,0 +1,386 @@
+import io
+import json
+import lzma
+import zlib
+from typing import BinaryIO, Iterable, Iterator, List
+
+from .delta import Delta
+from .types import (Delete, Insert, Retain, is_delete, is_retain,
+                    it_insert_text, it_retain_embed)
+
+__all__ = ['RevisionLogWriter', 'RevisionLogReader', 'encode', 'decode']
+
+MAGIC = b'QDRL'
+VERSION = 1
+
+ZLIB, LZMA = 'zlib', 'lzma'
+COMPRESSIONS = (ZLIB, LZMA)
+
+(RETAIN, RELATIVE_RETAIN, INSERT_TEXT, INSERT_EMBED, DELETE,
+ RETAIN_EMBED) = range(6)
+
+# Seeds zlib with the attribute values quill documents use the most, so
+# even the first block of a log compresses well.
+DEFAULT_DICTIONARY = ' '.join(json.dumps(value, sort_keys=True) for value in (
+    {'bold': True}, {'italic': True}, {'underline': True}, {'strike': True},
+    {'code': True}, {'header': 1}, {'header': 2}, {'header': 3},
+    {'list': 'bullet'}, {'list': 'ordered'}, {'blockquote': True},
+    {'code-block': True}, {'align': 'center'}, {'align': 'right'},
+    {'indent': 1}, {'link': 'https://'}, {'color': '#'}, {'image': 'https://'},
+)).encode()
+
+
+def write_varint(buffer: bytearray, value: int):
+    while value > 0x7f:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data: bytes, offset: int):
+    value = shift = 0
+
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+
+        if byte < 0x80:
+            return value, offset
+
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+class Vocabulary:
+    __slots__ = ('ids', 'values')
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def write(self, buffer: bytearray, value):
+        # 0 is no value, a new entry is written inline the first time
+        if not value:
+            write_varint(buffer, 0)
+            return
+
+        key = json.dumps(value, sort_keys=True, separators=(',', ':'))
+        index = self.ids.get(key)
+
+        if index is not None:
+            write_varint(buffer, index + 1)
+            return
+
+        index = self.ids[key] = len(self.values)
+        self.values.append(value)
+        data = key.encode()
+        write_varint(buffer, index + 1)
+        write_varint(buffer, len(data))
+        buffer += data
+
+    def read(self, data: bytes, offset: int):
+        index, offset = read_varint(data, offset)
+
+        if index == 0:
+            return None, offset
+
+        index -= 1
+
+        if index == len(self.values):
+            size, offset = read_varint(data, offset)
+            self.values.append(json.loads(data[offset:offset + size]))
+            offset += size
+
+        value = self.values[index]
+        return dict(value) if isinstance(value, dict) else value, offset
+
+
+def _compressor(compression: str, dictionary: bytes, level: int):
+    if compression == LZMA:
+        preset = 6 if level is None else level
+        return lzma.LZMACompressor(format=lzma.FORMAT_RAW, filters=[
+            {'id': lzma.FILTER_LZMA2, 'preset': preset}])
+
+    level = 9 if level is None else level
+
+    if dictionary:
+        return zlib.compressobj(level, zdict=dictionary)
+    return zlib.compressobj(level)
+
+
+def _decompressor(compression: str, dictionary: bytes):
+    if compression == LZMA:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=[
+            {'id': lzma.FILTER_LZMA2}])
+
+    if dictionary:
+        return zlib.decompressobj(zdict=dictionary)
+    return zlib.decompressobj()
+
+
+class RevisionLogWriter:
+    def __init__(self, stream: BinaryIO, compression: str = ZLIB,
+                 block_size: int = 64, level: int = None,
+                 dictionary: bytes = DEFAULT_DICTIONARY):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Unknown compression {compression!r}')
+
+        assert block_size > 0, f'Invalid block_size {block_size}'
+
+        self.stream = stream
+        self.compression = compression
+        self.block_size = block_size
+        self.level = level
+        self.dictionary = dictionary if compression == ZLIB else b''
+
+        self.changes = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+        self._vocabulary = Vocabulary()
+        self._previous = 0
+        self._block = bytearray()
+        self._pending = 0
+
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        header.append(COMPRESSIONS.index(compression))
+        header += zlib.crc32(self.dictionary).to_bytes(4, 'little')
+        stream.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, change: Delta):
+        buffer = self._block
+        ops = change.ops
+        write_varint(buffer, len(ops))
+
+        for index, op in enumerate(ops):
+            if it_retain_embed(op):
+                write_varint(buffer, RETAIN_EMBED)
+                self._vocabulary.write(buffer, op.value)
+                self._vocabulary.write(buffer, op.attributes)
+            elif is_retain(op):
+                # Consecutive changes tend to start close to each other,
+                # so the leading retain is stored relative to the last one.
+                if index == 0:
+                    write_varint(buffer, RELATIVE_RETAIN)
+                    write_varint(buffer, _zigzag(op.value - self._previous))
+                    self._previous = op.value
+                else:
+                    write_varint(buffer, RETAIN)
+                    write_varint(buffer, op.value)
+                self._vocabulary.write(buffer, op.attributes)
+            elif is_delete(op):
+                write_varint(buffer, DELETE)
+                write_varint(buffer, op.value)
+            elif it_insert_text(op):
+                data = str(op.value).encode()
+                write_varint(buffer, INSERT_TEXT)
+                write_varint(buffer, len(data))
+                buffer += data
+                self._vocabulary.write(buffer, op.attributes)
+            else:
+                write_varint(buffer, INSERT_EMBED)
+                self._vocabulary.write(buffer, op.value)
+                self._vocabulary.write(buffer, op.attributes)
+
+        self.changes += 1
+        self._pending += 1
+
+        if self._pending >= self.block_size:
+            self.flush()
+
+    def extend(self, changes: Iterable[Delta]):
+        for change in changes:
+            self.write(change)
+
+    def flush(self):
+        if not self._pending:
+            return
+
+        compressor = _compressor(self.compression, self.dictionary,
+                                 self.level)
+        data = compressor.compress(bytes(self._block)) + compressor.flush()
+
+        header = bytearray()
+        write_varint(header, self._pending)
+        write_varint(header, len(data))
+        self.stream.write(bytes(header) + data)
+
+        self.raw_bytes += len(self._block)
+        self.compressed_bytes += len(data)
+        self._block = bytearray()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+
+    def stats(self):
+        return {
+            'changes': self.changes,
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'ratio': self.raw_bytes / self.compressed_bytes
+            if self.compressed_bytes else 0.0,
+        }
+
+
+class RevisionLogReader:
+    def __init__(self, stream: BinaryIO,
+                 dictionary: bytes = DEFAULT_DICTIONARY):
+        header = stream.read(10)
+
+        if len(header) < 10 or header[:4] != MAGIC or \
+                header[4] != VERSION or header[5] >= len(COMPRESSIONS):
+            raise ValueError('Not a version 1 revision log')
+
+        self.stream = stream
+        self.compression = COMPRESSIONS[header[5]]
+        self.dictionary = dictionary if self.compression == ZLIB else b''
+
+        if zlib.crc32(self.dictionary) != int.from_bytes(header[6:10],
+                                                         'little'):
+            raise ValueError('The revision log uses a different dictionary')
+
+        self._vocabulary = Vocabulary()
+        self._previous = 0
+
+    def _read_varint(self):
+        value = shift = 0
+
+        while True:
+            byte = self.stream.read(1)
+
+            if not byte:
+                if shift:
+                    raise ValueError('Truncated revision log')
+                return None
+
+            value |= (byte[0] & 0x7f) << shift
+
+            if byte[0] < 0x80:
+                return value
+
+            shift += 7
+
+    def blocks(self) -> Iterator[List[Delta]]:
+        while True:
+            count = self._read_varint()
+
+            if count is None:
+                return
+
+            size = self._read_varint()
+
+            if size is None:
+                raise ValueError('Truncated revision log')
+
+            data = self.stream.read(size)
+
+            if len(data) != size:
+                raise ValueError('Truncated revision log')
+
+            decompressor = _decompressor(self.compression, self.dictionary)
+
+            # Decoders raise their own errors on corrupt data, callers only
+            # have to handle ValueError like for every other invalid input
+            try:
+                block = self._decode_block(decompressor.decompress(data),
+                                           count)
+            except (zlib.error, lzma.LZMAError, IndexError) as error:
+                raise ValueError(f'Corrupt revision log: {error}') from error
+
+            yield block
+
+    def _decode_block(self, data: bytes, count: int) -> List[Delta]:
+        vocabulary = self._vocabulary
+        changes = []
+        offset = 0
+
+        for _ in range(count):
+            size, offset = read_varint(data, offset)
+            change = Delta()
+            ops = change.ops
+
+            # Changes were normalized when written, ops are appended as is
+            for _ in range(size):
+                tag, offset = read_varint(data, offset)
+
+                if tag == RELATIVE_RETAIN:
+                    value, offset = read_varint(data, offset)
+                    self._previous += _unzigzag(value)
+                    attributes, offset = vocabulary.read(data, offset)
+                    ops.append(Retain(self._previous, attributes))
+                elif tag == RETAIN:
+                    value, offset = read_varint(data, offset)
+                    attributes, offset = vocabulary.read(data, offset)
+                    ops.append(Retain(value, attributes))
+                elif tag == DELETE:
+                    value, offset = read_varint(data, offset)
+                    ops.append(Delete(value))
+                elif tag == INSERT_TEXT:
+                    value, offset = read_varint(data, offset)
+                    text = data[offset:offset + value].decode()
+                    offset += value
+                    attributes, offset = vocabulary.read(data, offset)
+                    ops.append(Insert(text, attributes))
+                elif tag == INSERT_EMBED:
+                    value, offset = vocabulary.read(data, offset)
+                    attributes, offset = vocabulary.read(data, offset)
+                    ops.append(Insert(value, attributes))
+                elif tag == RETAIN_EMBED:
+                    value, offset = vocabulary.read(data, offset)
+                    attributes, offset = vocabulary.read(data, offset)
+                    ops.append(Retain(value, attributes))
+                else:
+                    raise ValueError(f'Unknown operation tag {tag}')
+
+            changes.append(change)
+
+        return changes
+
+    def __iter__(self) -> Iterator[Delta]:
+        for block in self.blocks():
+            yield from block
+
+    def replay(self, document: Delta = None) -> Delta:
+        document = Delta() if document is None else document
+
+        # Each block is composed on its own first, so the document is
+        # only rewritten once per block. Compose is associative, removed
+        # attributes included, so this matches applying them one by one.
+        for block in self.blocks():
+            change = block[0]
+
+            for other in block[1:]:
+                change = change.compose(other)
+
+            document = document.compose(change)
+
+        return document
+
+
+def encode(changes: Iterable[Delta], **kwargs) -> bytes:
+    stream = io.BytesIO()
+
+    with RevisionLogWriter(stream, **kwargs) as writer:
+        writer.extend(changes)
+
+    return stream.getvalue()
+
+
+def decode(data: bytes, **kwargs) -> List[Delta]:
+    return list(RevisionLogReader(io.BytesIO(data), **kwargs))
@@ -0,0 +1,302 @@
+import json
+import mmap
+import struct
+from typing import BinaryIO, Dict, Iterator, Tuple, Union
+
+from .delta import Delta
+from .types import (Delete, Insert, Retain, is_delete, is_retain,
+                    it_insert_text, it_retain_embed)
+from .unicode import (CODE_POINTS, UTF16, get_length_unit, text_length,
+                      to_units)
+
+__all__ = ['MmapDelta', 'write_mmap']
+
+MAGIC = b'QDLT'
+VERSION = 1
+
+# magic, version, length unit, op count, document length, newline count,
+# pool count and the offsets of the tables that follow the header.
+HEADER = struct.Struct('<4sBBxxQQQQQQQQQQ')
+RECORD = struct.Struct('<BxxxIQQ')
+OFFSET = struct.Struct('<Q')
+POOL_ENTRY = struct.Struct('<QQ')
+
+INSERT_TEXT, INSERT_EMBED, RETAIN, DELETE, RETAIN_EMBED = range(5)
+NO_ATTRIBUTES = 0xFFFFFFFF
+UNITS = (CODE_POINTS, UTF16)
+
+# Long inserts are stored in chunks so reading a slice never decodes more
+# than a chunk around each end.
+CHUNK_SIZE = 4096
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def write_mmap(delta: Delta, target: Union[str, BinaryIO]):
+    if isinstance(target, str):
+        with open(target, 'wb') as stream:
+            return write_mmap(delta, stream)
+
+    records = []
+    lengths = [0]
+    newlines = []
+    text = bytearray()
+    pool = {}
+    position = 0
+
+    def pooled(value) -> int:
+        key = json.dumps(value, sort_keys=True)
+        return pool.setdefault(key, len(pool))
+
+    def add(kind: int, attributes, first: int, second: int, length: int):
+        nonlocal position
+        attributes_id = NO_ATTRIBUTES if not attributes else \
+            pooled(attributes)
+        records.append(RECORD.pack(kind, attributes_id, first, second))
+        position += length
+        lengths.append(position)
+
+    for op in delta.ops:
+        if it_insert_text(op):
+            value = str(op.value)
+
+            for start in range(0, len(value), CHUNK_SIZE):
+                chunk = value[start:start + CHUNK_SIZE]
+                index = chunk.find('\n')
+
+                while index >= 0:
+                    newlines.append(position + to_units(chunk, index))
+                    index = chunk.find('\n', index + 1)
+
+                data = chunk.encode()
+                add(INSERT_TEXT, op.attributes, len(text), len(data),
+                    text_length(chunk))
+                text += data
+        elif it_retain_embed(op):
+            add(RETAIN_EMBED, op.attributes, pooled(op.value), 0, 1)
+        elif is_retain(op):
+            add(RETAIN, op.attributes, op.value, 0, op.value)
+        elif is_delete(op):
+            add(DELETE, None, op.value, 0, op.value)
+        else:
+            add(INSERT_EMBED, op.attributes, pooled(op.value), 0, 1)
+
+    pool_data = bytearray()
+    pool_index = []
+
+    for key in pool:
+        data = key.encode()
+        pool_index.append(POOL_ENTRY.pack(len(pool_data), len(data)))
+        pool_data += data
+
+    offset = HEADER.size
+    ops_offset = offset
+    offset += RECORD.size * len(records)
+    lengths_offset = offset
+    offset += OFFSET.size * len(lengths)
+    newlines_offset = offset
+    offset += OFFSET.size * len(newlines)
+    pool_index_offset = offset
+    offset += POOL_ENTRY.size * len(pool_index)
+    pool_offset = offset
+    offset += len(pool_data) + _pad(len(pool_data))
+    text_offset = offset
+
+    target.write(HEADER.pack(
+        MAGIC, VERSION, UNITS.index(get_length_unit()), len(records),
+        position, len(newlines), len(pool_index), ops_offset,
+        lengths_offset, newlines_offset, pool_index_offset, pool_offset,
+        text_offset))
+    target.write(b''.join(records))
+    target.write(struct.pack(f'<{len(lengths)}Q', *lengths))
+    target.write(struct.pack(f'<{len(newlines)}Q', *newlines))
+    target.write(b''.join(pool_index))
+    target.write(pool_data)
+    target.write(b'\0' * _pad(len(pool_data)))
+    target.write(text)
+
+
+class MmapDelta:
+    def __init__(self, path: str):
+        with open(path, 'rb') as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+
+        try:
+            header = HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            self.close()
+            raise ValueError(f'{path} is not a delta file')
+
+        (magic, version, unit, self._count, self._length, self._newlines,
+         self._pool_count, self._ops_offset, self._lengths_offset,
+         self._newlines_offset, self._pool_index_offset, self._pool_offset,
+         self._text_offset) = header
+
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a version {VERSION} delta file')
+
+        # A truncated file would only fail when a table is read
+        tables = (
+            (self._ops_offset, RECORD.size * self._count),
+            (self._lengths_offset, OFFSET.size * (self._count + 1)),
+            (self._newlines_offset, OFFSET.size * self._newlines),
+            (self._pool_index_offset, POOL_ENTRY.size * self._pool_count),
+        )
+
+        if unit >= len(UNITS) or self._text_offset > len(self._mmap) or \
+                any(start + size > len(self._mmap)
+                    for start, size in tables):
+            self.close()
+            raise ValueError(f'{path} is a truncated or corrupt delta file')
+
+        if UNITS[unit] != get_length_unit():
+            self.close()
+            raise ValueError(f'{path} was written with {UNITS[unit]} '
+                             f'lengths, not {get_length_unit()}')
+
+        self._pool = {}
+
+    def __repr__(self):
+        return f'<MmapDelta {self._count} ops at 0x{id(self)}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index: int):
+        index = range(self._count)[index]
+        kind, attributes_id, first, second = RECORD.unpack_from(
+            self._mmap, self._ops_offset + index * RECORD.size)
+        attributes = None
+
+        if attributes_id != NO_ATTRIBUTES:
+            attributes = dict(self._pooled(attributes_id))
+
+        if kind == INSERT_TEXT:
+            start = self._text_offset + first
+            return Insert(self._mmap[start:start + second].decode(),
+                          attributes)
+        elif kind == INSERT_EMBED:
+            return Insert(dict(self._pooled(first)), attributes)
+        elif kind == RETAIN:
+            return Retain(first, attributes)
+        elif kind == RETAIN_EMBED:
+            return Retain(dict(self._pooled(first)), attributes)
+        else:
+            return Delete(first)
+
+    def __iter__(self) -> Iterator:
+        return (self[index] for index in range(self._count))
+
+    def _pooled(self, index: int) -> Dict:
+        value = self._pool.get(index)
+
+        if value is None:
+            if index >= self._pool_count:
+                raise ValueError(f'Unknown pool entry {index}')
+
+            offset, size = POOL_ENTRY.unpack_from(
+                self._mmap, self._pool_index_offset + index * POOL_ENTRY.size)
+            start = self._pool_offset + offset
+            value = self._pool[index] = json.loads(
+                self._mmap[start:start + size])
+
+        return value
+
+    def _offset(self, table: int, index: int) -> int:
+        return OFFSET.unpack_from(self._mmap, table + index * OFFSET.size)[0]
+
+    def _find_op(self, position: int) -> int:
+        # Last operation starting at or before position
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            if self._offset(self._lengths_offset, middle) <= position:
+                low = middle + 1
+            else:
+                high = middle
+
+        return max(low - 1, 0)
+
+    def length(self) -> int:
+        return self._length
+
+    def to_delta(self) -> Delta:
+        delta = Delta()
+
+        for op in self:
+            delta.push(op)
+
+        return delta
+
+    def slice(self, start: int = 0, end: int = None) -> Delta:
+        if end is None or end > self._length:
+            end = self._length
+
+        delta = Delta()
+
+        if start >= end or self._count == 0:
+            return delta
+
+        index = self._find_op(start)
+        base = self._offset(self._lengths_offset, index)
+
+        while index < self._count and \
+                self._offset(self._lengths_offset, index) < end:
+            delta.push(self[index])
+            index += 1
+
+        return delta.slice(start - base, end - base)
+
+    def line_count(self) -> int:
+        if self._newlines == 0:
+            return 1 if self._length else 0
+
+        last = self._offset(self._newlines_offset, self._newlines - 1)
+        return self._newlines + (1 if last + 1 < self._length else 0)
+
+    def line_range(self, index: int) -> Tuple[int, int]:
+        index = range(self.line_count())[index]
+        start = 0 if index == 0 else \
+            self._offset(self._newlines_offset, index - 1) + 1
+
+        if index < self._newlines:
+            return start, self._offset(self._newlines_offset, index)
+
+        return start, self._length
+
+    def line(self, index: int) -> Tuple[Delta, Dict]:
+        start, end = self.line_range(index)
+        attributes = {}
+
+        if end < self._length:
+            newline = self.slice(end, end + 1)
+            attributes = newline.ops[0].attributes or {}
+
+        return self.slice(start, end), attributes
+
+    def line_at(self, position: int) -> int:
+        newlines = self._newlines
+        low, high = 0, newlines
+
+        while low < high:
+            middle = (low + high) // 2
+            if self._offset(self._newlines_offset, middle) < position:
+                low = middle + 1
+            else:
+                high = middle
+
+        return min(low, max(self.line_count() - 1, 0))
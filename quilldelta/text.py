@@ -0,0 +1,87 @@
+import re
+from bisect import bisect_right
+from typing import Iterable, List, Pattern, Tuple, Union
+
+from .types import is_insert, it_insert_text
+from .unicode import (CODE_POINTS, astral_index, get_length_unit,
+                      to_code_points, to_units)
+
+__all__ = ['TextProjection']
+
+
+class TextProjection:
+    __slots__ = ('text', '_embeds', '_index')
+
+    def __init__(self, ops: Iterable):
+        chunks = []
+        embeds = []
+        text_length = 0
+
+        # Embeds are kept as the text offsets they sit at, in code points
+        for op in ops:
+            if it_insert_text(op):
+                chunks.append(op.value)
+                text_length += len(op.value)
+            elif is_insert(op):
+                embeds.append(text_length)
+
+        self.text = ''.join(chunks)
+        self._embeds = embeds
+        self._index = None
+
+    def __repr__(self):
+        return f'<TextProjection {len(self.text)} chars, ' \
+               f'{len(self._embeds)} embeds at {id(self)}>'
+
+    def _unit(self):
+        # The astral index of the whole text is built once, on first use
+        unit = get_length_unit()
+
+        if unit != CODE_POINTS and self._index is None:
+            self._index = astral_index(self.text)
+
+        return unit, self._index
+
+    def to_document(self, offset: int, end: bool = False) -> int:
+        embeds = bisect_right(self._embeds, offset - 1 if end else offset)
+        return to_units(self.text, offset, *self._unit()) + embeds
+
+    def to_text(self, offset: int) -> int:
+        unit, index = self._unit()
+        embeds = self._embeds
+        low, high = 0, len(embeds)
+
+        # Count embeds placed before the document offset
+        while low < high:
+            middle = (low + high) // 2
+            if to_units(self.text, embeds[middle], unit, index) + middle < \
+                    offset:
+                low = middle + 1
+            else:
+                high = middle
+
+        return to_code_points(self.text, offset - low, unit, index)
+
+    def find(self, pattern: Union[str, Pattern],
+             start: int = 0) -> List[Tuple[int, int]]:
+        ranges = []
+
+        if isinstance(pattern, str):
+            if not pattern:
+                return ranges
+
+            index = self.text.find(pattern, self.to_text(start))
+
+            while index >= 0:
+                end = index + len(pattern)
+                ranges.append((self.to_document(index),
+                               self.to_document(end, end=True)))
+                index = self.text.find(pattern, end)
+        else:
+            for match in re.compile(pattern).finditer(
+                    self.text, self.to_text(start)):
+                if match.end() > match.start():
+                    ranges.append((self.to_document(match.start()),
+                                   self.to_document(match.end(), end=True)))
+
+        return ranges
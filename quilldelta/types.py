@@ -3,10 +3,12 @@ from functools import partial
 from typing import Any, Dict, Union
 
 from quilldelta import utils as _
+from quilldelta.unicode import TextView, text_length
 
 __all__ = ['Insert', 'Retain', 'Delete', 'OperationType',
            'is_retain', 'is_insert', 'is_delete',
-           'it_insert_text', 'load_operation']
+           'it_insert_text', 'it_retain_embed', 'load_operation',
+           'hash_operation']
 
 
 def _sum_operation(instance, other):
@@ -39,13 +41,16 @@ class Insert(namedtuple('Insert', 'value, attributes')):
 
     @classmethod
     def fromdict(cls, data):
+        data = dict(data)
         data.setdefault('attributes', None)
         return _.dict_to_class(cls, data)
 
     @property
     def length(self):
         if isinstance(self.value, str):
-            return len(self.value)
+            return text_length(self.value)
+        elif isinstance(self.value, TextView):
+            return self.value.units()
         return 1
 
 
@@ -59,12 +64,13 @@ class Retain(namedtuple('Retain', 'value, attributes')):
 
     @classmethod
     def fromdict(cls, data: dict):
+        data = dict(data)
         data.setdefault('attributes', None)
         return _.dict_to_class(cls, data)
 
     @property
     def length(self):
-        return self.value
+        return 1 if isinstance(self.value, Dict) else self.value
 
     @length.setter
     def length(self, val: int):
@@ -82,7 +88,7 @@ class Delete(namedtuple('Delete', 'value')):
 
     @classmethod
     def fromdict(cls, data: dict):
-        return _.dict_to_class(cls, data)
+        return _.dict_to_class(cls, dict(data))
 
     @property
     def length(self):
@@ -121,4 +127,12 @@ is_delete = partial(_isinstance, class_or_tuple=Delete)
 
 
 def it_insert_text(op: Any):
-    return is_insert(op) and isinstance(op.value, str)
+    return is_insert(op) and isinstance(op.value, (str, TextView))
+
+
+def it_retain_embed(op: Any):
+    return is_retain(op) and isinstance(op.value, Dict)
+
+
+def hash_operation(op: Union[Insert, Retain, Delete]):
+    return hash((type(op), _.freeze(op)))
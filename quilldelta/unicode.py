@@ -0,0 +1,212 @@
+import re
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    ContextVar = None
+
+__all__ = ['CODE_POINTS', 'UTF16', 'get_length_unit', 'set_length_unit',
+           'length_unit', 'astral_index', 'text_length', 'to_code_points',
+           'to_units', 'slice_text', 'TextView']
+
+CODE_POINTS = 'code-points'
+UTF16 = 'utf-16'
+
+astral_re = re.compile('[\U00010000-\U0010FFFF]')
+
+# Only short texts are cached by content, longer ones keep their index on
+# the TextView reading them.
+SHORT_TEXT = 256
+
+
+class _LocalUnit(threading.local):
+    # Stand-in for the ContextVar on Python 3.6
+    def __init__(self):
+        self.unit = CODE_POINTS
+
+    def get(self):
+        return self.unit
+
+    def set(self, unit):
+        self.unit = unit
+
+
+if ContextVar is not None:
+    _unit = ContextVar('length_unit', default=CODE_POINTS)
+else:  # pragma: no cover
+    _unit = _LocalUnit()
+
+
+def get_length_unit():
+    return _unit.get()
+
+
+def set_length_unit(unit: str):
+    # The unit is set for the current thread or async task only
+    if unit not in (CODE_POINTS, UTF16):
+        raise ValueError(f'Unknown length unit {unit!r}')
+
+    _unit.set(unit)
+
+
+@contextmanager
+def length_unit(unit: str):
+    previous = get_length_unit()
+    set_length_unit(unit)
+
+    try:
+        yield
+    finally:
+        set_length_unit(previous)
+
+
+def _astral_index(text: str):
+    # UTF-16 offsets where each astral character (a surrogate pair) starts
+    return tuple(match.start() + count
+                 for count, match in enumerate(astral_re.finditer(text)))
+
+
+_cached_astral_index = lru_cache(maxsize=4096)(_astral_index)
+
+
+def astral_index(text: str):
+    if len(text) > SHORT_TEXT:
+        return _astral_index(text)
+    return _cached_astral_index(text)
+
+
+def text_length(text: str, unit: str = None) -> int:
+    if (unit or _unit.get()) == CODE_POINTS:
+        return len(text)
+
+    return len(text) + len(astral_index(text))
+
+
+def to_code_points(text: str, offset: int, unit: str = None,
+                   index: tuple = None) -> int:
+    if (unit or _unit.get()) == CODE_POINTS:
+        return offset
+
+    if index is None:
+        index = astral_index(text)
+
+    # An offset that falls between two surrogates rounds down to the start
+    # of the astral character.
+    return offset - bisect_left(index, offset)
+
+
+def to_units(text: str, offset: int, unit: str = None,
+             index: tuple = None) -> int:
+    if (unit or _unit.get()) == CODE_POINTS:
+        return offset
+
+    if index is None:
+        index = astral_index(text)
+
+    low, high = 0, len(index)
+
+    # Count astral characters before the code point offset
+    while low < high:
+        middle = (low + high) // 2
+        if index[middle] - middle < offset:
+            low = middle + 1
+        else:
+            high = middle
+
+    return offset + low
+
+
+def slice_text(text: str, start: int, length: int = None,
+               unit: str = None) -> str:
+    unit = unit or _unit.get()
+
+    if unit == CODE_POINTS:
+        if length is None:
+            return text[start:]
+        return text[start:start + length]
+
+    index = astral_index(text)
+    begin = to_code_points(text, start, unit, index)
+
+    if length is None:
+        return text[begin:]
+
+    return text[begin:to_code_points(text, start + length, unit, index)]
+
+
+class TextView:
+    __slots__ = ('base', 'start', 'end', '_index')
+
+    def __init__(self, base: str, start: int = 0, end: int = None):
+        self.base = base
+        self.start = start
+        self.end = len(base) if end is None else end
+        self._index = None
+
+    def __str__(self):
+        if self.start == 0 and self.end == len(self.base):
+            return self.base
+        return self.base[self.start:self.end]
+
+    def __repr__(self):
+        return f'TextView({str(self)!r})'
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __eq__(self, other):
+        if isinstance(other, (str, TextView)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, other):
+        if isinstance(other, TextView) and other.base is self.base \
+                and other.start == self.end:
+            return TextView(self.base, self.start, other.end)
+        return str(self) + str(other)
+
+    def __radd__(self, other):
+        return str(other) + str(self)
+
+    def astral_index(self) -> tuple:
+        # Kept with the view and shared with its slices, so a long text is
+        # only scanned once however often it is read in parts.
+        if self._index is None:
+            self._index = astral_index(self.base)
+        return self._index
+
+    def units(self, unit: str = None) -> int:
+        unit = unit or _unit.get()
+
+        if unit == CODE_POINTS:
+            return self.end - self.start
+
+        index = self.astral_index()
+        return to_units(self.base, self.end, unit, index) - \
+            to_units(self.base, self.start, unit, index)
+
+    def slice(self, offset: int, length: int = None, unit: str = None):
+        unit = unit or _unit.get()
+        base = self.base
+
+        if unit == CODE_POINTS:
+            begin = self.start + offset
+            end = self.end if length is None else \
+                min(begin + length, self.end)
+        else:
+            index = self.astral_index()
+            start = to_units(base, self.start, unit, index) + offset
+            begin = to_code_points(base, start, unit, index)
+            end = self.end if length is None else min(
+                to_code_points(base, start + length, unit, index), self.end)
+
+        view = TextView(base, begin, end)
+        view._index = self._index
+        return view
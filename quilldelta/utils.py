@@ -1,7 +1,9 @@
 import copy
 import json
-from functools import wraps
-from typing import Any, Dict
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable
+
+from .unicode import TextView
 
 
 def truncate_repr(items: list, length=10):
@@ -13,27 +15,6 @@ def truncate_repr(items: list, length=10):
         return '[]'
 
 
-def chainable(func):
-    @wraps(func)
-    def wrapper(instance, *args, **kwargs):
-        instance_class = type(instance)
-        items = func(instance, *args, **kwargs)
-
-        if items:
-            assert isinstance(items, (list, instance_class)), \
-                'Invalid return value expected list or Operations'
-
-        if isinstance(items, instance_class):
-            return items
-        elif isinstance(items, list):
-            return instance_class(items)
-        elif not items:
-            return instance_class(instance._items)
-
-    wrapper.inner = func
-    return wrapper
-
-
 def dict_to_class(cls, attrs: Dict):
     name = cls.__name__.lower()
 
@@ -51,6 +32,9 @@ def instance_as_dict(instance: Any):
     name = type(instance).__name__.lower()
     data = instance._asdict()
     value = data.pop('value')
+
+    if isinstance(value, TextView):
+        value = str(value)
     return {name: value, **{k: v for k, v in data.items() if v}}
 
 
@@ -72,3 +56,124 @@ def merge_dicts(*args):
             result.update(source)
 
     return result
+
+
+def compose_attributes(a: Dict = None, b: Dict = None,
+                       keep_null: bool = False):
+    attributes = copy.deepcopy(b) if b else {}
+
+    if not keep_null:
+        attributes = {k: v for k, v in attributes.items() if v is not None}
+
+    for key, value in (a or {}).items():
+        # Removals in a change are kept for the change composed after it
+        if key not in (b or {}) and (keep_null or value is not None):
+            attributes[key] = copy.deepcopy(value)
+
+    return attributes or None
+
+
+def diff_attributes(a: Dict = None, b: Dict = None):
+    a, b = a or {}, b or {}
+    attributes = {}
+
+    for key in [*a, *(key for key in b if key not in a)]:
+        if a.get(key) != b.get(key):
+            attributes[key] = b.get(key)
+
+    return attributes or None
+
+
+def transform_attributes(a: Dict = None, b: Dict = None,
+                         priority: bool = False):
+    if not a:
+        return b or None
+    elif not b:
+        return None
+    elif not priority:
+        return b
+
+    attributes = {k: v for k, v in b.items() if k not in a}
+    return attributes or None
+
+
+def invert_attributes(a: Dict = None, base: Dict = None):
+    a, base = a or {}, base or {}
+    attributes = {key: base[key] for key in a
+                  if key in base and a[key] != base[key]}
+    attributes.update((key, None) for key in a if key not in base)
+
+    return attributes or None
+
+
+class FrozenDict(dict):
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f'{type(self).__name__} is immutable')
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        return hash(freeze(self))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def immutable(value: Any):
+    if isinstance(value, FrozenDict):
+        return value
+    elif isinstance(value, dict):
+        return FrozenDict((k, immutable(v)) for k, v in value.items())
+    elif isinstance(value, list):
+        return tuple(immutable(v) for v in value)
+
+    return value
+
+
+def mutable(value: Any):
+    if isinstance(value, dict):
+        return {k: mutable(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [mutable(v) for v in value]
+
+    return value
+
+
+def freeze(value: Any):
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+
+    return value
+
+
+def freeze_typed(value: Any):
+    # Like freeze, but True, 1 and 1.0 stay distinct
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze_typed(v)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze_typed(v) for v in value)
+    elif isinstance(value, (bool, float)):
+        return type(value), value
+
+    return value
+
+
+def process_map(func: Callable, iterable: Iterable, processes: int = None,
+                chunksize: int = 16):
+    if processes == 1:
+        yield from map(func, iterable)
+        return
+
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(func, iterable, chunksize)
@@ -0,0 +1,343 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Union
+
+from .embeds import HANDLERS
+from .types import Delete, Insert, Retain
+from .unicode import text_length
+
+__all__ = ['Limits', 'ValidationError', 'validate', 'normalize']
+
+OPERATION_KEYS = {
+    'insert': Insert,
+    'retain': Retain,
+    'delete': Delete,
+}
+
+ATTRIBUTE_TYPES = (str, int, float, bool, type(None), dict, list)
+
+
+class ValidationError(ValueError):
+    def __init__(self, message: str, index: int = None):
+        if index is not None:
+            message = f'ops[{index}]: {message}'
+
+        super().__init__(message)
+        self.index = index
+
+
+class Limits:
+    __slots__ = ('max_ops', 'max_text', 'max_length', 'max_attributes',
+                 'max_attribute_length', 'allowed_attributes',
+                 'max_embed_size')
+
+    def __init__(self, max_ops: int = 10_000, max_text: int = 1_000_000,
+                 max_length: int = 10_000_000, max_attributes: int = 32,
+                 max_attribute_length: int = 2048,
+                 allowed_attributes: Iterable[str] = None,
+                 max_embed_size: int = 1_000_000):
+        self.max_ops = max_ops
+        self.max_text = max_text
+        self.max_length = max_length
+        self.max_attributes = max_attributes
+        self.max_attribute_length = max_attribute_length
+
+        if allowed_attributes is not None:
+            allowed_attributes = frozenset(allowed_attributes)
+        self.allowed_attributes = allowed_attributes
+        self.max_embed_size = max_embed_size
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}'
+                           for name in self.__slots__)
+        return f'Limits({fields})'
+
+    def _key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Limits):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+
+DEFAULT_LIMITS = Limits()
+
+
+def attribute_size(value, limit: int) -> int:
+    # Text counts by length, every other value, key or container as one.
+    # Gives up once past the limit, however large or deep the value is.
+    size = 0
+    stack = [value]
+
+    while stack and size <= limit:
+        value = stack.pop()
+
+        if isinstance(value, str):
+            size += len(value)
+            continue
+
+        size += 1
+
+        if isinstance(value, (dict, list)):
+            if size + len(value) > limit:
+                return limit + 1
+
+            if isinstance(value, dict):
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            else:
+                stack.extend(value)
+
+    return size
+
+
+@lru_cache(maxsize=32)
+def compile_validator(limits: Limits):
+    max_ops = limits.max_ops
+    max_text = limits.max_text
+    max_length = limits.max_length
+    max_attributes = limits.max_attributes
+    max_attribute_length = limits.max_attribute_length
+    allowed_attributes = limits.allowed_attributes
+    max_embed_size = limits.max_embed_size
+
+    def check_attributes(attributes, index: int):
+        if attributes is None:
+            return None
+
+        if type(attributes) is not dict:
+            raise ValidationError(
+                f'attributes must be an object, '
+                f'not {type(attributes).__name__}', index)
+
+        if not attributes:
+            return None
+
+        if max_attributes is not None and len(attributes) > max_attributes:
+            raise ValidationError(
+                f'{len(attributes)} attributes exceed the limit of '
+                f'{max_attributes}', index)
+
+        for key, value in attributes.items():
+            if type(key) is not str:
+                raise ValidationError(f'attribute name {key!r} is not a '
+                                      f'string', index)
+
+            if allowed_attributes is not None and \
+                    key not in allowed_attributes:
+                raise ValidationError(f'attribute {key!r} is not allowed',
+                                      index)
+
+            if not isinstance(value, ATTRIBUTE_TYPES):
+                raise ValidationError(
+                    f'attribute {key!r} has an invalid value of type '
+                    f'{type(value).__name__}', index)
+
+            if max_attribute_length is not None and \
+                    isinstance(value, (str, dict, list)) and \
+                    attribute_size(value, max_attribute_length) > \
+                    max_attribute_length:
+                raise ValidationError(f'attribute {key!r} is longer than '
+                                      f'{max_attribute_length}', index)
+
+        return dict(attributes)
+
+    def validate(data: Union[List, Dict]) -> List[list]:
+        if isinstance(data, dict):
+            if 'ops' not in data:
+                raise ValidationError('Unknown form, missing "ops" key.')
+            data = data['ops']
+
+        if not isinstance(data, list):
+            raise ValidationError(f'Expected a list of operations, '
+                                  f'not {type(data).__name__}')
+
+        if max_ops is not None and len(data) > max_ops:
+            raise ValidationError(f'{len(data)} operations exceed the limit '
+                                  f'of {max_ops}')
+
+        # Normalized operations are kept as [type, value, attributes] lists
+        # and only turned into operation objects once the whole payload
+        # is known to be valid. Text inserts collect their chunks in a list
+        # so merging thousands of tiny inserts is not quadratic.
+        ops = []
+        text_total = 0
+        embed_total = 0
+        length_total = 0
+
+        for index, op in enumerate(data):
+            if type(op) is not dict:
+                raise ValidationError(f'operation must be an object, '
+                                      f'not {type(op).__name__}', index)
+
+            op_type = None
+            value = None
+            attributes = None
+
+            for key, item in op.items():
+                if key in OPERATION_KEYS:
+                    if op_type is not None:
+                        raise ValidationError(
+                            'operation has more than one type', index)
+                    op_type, value = OPERATION_KEYS[key], item
+                elif key == 'attributes':
+                    attributes = item
+                else:
+                    raise ValidationError(f'unknown key {key!r}', index)
+
+            if op_type is None:
+                raise ValidationError('operation has no type', index)
+
+            if op_type is Insert and type(value) is str:
+                if not value:
+                    continue
+
+                length = text_length(value)
+                text_total += len(value)
+
+                if max_text is not None and text_total > max_text:
+                    raise ValidationError(f'inserted text exceeds the '
+                                          f'limit of {max_text}', index)
+            elif op_type is not Delete and type(value) is dict and value:
+                # Embed inserts, and retains editing an embed
+                length = 1
+                value = dict(value)
+
+                if len(value) != 1:
+                    raise ValidationError(
+                        f'embed must have exactly one type, not '
+                        f'{len(value)}', index)
+
+                key = next(iter(value))
+
+                if type(key) is not str:
+                    raise ValidationError(
+                        f'embed key {key!r} is not a string', index)
+
+                if max_embed_size is not None:
+                    embed_total += attribute_size(
+                        value, max_embed_size - embed_total)
+
+                    if embed_total > max_embed_size:
+                        raise ValidationError(f'embeds exceed the size '
+                                              f'limit of {max_embed_size}',
+                                              index)
+
+                # Retains are composed with the embed they edit, which
+                # needs a handler that understands the value
+                handler = HANDLERS.get(key)
+
+                if handler is None and op_type is Retain:
+                    raise ValidationError(f'no handler for the {key!r} '
+                                          f'embed', index)
+
+                if handler is not None:
+                    try:
+                        handler.validate(value[key])
+                    except (ValueError, TypeError, RecursionError) as error:
+                        raise ValidationError(
+                            f'invalid {key!r} embed: {error}', index) \
+                            from error
+            elif op_type is Insert:
+                raise ValidationError(
+                    f'insert must be a string or a non-empty object, '
+                    f'not {value!r}', index)
+            else:
+                if type(value) is not int or value < 0:
+                    raise ValidationError(
+                        f'{op_type.__name__.lower()} must be a '
+                        f'non-negative integer, not {value!r}', index)
+
+                if value == 0:
+                    continue
+
+                length = value
+
+                if op_type is Delete and attributes:
+                    raise ValidationError('delete has attributes', index)
+
+            length_total += length
+
+            if max_length is not None and length_total > max_length:
+                raise ValidationError(f'delta length exceeds the limit of '
+                                      f'{max_length}', index)
+
+            attributes = check_attributes(attributes, index)
+
+            if type(value) is str:
+                value = [value]
+
+            push(ops, op_type, value, attributes)
+
+        return ops
+
+    return validate
+
+
+def push(ops: List[list], op_type, value, attributes):
+    # Same merging rules as Delta.push, applied to the raw lists
+    position = len(ops)
+
+    if ops:
+        last = ops[-1]
+
+        if op_type is Delete and last[0] is Delete:
+            last[1] += value
+            return
+
+        if op_type is Insert and last[0] is Delete:
+            position -= 1
+
+            if position == 0:
+                ops.insert(0, [op_type, value, attributes])
+                return
+
+            last = ops[position - 1]
+
+        if op_type is last[0] and op_type is not Delete and \
+                attributes == last[2]:
+            if op_type is Retain:
+                if type(value) is int and type(last[1]) is int:
+                    last[1] += value
+                    return
+
+            if type(value) is list and type(last[1]) is list:
+                last[1].extend(value)
+                return
+
+    ops.insert(position, [op_type, value, attributes])
+
+
+def build(ops: List[list]) -> List:
+    return [
+        Delete(value) if op_type is Delete else
+        op_type(''.join(value) if type(value) is list else value, attributes)
+        for op_type, value, attributes in ops
+    ]
+
+
+def normalize(ops: Iterable) -> List:
+    normalized = []
+
+    for op in ops:
+        value = op.value
+
+        if type(value) is str:
+            if not value:
+                continue
+            value = [value]
+        elif not isinstance(op, Insert) and not isinstance(value, Dict) \
+                and value <= 0:
+            continue
+
+        push(normalized, type(op), value,
+             None if isinstance(op, Delete) else op.attributes or None)
+
+    return build(normalized)
+
+
+def validate(data: Union[List, Dict], limits: Limits = None) -> List:
+    return build(compile_validator(limits or DEFAULT_LIMITS)(data))
@@ -18,6 +18,7 @@ setup(
     long_description=long_description,
     packages=find_packages(exclude='tests/*'),
     python_requires='>=3.6',
+    extras_require={'numpy': ['numpy']},
     setup_requires=['pytest-runner'],
     tests_require=['pytest', 'pytest-cov', 'pytest-asyncio'],
     classifiers=[
@@ -0,0 +1,101 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from quilldelta import Delta, Insert, Retain
+from quilldelta.admission import (ACCEPT, COALESCE, DEFER, REJECT,
+                                  AdmissionError, AdmissionPolicy,
+                                  DeltaCost)
+
+
+class TestCost:
+    def test_cost(self):
+        delta = Delta().retain(5, {'bold': True, 'color': 'red'}).insert(
+            'Hello', {'italic': True}).insert({'image': 'a.png'}).delete(3)
+
+        assert delta.cost() == DeltaCost(ops=4, inserted=6, attributes=3,
+                                         span=8, work=15)
+
+    def test_span_is_bounded_by_the_document(self):
+        delta = Delta().retain(1000).insert('A')
+
+        assert delta.cost(10).span == 10
+        assert delta.cost(10).work == 12
+
+
+class TestAdmissionPolicy:
+    @pytest.fixture
+    def document(self):
+        return Delta().insert('Hello World')
+
+    def test_accept(self, document):
+        policy = AdmissionPolicy(max_ops=10)
+        delta = Delta().retain(5).insert('!')
+
+        assert policy.evaluate(delta)[0] == ACCEPT
+        assert policy.apply(document, delta) == Delta().insert('Hello! World')
+
+    def test_reject(self, document):
+        policy = AdmissionPolicy(max_ops=10)
+        delta = Delta([Retain(1, {'bold': bool(i % 2)}) for i in range(11)])
+
+        with pytest.raises(AdmissionError) as error:
+            policy.apply(document, delta)
+
+        assert error.value.limit == 'ops'
+        assert error.value.cost.ops == 11
+
+    def test_limits(self):
+        delta = Delta().retain(5, {'bold': True}).insert('Hello')
+
+        assert AdmissionPolicy(max_inserted=4).exceeded(delta.cost()) == \
+            'inserted'
+        assert AdmissionPolicy(max_attributes=0).exceeded(delta.cost()) == \
+            'attributes'
+        assert AdmissionPolicy(max_work=7).exceeded(delta.cost()) == 'work'
+        assert AdmissionPolicy(max_work=8).exceeded(delta.cost()) is None
+
+    def test_coalesce(self, document):
+        policy = AdmissionPolicy(max_ops=3, action=COALESCE)
+        delta = Delta([Retain(1, None)] * 5 + [Insert(c, None) for c in '!?'])
+
+        assert policy.evaluate(delta)[0] == COALESCE
+        assert policy.apply(document, delta) == \
+            Delta().insert('Hello!? World')
+
+    def test_coalesce_rejects_what_does_not_merge(self, document):
+        policy = AdmissionPolicy(max_ops=3, action=COALESCE)
+        delta = Delta([Retain(1, {'bold': bool(i % 2)}) for i in range(6)])
+
+        with pytest.raises(AdmissionError):
+            policy.apply(document, delta)
+
+    def test_defer(self, document):
+        with ThreadPoolExecutor(1) as executor:
+            policy = AdmissionPolicy(max_ops=1, action=DEFER,
+                                     executor=executor)
+
+            assert policy.apply(document, Delta().insert('A')) == \
+                Delta().insert('AHello World')
+
+            future = policy.apply(document, Delta().retain(5).insert('!'))
+
+            assert future.result() == Delta().insert('Hello! World')
+
+    def test_defer_requires_an_executor(self):
+        with pytest.raises(ValueError):
+            AdmissionPolicy(action=DEFER)
+
+    def test_invalid_action(self):
+        with pytest.raises(ValueError):
+            AdmissionPolicy(action='drop')
+
+    def test_action_built_at_runtime(self, document):
+        action = json.loads('"reject"')
+        assert action is not REJECT
+
+        policy = AdmissionPolicy(max_ops=1, action=action)
+
+        with pytest.raises(AdmissionError):
+            policy.apply(document, Delta().retain(1).insert('!'))
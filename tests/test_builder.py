@@ -14,6 +14,48 @@ def test_hash_delta():
     assert hash(Delta().insert('hello')) != hash(Delta().insert('Hello'))
 
 
+def test_hash_is_order_sensitive():
+    assert hash(Delta().insert('a').insert(1)) != \
+        hash(Delta().insert(1).insert('a'))
+
+
+def test_hash_formatted_delta():
+    delta = Delta().insert('Hello', {'bold': True}).retain(1, {'color': 'red'})
+    cache = {delta: 'value'}
+
+    assert cache[Delta().insert('Hello', {'bold': True})
+                        .retain(1, {'color': 'red'})] == 'value'
+
+
+def test_hash_is_maintained_by_mutations():
+    delta = (Delta()
+             .insert('a')
+             .delete(1)
+             .insert('b')
+             .retain(2, {'bold': True})
+             .retain(3, {'bold': True})
+             .insert(1)
+             .retain(4))
+
+    delta.ops.chop()
+    delta.ops[0] = Insert('x', None)
+
+    assert hash(delta) == hash(OperationsList(list(delta.ops)))
+
+    delta.ops.insert(1, Delete(2))
+    delta.ops.insert(-1, Retain(1, None))
+
+    assert hash(delta) == hash(OperationsList(list(delta.ops)))
+
+
+def test_equality_short_circuits_on_hash():
+    delta = Delta().insert('Hello')
+    other = Delta().insert('Hello')
+    other.ops._hash += 1
+
+    assert delta != other
+
+
 class TestConstructor:
     @pytest.fixture
     def dict_ops(self):
@@ -145,6 +187,12 @@ class TestInsert:
 
         assert delta == expected, [delta.ops, expected.ops]
 
+    def test_insert_text_after_delete_different_attributes(self):
+        delta = Delta().insert('a').delete(1).insert('b', {'bold': True})
+        expected = Delta().insert('a').insert('b', {'bold': True}).delete(1)
+
+        assert delta == expected, [delta.ops, expected.ops]
+
     def test_insert_text_empty_attributes(self):
         delta = Delta().insert('a', {})
         expected = Delta().insert('a')
@@ -245,6 +293,16 @@ class TestRetain:
 
 
 class TestPush:
+    def test_push_mutates_in_place(self):
+        delta = Delta().insert('a', {'bold': True})
+        ops = delta.ops
+
+        assert delta.push({'insert': 'b'}) is delta
+        assert delta.ops is ops
+        assert ops.append(Insert('c', {'bold': True})) is ops
+        assert ops.insert(0, Delete(1)) is ops
+        assert len(ops) == 4
+
     def test_push_into_empty(self):
         delta = Delta()
         delta.push({'insert': 'test'})
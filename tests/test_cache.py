@@ -0,0 +1,107 @@
+from quilldelta import Delta
+from quilldelta.cache import ComposeCache
+from quilldelta.unicode import UTF16, length_unit
+
+
+class TestComposeCache:
+    def test_hit_and_miss(self):
+        cache = ComposeCache()
+        a = Delta().insert('A')
+        b = Delta().insert('B')
+
+        first = a.compose(b, cache=cache)
+        second = Delta().insert('A').compose(Delta().insert('B'), cache=cache)
+
+        assert first == second == Delta().insert('BA')
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_results_are_copies(self):
+        cache = ComposeCache()
+        a = Delta().insert('A')
+        b = Delta().insert('B')
+
+        a.compose(b, cache=cache).insert('C')
+
+        assert a.compose(b, cache=cache) == Delta().insert('BA')
+
+    def test_content_is_the_key(self):
+        cache = ComposeCache()
+        a = Delta().insert('A')
+        b = Delta().insert('B')
+        a.compose(b, cache=cache)
+
+        assert (a, b) in cache
+        assert (a, Delta().insert('B', {'bold': True})) not in cache
+
+    def test_evicts_least_recently_used_by_op_count(self):
+        cache = ComposeCache(max_ops=6)
+        base = Delta().insert('A')
+
+        base.compose(Delta().insert('x'), cache=cache)
+        base.compose(Delta().insert('y'), cache=cache)
+        base.compose(Delta().insert('x'), cache=cache)
+        base.compose(Delta().insert('z'), cache=cache)
+
+        assert (base, Delta().insert('x')) in cache
+        assert (base, Delta().insert('y')) not in cache
+        assert cache.stats()['evictions'] == 1
+        assert cache.total_ops == 6
+
+    def test_evicts_by_bytes(self):
+        cache = ComposeCache(max_ops=None, max_bytes=80)
+        base = Delta().insert('A')
+
+        base.compose(Delta().insert('a' * 10), cache=cache)
+        base.compose(Delta().insert('b' * 10), cache=cache)
+
+        assert len(cache) == 1
+        assert cache.total_bytes <= 80
+
+    def test_operands_count_towards_limits(self):
+        cache = ComposeCache(max_ops=150)
+        document = Delta()
+        for index in range(60):
+            document.insert(str(index), {'bold': index % 2 == 0})
+
+        document.compose(Delta().retain(1).delete(1), cache=cache)
+
+        assert cache.total_ops == 58 + 60 + 2
+        assert len(cache) == 1
+
+        document.compose(Delta().retain(2).delete(1), cache=cache)
+
+        assert cache.total_ops <= 150
+        assert len(cache) == 1
+
+    def test_oversized_results_are_not_stored(self):
+        cache = ComposeCache(max_ops=1)
+        Delta().insert('A').compose(Delta().insert(1), cache=cache)
+
+        assert len(cache) == 0
+
+    def test_hash_collisions_are_misses(self):
+        cache = ComposeCache()
+        document = Delta().insert('A\n')
+        first = Delta().retain(1, {'indent': -1})
+        second = Delta().retain(1, {'indent': -2})
+
+        assert hash(first.ops) == hash(second.ops)
+        document.compose(first, cache=cache)
+
+        assert (document, second) not in cache
+        assert document.compose(second, cache=cache) == \
+            Delta().insert('A', {'indent': -2}).insert('\n')
+        assert cache.stats()['hits'] == 0
+
+    def test_length_unit_is_part_of_the_key(self):
+        cache = ComposeCache()
+        a = Delta().insert('😀Hello')
+        b = Delta().retain(3).insert('X')
+
+        assert cache.compose(a, b) == Delta().insert('😀HeXllo')
+
+        with length_unit(UTF16):
+            assert cache.compose(a, b) == Delta().insert('😀HXello')
+
+        assert cache.misses == 2
@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from quilldelta import Delta
+from quilldelta.cli import main
+from quilldelta.revlog import encode
+
+
+@pytest.fixture
+def inputs(tmpdir):
+    document = Delta().insert('Hello', {'bold': True}).insert('\n')
+    tmpdir.join('document.json').write(document.as_json())
+    tmpdir.join('changes.jsonl').write(
+        Delta().insert('One\n').as_json() + '\n\n' +
+        '[{"retain": -1}]\n')
+    tmpdir.join('log.qdrl').write_binary(encode([
+        Delta().insert('Hello\n'),
+        Delta().retain(5).insert(' World'),
+    ]))
+    tmpdir.join('ignored.txt').write('not a delta')
+    return tmpdir
+
+
+def run(tmpdir, *args):
+    report = tmpdir.join('report.jsonl')
+    code = main(['-q', '-o', str(report)] + list(args))
+    return code, [json.loads(line) for line in report.readlines()]
+
+
+def test_stats_directory(inputs, tmpdir_factory):
+    code, results = run(tmpdir_factory.mktemp('out'), '-j', '1', 'stats',
+                        str(inputs))
+
+    assert code == 0
+    assert [result['name'].rsplit('/', 1)[-1] for result in results] == [
+        'changes.jsonl:1', 'changes.jsonl:3', 'document.json', 'log.qdrl']
+    assert results[2]['ops'] == 2
+    assert results[2]['length'] == 6
+    assert results[3]['length'] == 12
+
+
+def test_parallel_matches_inline(inputs, tmpdir_factory):
+    _, inline = run(tmpdir_factory.mktemp('inline'), '-j', '1',
+                    '--chunksize', '1', 'stats', str(inputs))
+    _, parallel = run(tmpdir_factory.mktemp('parallel'), '-j', '2',
+                      '--chunksize', '1', 'stats', str(inputs))
+
+    assert parallel == inline
+
+
+def test_validate_reports_errors(inputs, tmpdir):
+    code, results = run(tmpdir, '-j', '1', 'validate',
+                        str(inputs.join('changes.jsonl')))
+
+    assert code == 1
+    assert results[0] == {'name': results[0]['name'], 'valid': True,
+                          'ops': 1}
+    assert results[1]['error'].startswith('ValidationError: ops[0]')
+
+
+def test_validate_limits(inputs, tmpdir):
+    code, results = run(tmpdir, '-j', '1', 'validate',
+                        '--allowed-attributes', 'italic',
+                        str(inputs.join('document.json')))
+
+    assert code == 1
+    assert 'bold' in results[0]['error']
+
+
+def test_render_to_directory(inputs, tmpdir):
+    output = tmpdir.join('rendered')
+    code, results = run(tmpdir, '-j', '1', '-d', str(output), 'render',
+                        '-f', 'markdown', str(inputs.join('document.json')))
+
+    assert code == 0
+    assert results[0]['path'] == str(output.join('document.md'))
+    assert output.join('document.md').read() == '**Hello**\n\n'
+
+
+def test_compose(inputs, tmpdir):
+    changes = tmpdir.join('changes.json')
+    changes.write(json.dumps([
+        [{'insert': 'ab\n'}],
+        [{'retain': 1}, {'insert': 'X'}],
+    ]))
+    code, results = run(tmpdir, '-j', '1', 'compose', str(changes),
+                        str(inputs.join('log.qdrl')))
+
+    assert code == 0
+    assert results[0]['document'] == [{'insert': 'aXb\n'}]
+    assert results[1]['document'] == [{'insert': 'Hello World\n'}]
+
+
+def test_convert_round_trip(inputs, tmpdir):
+    output = tmpdir.join('binary')
+    code, results = run(tmpdir, '-j', '1', '-d', str(output), 'convert',
+                        '-t', 'binary', str(inputs.join('document.json')))
+    assert code == 0
+
+    code, results = run(tmpdir, '-j', '1', 'convert',
+                        str(output.join('document.qd')))
+    assert results[0]['document'] == json.loads(
+        inputs.join('document.json').read())
+
+
+def test_binary_needs_output_dir(inputs):
+    with pytest.raises(SystemExit):
+        main(['-q', 'convert', '-t', 'binary', str(inputs)])
+
+
+def test_outputs_mirror_directories(tmpdir):
+    inputs = tmpdir.mkdir('inputs')
+    inputs.mkdir('a').join('x.json').write('[{"insert": "A\\n"}]')
+    inputs.mkdir('b').join('x.json').write('[{"insert": "B\\n"}]')
+    output = tmpdir.join('rendered')
+
+    code, results = run(tmpdir, '-j', '1', '-d', str(output), 'render',
+                        '-f', 'text', str(inputs))
+
+    assert code == 0
+    assert output.join('a', 'x.txt').read() == 'A\n'
+    assert output.join('b', 'x.txt').read() == 'B\n'
+
+
+def test_output_collisions_fail(tmpdir):
+    inputs = tmpdir.mkdir('inputs')
+    first = inputs.mkdir('a').join('x.json')
+    second = inputs.mkdir('b').join('x.json')
+    first.write('[{"insert": "A\\n"}]')
+    second.write('[{"insert": "B\\n"}]')
+    output = tmpdir.join('rendered')
+
+    code, results = run(tmpdir, '-j', '1', '-d', str(output), 'render',
+                        '-f', 'text', str(first), str(second))
+
+    assert code == 1
+    assert output.join('x.txt').read() == 'A\n'
+    assert results[1]['error'].startswith('FileExistsError: Output x ')
+
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_corrupt_binary_inputs(inputs, tmpdir_factory, jobs):
+    data = inputs.join('log.qdrl').read_binary()
+    inputs.join('corrupt.qdrl').write_binary(data[:-4] + b'\xff' * 4)
+    inputs.join('truncated.qdrl').write_binary(data[:12] + b'\x05\x03ab')
+    Delta().insert('Hello\n').write_mmap(str(inputs.join('document.qd')))
+    inputs.join('truncated.qd').write_binary(
+        inputs.join('document.qd').read_binary()[:100])
+
+    code, results = run(tmpdir_factory.mktemp('out'), '-j', jobs, 'stats',
+                        str(inputs))
+    results = {result['name'].rsplit('/', 1)[-1]: result
+               for result in results}
+
+    assert code == 1
+    assert results['log.qdrl']['length'] == 12
+    assert results['document.qd']['length'] == 6
+    for name in ('corrupt.qdrl', 'truncated.qdrl', 'truncated.qd'):
+        assert results[name]['error'].startswith('ValueError: ')
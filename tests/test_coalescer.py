@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+
+import pytest
+
+from quilldelta import Delta
+from quilldelta.coalescer import DeltaCoalescer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def subscriber(received):
+    def callback(document, payload):
+        received.append((document, payload))
+
+    return callback
+
+
+class TestDeltaCoalescer:
+    def test_composes_and_serializes_once(self, clock):
+        coalescer = DeltaCoalescer(max_delay=1, clock=clock)
+        first, second = [], []
+        coalescer.subscribe('doc', subscriber(first))
+        coalescer.subscribe('doc', subscriber(second))
+
+        assert coalescer.add('doc', Delta().insert('a')) is None
+        assert coalescer.add('doc', Delta().retain(1).insert('b')) is None
+        assert first == second == []
+
+        payload = coalescer.flush('doc')['doc']
+
+        assert json.loads(payload) == Delta().insert('ab').as_data()
+        assert first == second == [('doc', payload)]
+        assert first[0][1] is second[0][1]
+
+    def test_documents_are_separate(self, clock):
+        coalescer = DeltaCoalescer(max_delay=1, clock=clock)
+        received = []
+        coalescer.subscribe('a', subscriber(received))
+
+        coalescer.add('a', Delta().insert('a'))
+        coalescer.add('b', Delta().insert('b'))
+
+        assert len(coalescer) == 2
+        assert set(coalescer.flush()) == {'a', 'b'}
+        assert received == [('a', b'[{"insert": "a"}]')]
+        assert len(coalescer) == 0
+
+    def test_max_changes(self, clock):
+        coalescer = DeltaCoalescer(max_delay=None, max_changes=3, clock=clock)
+
+        assert coalescer.add('doc', Delta().insert('a')) is None
+        assert coalescer.add('doc', Delta().insert('b')) is None
+        assert coalescer.add('doc', Delta().insert('c')) == \
+            b'[{"insert": "cba"}]'
+
+    def test_max_ops(self, clock):
+        coalescer = DeltaCoalescer(max_delay=None, max_ops=3, clock=clock)
+
+        assert coalescer.add('doc', Delta().insert('a').delete(1)) is None
+        assert coalescer.add('doc', Delta().retain(1).insert('b')) is not None
+
+    def test_max_delay(self, clock):
+        coalescer = DeltaCoalescer(max_delay=0.05, clock=clock)
+
+        coalescer.add('doc', Delta().insert('a'))
+        clock.now = 0.01
+        coalescer.add('other', Delta().insert('b'))
+
+        assert coalescer.flush_expired() == {}
+
+        clock.now = 0.05
+
+        assert coalescer.flush_expired() == {'doc': b'[{"insert": "a"}]'}
+        assert coalescer.add('other', Delta().insert('c')) is None
+
+        clock.now = 0.07
+
+        assert coalescer.add('other', Delta().insert('d')) == \
+            b'[{"insert": "dcb"}]'
+
+    def test_unsubscribe(self, clock):
+        coalescer = DeltaCoalescer(clock=clock)
+        received = []
+        callback = subscriber(received)
+        coalescer.subscribe('doc', callback)
+        coalescer.unsubscribe('doc', callback)
+        coalescer.unsubscribe('doc', callback)
+
+        coalescer.add('doc', Delta().insert('a'))
+        coalescer.flush()
+
+        assert received == []
+
+    def test_stats(self, clock):
+        coalescer = DeltaCoalescer(max_delay=1, clock=clock)
+        coalescer.subscribe('doc', subscriber([]))
+        coalescer.subscribe('doc', subscriber([]))
+
+        for index in range(4):
+            coalescer.add('doc', Delta().retain(index).insert('x'))
+        coalescer.flush()
+
+        stats = coalescer.stats()
+
+        assert stats['changes'] == 4
+        assert stats['broadcasts'] == 1
+        assert stats['deliveries'] == 2
+        assert stats['change_ratio'] == 4.0
+        assert stats['op_ratio'] == 7.0
+        assert stats['bytes_out'] == len(b'[{"insert": "xxxx"}]')
+
+    def test_keeps_removed_attributes(self, clock):
+        coalescer = DeltaCoalescer(max_delay=1, clock=clock)
+        document = Delta().insert('ab', {'bold': True}).insert('\n')
+        changes = [Delta().retain(2, {'bold': None}),
+                   Delta().retain(3).insert('c')]
+
+        for change in changes:
+            coalescer.add('doc', change)
+
+        batch = Delta(json.loads(coalescer.flush('doc')['doc']))
+
+        assert batch == Delta().retain(2, {'bold': None}).retain(1).insert('c')
+        assert document.compose(batch) == \
+            document.compose(changes[0]).compose(changes[1])
+
+    def test_batches_are_delivered_in_order(self):
+        coalescer = DeltaCoalescer(max_delay=None, max_changes=None)
+        received = []
+        document = Delta()
+        done = threading.Event()
+
+        def slow(key, payload):
+            time.sleep(0.0005)
+            received.append(payload)
+
+        def flusher():
+            while not done.is_set():
+                coalescer.flush('doc')
+
+        coalescer.subscribe('doc', slow)
+        threads = [threading.Thread(target=flusher) for _ in range(3)]
+
+        for thread in threads:
+            thread.start()
+
+        for index in range(300):
+            change = Delta().retain(index).insert(chr(0x4e00 + index))
+            document = document.compose(change)
+            coalescer.add('doc', change)
+
+        done.set()
+
+        for thread in threads:
+            thread.join()
+
+        coalescer.flush('doc')
+        result = Delta()
+
+        for payload in received:
+            result = result.compose(Delta(json.loads(payload)))
+
+        assert result == document
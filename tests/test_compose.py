@@ -1,3 +1,5 @@
+from random import Random
+
 from quilldelta import Delta, Insert, Retain
 
 
@@ -76,3 +78,91 @@ class TestCompose:
         compose = a.compose(b)
 
         assert compose.ops == expected.ops, f'{expected} not {compose}'
+
+    def test_remove_attribute(self):
+        a = Delta().insert('A', {'bold': True})
+        b = Delta().retain(1, {'bold': None})
+        expected = Delta().insert('A')
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_retain_keeps_null_attribute(self):
+        a = Delta().retain(1, {'color': 'blue'})
+        b = Delta().retain(1, {'bold': True, 'color': None})
+        expected = Delta().retain(1, {'bold': True, 'color': None})
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_retain_start_optimization(self):
+        a = Delta().insert('A', {'bold': True}).insert('B').insert(
+            'C', {'bold': True}).delete(1)
+        b = Delta().retain(3).insert('D')
+        expected = Delta().insert('A', {'bold': True}).insert('B').insert(
+            'C', {'bold': True}).insert('D').delete(1)
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_retain_end_optimization(self):
+        a = Delta().insert('A', {'bold': True}).insert('B').insert(
+            'C', {'bold': True})
+        b = Delta().delete(1)
+        expected = Delta().insert('B').insert('C', {'bold': True})
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_tail_of_other_is_copied(self):
+        a = Delta().insert('A')
+        b = Delta().retain(1).retain(2, {'bold': None}).delete(1)
+        expected = Delta().insert('A').retain(2, {'bold': None}).delete(1)
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_changes_keep_removed_attributes(self):
+        a = Delta().retain(3).retain(2, {'bold': None}).insert('z')
+        b = Delta().insert('x').retain(6, {'color': 'red'})
+        expected = (Delta().insert('x').retain(3, {'color': 'red'})
+                    .retain(2, {'bold': None, 'color': 'red'})
+                    .insert('z', {'color': 'red'}))
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_tail_inserts_before_delete(self):
+        a = Delta().retain(1).insert('B').insert('C', {'bold': True})
+        b = Delta().delete(1)
+        expected = Delta().insert('B').insert('C', {'bold': True}).delete(1)
+        delta = a.compose(b)
+        assert delta == expected, [delta.ops, expected.ops]
+
+
+def test_associative():
+    random = Random(0)
+    attributes = [None, {'bold': True}, {'bold': None}, {'color': 'red'},
+                  {'bold': None, 'color': 'blue'}]
+
+    def change(length):
+        delta = Delta()
+
+        while length > 0:
+            kind, size = random.random(), random.randint(1, 3)
+
+            if kind < 0.3:
+                delta.insert('xyz'[size - 1] * size,
+                             random.choice(attributes[:2]))
+            elif kind < 0.6:
+                delta.retain(min(size, length), random.choice(attributes))
+                length -= size
+            else:
+                delta.delete(min(size, length))
+                length -= size
+
+        return delta.insert('w', random.choice(attributes[:2]))
+
+    for _ in range(500):
+        document = Delta().insert('a' * random.randint(1, 8))
+        a = change(document.length())
+        b = change(document.compose(a).length())
+        c = change(document.compose(a).compose(b).length())
+
+        assert a.compose(b).compose(c) == a.compose(b.compose(c))
+        assert document.compose(a).compose(b) == \
+            document.compose(a.compose(b))
@@ -0,0 +1,60 @@
+import pytest
+
+from quilldelta import Delta
+
+
+class TestDiff:
+    def test_insert(self):
+        a = Delta().insert('A')
+        b = Delta().insert('AB')
+
+        assert a.diff(b) == Delta().retain(1).insert('B')
+
+    def test_delete(self):
+        a = Delta().insert('AB')
+        b = Delta().insert('A')
+
+        assert a.diff(b) == Delta().retain(1).delete(1)
+
+    def test_retain(self):
+        a = Delta().insert('A')
+        b = Delta().insert('A')
+
+        assert a.diff(b) == Delta()
+
+    def test_format(self):
+        a = Delta().insert('A')
+        b = Delta().insert('A', {'bold': True})
+
+        assert a.diff(b) == Delta().retain(1, {'bold': True})
+
+    def test_remove_format(self):
+        a = Delta().insert('A', {'bold': True, 'color': 'red'})
+        b = Delta().insert('A', {'color': 'red'})
+
+        assert a.diff(b) == Delta().retain(1, {'bold': None})
+
+    def test_embeds(self):
+        a = Delta().insert({'image': 'a.png'})
+        b = Delta().insert({'image': 'b.png'})
+
+        assert a.diff(b) == Delta().insert({'image': 'b.png'}).delete(1)
+
+    def test_mixed(self):
+        a = Delta().insert('Bad', {'color': 'red'}).insert('cat', {
+            'color': 'blue'})
+        b = Delta().insert('Good', {'bold': True}).insert('dog', {
+            'italic': True})
+
+        assert a.compose(a.diff(b)) == b
+
+    def test_round_trip(self):
+        a = Delta().insert('The quick brown fox').insert({'image': 'a.png'})
+        b = Delta().insert('The slow brown dog').insert('\n', {'header': 1})
+
+        assert a.compose(a.diff(b)) == b
+        assert b.compose(b.diff(a)) == a
+
+    def test_non_document(self):
+        with pytest.raises(ValueError):
+            Delta().insert('A').diff(Delta().retain(1))
@@ -0,0 +1,268 @@
+import pytest
+
+from quilldelta import Delta, Retain
+from quilldelta.abc import EmbedHandler
+from quilldelta.embeds import (DeltaEmbedHandler, get_handler,
+                               register_embed, unregister_embed)
+from quilldelta.revlog import decode, encode
+from quilldelta.storage import MmapDelta
+from quilldelta.validation import ValidationError
+
+
+class CellsHandler(EmbedHandler):
+    # Tables as {cell: text}, a change overwrites the cells it names
+    def compose(self, a, b, keep_null):
+        cells = {**a, **b}
+        if keep_null:
+            return cells
+        return {key: value for key, value in cells.items()
+                if value is not None}
+
+    def transform(self, a, b, priority):
+        if not priority:
+            return b
+        return {key: value for key, value in b.items() if key not in a}
+
+    def invert(self, a, base):
+        return {key: base.get(key) for key in a}
+
+
+@pytest.fixture(autouse=True)
+def handlers():
+    register_embed('delta', DeltaEmbedHandler())
+    register_embed('table', CellsHandler())
+    yield
+    unregister_embed('delta')
+    unregister_embed('table')
+
+
+def embed(*ops):
+    return {'delta': list(ops)}
+
+
+class TestRegistry:
+    def test_lookup(self):
+        assert isinstance(get_handler('delta'), DeltaEmbedHandler)
+
+        unregister_embed('delta')
+        with pytest.raises(ValueError):
+            get_handler('delta')
+
+    def test_requires_handler(self):
+        with pytest.raises(AssertionError):
+            register_embed('image', object())
+
+
+class TestRetainEmbed:
+    def test_length(self):
+        change = Delta().retain(2).retain(embed()).retain(3)
+        assert change.length() == 6
+        assert len(change.ops) == 3
+
+    def test_not_merged(self):
+        change = Delta().retain(embed()).retain(embed())
+        assert len(change.ops) == 2
+
+    def test_not_chopped(self):
+        change = Delta().retain(1).retain(embed({'insert': 'a'})).chop()
+        assert change.ops[-1] == Retain(embed({'insert': 'a'}), None)
+
+    def test_from_data(self):
+        data = [{'retain': {'table': {'a1': 'x'}}, 'attributes': {'w': 2}}]
+        assert Delta(data).as_data() == data
+
+
+class TestCompose:
+    def test_insert_and_retain(self):
+        a = Delta().insert('x').insert(embed({'insert': 'a'}))
+        b = Delta().retain(1).retain(embed({'insert': 'b'}))
+
+        assert a.compose(b) == \
+            Delta().insert('x').insert(embed({'insert': 'ba'}))
+
+    def test_retain_and_retain(self):
+        a = Delta().retain(embed({'insert': 'a'}))
+        b = Delta().retain(embed({'retain': 1}, {'insert': 'b'}))
+
+        assert a.compose(b) == Delta().retain(embed({'insert': 'ab'}))
+
+    def test_retain_number_and_retain(self):
+        a = Delta().retain(1, {'bold': True})
+        b = Delta().retain(embed({'insert': 'b'}))
+
+        assert a.compose(b) == \
+            Delta().retain(embed({'insert': 'b'}), {'bold': True})
+
+    def test_retain_and_retain_number(self):
+        a = Delta().retain(embed({'insert': 'a'}))
+        b = Delta().retain(1, {'bold': True})
+
+        assert a.compose(b) == \
+            Delta().retain(embed({'insert': 'a'}), {'bold': True})
+
+    def test_retain_and_delete(self):
+        a = Delta().retain(embed({'insert': 'a'}))
+        assert a.compose(Delta().delete(1)) == Delta().delete(1)
+
+    def test_keep_null(self):
+        document = Delta().insert({'table': {'a1': 'x', 'a2': 'y'}})
+        first = Delta().retain({'table': {'a2': None, 'b1': 'z'}})
+        second = Delta().retain({'table': {'b1': 'w'}})
+
+        assert document.compose(first) == \
+            Delta().insert({'table': {'a1': 'x', 'b1': 'z'}})
+        assert first.compose(second) == \
+            Delta().retain({'table': {'a2': None, 'b1': 'w'}})
+
+    def test_text_cannot_be_retained_as_embed(self):
+        with pytest.raises(TypeError):
+            Delta().insert('a').compose(Delta().retain(embed()))
+
+    def test_types_must_match(self):
+        with pytest.raises(ValueError):
+            Delta().insert({'table': {}}).compose(Delta().retain(embed()))
+
+    def test_unregistered(self):
+        with pytest.raises(ValueError):
+            Delta().insert({'chart': 1}).compose(
+                Delta().retain({'chart': 2}))
+
+
+class TestTransform:
+    def test_retain_and_retain(self):
+        a = Delta().retain(embed({'insert': 'a'}))
+        b = Delta().retain(embed({'insert': 'b'}))
+
+        assert a.transform(b, True) == \
+            Delta().retain(embed({'retain': 1}, {'insert': 'b'}))
+        assert a.transform(b, False) == \
+            Delta().retain(embed({'insert': 'b'}))
+
+    def test_retain_number_and_retain(self):
+        a = Delta().retain(1, {'bold': True})
+        b = Delta().retain(embed({'insert': 'b'}))
+
+        assert a.transform(b, True) == b
+        assert b.transform(a, True) == Delta().retain(1, {'bold': True})
+
+    def test_different_types(self):
+        a = Delta().retain({'table': {'a1': 'x'}})
+        b = Delta().retain(embed({'insert': 'b'}))
+
+        with pytest.raises(ValueError):
+            a.transform(b, True)
+
+    def test_unregistered(self):
+        with pytest.raises(ValueError):
+            Delta().retain({'chart': 1}).transform(
+                Delta().retain({'chart': 2}), True)
+
+    def test_concurrent_cell_edits(self):
+        document = Delta().insert({'table': {'a1': '', 'b1': ''}})
+        a = Delta().retain({'table': {'a1': 'x'}})
+        b = Delta().retain({'table': {'a1': 'y', 'b1': 'z'}})
+
+        left = document.compose(a).compose(a.transform(b, True))
+        right = document.compose(b).compose(b.transform(a, False))
+
+        assert left == right == \
+            Delta().insert({'table': {'a1': 'x', 'b1': 'z'}})
+
+
+class TestInvert:
+    def test_insert(self):
+        change = Delta().retain(2).insert('A')
+        base = Delta().insert('123456')
+
+        assert change.invert(base) == Delta().retain(2).delete(1)
+        assert base.compose(change).compose(change.invert(base)) == base
+
+    def test_delete(self):
+        change = Delta().retain(2).delete(3)
+        base = Delta().insert('123').insert('456', {'bold': True})
+
+        assert change.invert(base) == \
+            Delta().retain(2).insert('3').insert('45', {'bold': True})
+        assert base.compose(change).compose(change.invert(base)) == base
+
+    def test_retain(self):
+        change = Delta().retain(2).retain(3, {'italic': True})
+        base = Delta().insert('123').insert('456', {'bold': True})
+
+        assert change.invert(base) == \
+            Delta().retain(2).retain(3, {'italic': None})
+        assert base.compose(change).compose(change.invert(base)) == base
+
+    def test_combined(self):
+        change = (Delta()
+                  .retain(2).delete(2)
+                  .insert('AB', {'italic': True})
+                  .retain(2, {'italic': None, 'bold': True})
+                  .retain(2, {'color': 'red'})
+                  .delete(1))
+        base = (Delta()
+                .insert('123', {'bold': True})
+                .insert('456', {'italic': True})
+                .insert('789', {'color': 'red', 'bold': True}))
+        expected = (Delta()
+                    .retain(2).insert('3', {'bold': True})
+                    .insert('4', {'italic': True})
+                    .delete(2)
+                    .retain(2, {'italic': True, 'bold': None})
+                    .retain(2)
+                    .insert('9', {'color': 'red', 'bold': True}))
+
+        assert change.invert(base) == expected
+        assert base.compose(change).compose(change.invert(base)) == base
+
+    def test_embed(self):
+        base = Delta().insert('x').insert(embed({'insert': 'a'}))
+        change = Delta().retain(1).retain(embed({'insert': 'b'}))
+
+        assert change.invert(base) == \
+            Delta().retain(1).retain(embed({'delete': 1}))
+        assert base.compose(change).compose(change.invert(base)) == base
+
+    def test_embed_attributes(self):
+        base = Delta().insert({'table': {'a1': 'x'}}, {'width': 1})
+        change = Delta().retain({'table': {'a1': 'y', 'b1': 'z'}},
+                                {'width': 2})
+
+        assert change.invert(base) == Delta().retain(
+            {'table': {'a1': 'x', 'b1': None}}, {'width': 1})
+        assert base.compose(change).compose(change.invert(base)) == base
+
+
+class TestStorage:
+    def test_revlog(self):
+        changes = [Delta().insert({'table': {'a1': 'x'}}),
+                   Delta().retain({'table': {'a1': 'y'}}, {'width': 2})]
+
+        assert decode(encode(changes)) == changes
+
+    def test_mmap(self, tmpdir):
+        change = Delta().retain(2).retain({'table': {'a1': 'y'}}).delete(1)
+        path = str(tmpdir.join('change.qd'))
+        change.write_mmap(path)
+
+        with MmapDelta(path) as stored:
+            assert stored.to_delta() == change
+            assert stored.length() == 4
+
+    def test_validate(self):
+        data = [{'retain': 1}, {'retain': {'table': {'a1': 'y'}}},
+                {'retain': 2}]
+
+        assert Delta.validate_and_normalize(data).as_data() == data
+
+    def test_validate_payload(self):
+        nested = [{'retain': embed({'insert': 'a'})}]
+        assert Delta.validate_and_normalize(nested).as_data() == nested
+
+        for data in ([{'retain': embed({'retain': -5}, {'bogus': 1})}],
+                     [{'insert': embed({'retain': embed({'bogus': 1})})}],
+                     [{'retain': {'chart': 1}}]):
+            with pytest.raises(ValidationError):
+                Delta.validate_and_normalize(data)
+
+        assert Delta.validate_and_normalize([{'insert': {'chart': 1}}])
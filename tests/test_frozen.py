@@ -0,0 +1,153 @@
+import copy
+import pickle
+import threading
+
+import pytest
+
+from quilldelta import Delta, FrozenDelta, Insert
+from quilldelta.types import load_operation
+
+
+@pytest.fixture
+def delta():
+    return (Delta()
+            .insert('Hello', {'bold': True})
+            .insert({'image': 'octocat.png'})
+            .retain(3))
+
+
+class TestFrozenDelta:
+    def test_freeze(self, delta):
+        frozen = delta.freeze()
+
+        assert isinstance(frozen, FrozenDelta)
+        assert frozen == delta
+        assert hash(frozen) == hash(delta)
+        assert frozen.length() == delta.length() == 9
+        assert frozen.as_json() == delta.as_json()
+        assert frozen.as_json() is frozen.as_json()
+
+    def test_constructors(self, delta):
+        assert FrozenDelta(delta.as_data()) == delta
+        assert FrozenDelta({'ops': delta.as_data()}) == delta
+        assert FrozenDelta(delta.freeze()) == delta
+        assert FrozenDelta() == Delta()
+
+    def test_mutations_raise(self, delta):
+        frozen = delta.freeze()
+
+        for mutate in (lambda: frozen.insert('a'),
+                       lambda: frozen.retain(1),
+                       lambda: frozen.delete(1),
+                       lambda: frozen.push({'insert': 'a'}),
+                       lambda: frozen.chop(),
+                       lambda: frozen.ops.append(Insert('a', None)),
+                       lambda: frozen.ops.__setitem__(0, Insert('a', None)),
+                       lambda: frozen.ops[0].attributes.update(bold=False),
+                       lambda: frozen.ops[1].value.pop('image'),
+                       lambda: setattr(frozen, 'ops', [])):
+            with pytest.raises(TypeError):
+                mutate()
+
+        assert frozen == delta
+
+    def test_independent_of_source(self, delta):
+        frozen = delta.freeze()
+        delta.ops[0].attributes['bold'] = False
+        delta.insert('!')
+
+        assert frozen.ops[0] == Insert('Hello', {'bold': True})
+        assert len(frozen.ops) == 3
+
+    def test_thaw(self, delta):
+        frozen = delta.freeze()
+        thawed = frozen.thaw()
+
+        assert type(thawed) is Delta
+        assert thawed == delta
+        assert type(thawed.ops[0].attributes) is dict
+        assert type(thawed.ops[1].value) is dict
+
+        thawed.insert('!')
+
+        assert len(frozen.ops) == 3
+        assert frozen == delta
+
+    def test_list_embeds(self):
+        delta = Delta().insert({'table': [1, {'cells': [2]}]}, {'ids': [3]})
+        frozen = delta.freeze()
+
+        assert frozen == delta
+        assert delta == frozen
+        assert frozen.thaw() == delta
+        assert frozen.thaw().ops[0] == delta.ops[0]
+        assert frozen.as_data() == delta.as_data()
+        assert frozen != Delta().insert({'table': [1, {'cells': [3]}]})
+
+    def test_concat(self, delta):
+        frozen = delta.freeze()
+        result = frozen.concat(Delta().retain(2).insert('!'))
+
+        assert type(result) is Delta
+        assert result == delta.concat(Delta().retain(2).insert('!'))
+        assert frozen == delta
+
+    def test_operations_return_deltas(self, delta):
+        frozen = delta.freeze()
+        composed = frozen.compose(Delta().insert('A'))
+
+        assert type(composed) is Delta
+        assert composed.ops[0] == Insert('A', None)
+        assert frozen.copy() is frozen
+
+    def test_results_hold_mutable_values(self):
+        delta = (Delta()
+                 .insert('ab', {'bold': True})
+                 .insert({'table': [1, 2]})
+                 .insert('\n'))
+        frozen = delta.freeze()
+
+        for result in (Delta(frozen), Delta(frozen.ops), frozen.slice(0, 3),
+                       frozen.compose(Delta().retain(1)),
+                       Delta().compose(frozen), frozen.concat(frozen)):
+            for op in result.ops:
+                assert type(op.attributes) in (dict, type(None))
+                assert type(op.value) in (str, dict)
+
+        assert frozen.compose(Delta().retain(1)) == delta
+        assert frozen.slice(0, 3) == delta.slice(0, 3)
+
+        result = frozen.compose(Delta().retain(1))
+        result.ops[0].attributes['italic'] = True
+
+        assert frozen == delta
+
+    def test_copy_and_pickle(self, delta):
+        frozen = delta.freeze()
+
+        assert copy.deepcopy(frozen.ops[0].attributes) == {'bold': True}
+        assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+    def test_shared_across_threads(self, delta):
+        frozen = delta.freeze()
+        results = []
+
+        def worker():
+            results.append((frozen.as_json(), frozen.length(), hash(frozen),
+                            frozen.as_html()))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(results)) == 1
+
+
+def test_load_operation_does_not_mutate_input():
+    data = {'insert': 'a', 'bold': True}
+    load_operation(data)
+
+    assert data == {'insert': 'a', 'bold': True}
@@ -2,7 +2,7 @@ from unittest import TestCase, mock
 
 import pytest
 
-from quilldelta import Delta, Insert
+from quilldelta import Delete, Delta, Insert, Retain
 
 
 class TestConcat:
@@ -33,6 +33,58 @@ class TestConcat:
         assert delta.concat(concat) == expected
         assert delta.ops == original.ops
 
+    def test_concat_boundary_merge(self):
+        delta = Delta().insert('a').delete(1)
+        concat = Delta().insert('b').retain(1, {'bold': True})
+        expected = Delta().insert('ab').delete(1).retain(1, {'bold': True})
+
+        assert delta.concat(concat) == expected
+        assert delta == Delta().insert('a').delete(1)
+        assert concat == Delta().insert('b').retain(1, {'bold': True})
+
+    def test_concat_copies_both_sides(self):
+        # concat is linear in both deltas, the result owns a new list
+        delta = Delta().insert('a', {'bold': True}).retain(2)
+        concat = Delta().insert('b').delete(1)
+        result = delta.concat(concat)
+
+        assert result.ops._items is not delta.ops._items
+        assert result.ops._items is not concat.ops._items
+        assert len(result.ops._items) == 4
+
+
+class TestCopy:
+    def test_copy_shares_storage(self):
+        delta = Delta().insert('Hello').retain(1, {'bold': True})
+        copy = delta.copy()
+
+        assert copy == delta
+        assert copy.ops._items is delta.ops._items
+
+    def test_copy_on_write(self):
+        delta = Delta().insert('Hello', {'bold': True}).retain(2)
+        original = Delta().insert('Hello', {'bold': True}).retain(2)
+        copy = delta.copy()
+
+        copy.insert('!')
+        copy.ops[0] = Insert('Bye', None)
+        copy.ops.insert(0, Delete(1))
+
+        assert delta == original
+        assert hash(delta) == hash(original)
+        assert copy.ops == [Delete(1), Insert('Bye', None), Retain(2, None),
+                            Insert('!', None)]
+
+    def test_original_mutation_does_not_leak(self):
+        delta = Delta().insert('Hello').retain(2)
+        copy = delta.copy()
+
+        delta.chop()
+        delta.insert('!')
+
+        assert copy == Delta().insert('Hello').retain(2)
+        assert delta == Delta().insert('Hello!')
+
 
 class TestChop:
     def test_chop_retain(self):
@@ -47,6 +99,14 @@ class TestChop:
 
         assert delta.chop().ops == expected.ops
 
+    def test_chop_in_place(self):
+        delta = Delta().insert('Test').retain(4)
+        ops = delta.ops
+
+        assert delta.chop() is delta
+        assert delta.ops is ops
+        assert ops.last == Insert('Test', None)
+
     def test_chop_formatted_retain(self):
         delta = Delta().insert('Test').retain(4, {'bold': True})
         expected = Delta().insert('Test').retain(4, {'bold': True})
@@ -71,6 +131,20 @@ class TestIteration(TestCase):
 
         assert len(ops) == 2
 
+    def test_filter_is_lazy(self):
+        spy_mock = mock.MagicMock(return_value=True)
+        ops = self.delta.ops.filter(spy_mock).map(lambda op: op.length)
+
+        assert spy_mock.call_count == 0
+        assert list(ops) == [5, 1, 7]
+        assert spy_mock.call_count == 3
+
+    def test_filter_to_list(self):
+        ops = self.delta.ops.filter(lambda op: isinstance(op.value, str))
+
+        assert ops.to_list() == [Insert('Hello', None),
+                                 Insert('World !', None)]
+
     def test_foreach(self):
         spy_mock = mock.MagicMock()
 
@@ -109,8 +183,56 @@ class TestIteration(TestCase):
         assert failed == [self.delta.ops[1]]
 
 
+class TestOpsView:
+    @pytest.fixture
+    def delta(self):
+        return (Delta()
+                .insert('Hello')
+                .insert({'image': True})
+                .insert('World', {'bold': True})
+                .insert('!'))
+
+    def test_fused_pipeline(self, delta):
+        spy_mock = mock.MagicMock(side_effect=lambda op: op)
+        view = (delta.ops_view()
+                .filter(lambda op: isinstance(op.value, str))
+                .map(spy_mock)
+                .map(lambda op: op.value))
+
+        assert spy_mock.call_count == 0
+        assert list(view) == ['Hello', 'World', '!']
+        assert spy_mock.call_count == 3
+
+    def test_takewhile(self, delta):
+        view = delta.ops_view().takewhile(lambda op: not op.attributes)
+
+        assert list(view) == [Insert('Hello', None),
+                              Insert({'image': True}, None)]
+
+    def test_partition(self, delta):
+        passed, failed = (delta.ops_view()
+                          .filter(lambda op: isinstance(op.value, str))
+                          .partition(lambda op: op.attributes))
+
+        assert passed == [Insert('World', {'bold': True})]
+        assert failed == [Insert('Hello', None), Insert('!', None)]
+
+    def test_reduce(self, delta):
+        length = delta.ops_view().reduce(lambda total, op: total + op.length)
+
+        assert length == delta.length() == 12
+
+    def test_to_delta_normalizes(self, delta):
+        result = (delta.ops_view()
+                  .filter(lambda op: isinstance(op.value, str))
+                  .map(lambda op: Insert(op.value, None))
+                  .to_delta())
+
+        assert result == Delta().insert('HelloWorld!')
+        assert delta.ops_view().to_delta() == delta
+
+
 class TestEachLine:
-    @pytest.mark.skip
     def test_expected(self):
         delta = (Delta().insert('Hello\n\n')
                  .insert('World', {'bold': True})
@@ -124,4 +246,45 @@ class TestEachLine:
         assert predicate.call_count == 4
         call_args = predicate.call_args_list
 
-        assert call_args[0] == (Delta().insert('Hello'), {}, 0)
+        assert call_args[0] == mock.call(Delta().insert('Hello'), {}, 0)
+        assert call_args[1] == mock.call(Delta(), {}, 1)
+        assert call_args[2] == mock.call(
+            Delta().insert('World', {'bold': True})
+                   .insert({'image': 'octocat.png'}),
+            {'align': 'right'}, 2)
+        assert call_args[3] == mock.call(Delta().insert('!'), {}, 3)
+
+    def test_early_return(self):
+        delta = Delta().insert('Hello\nWorld\n!')
+        predicate = mock.Mock(return_value=False)
+        delta.each_line(predicate)
+
+        assert predicate.call_count == 1
+
+
+class TestSlice:
+    def test_start(self):
+        delta = Delta().retain(2).insert('A')
+
+        assert delta.slice(2) == Delta().insert('A')
+
+    def test_start_and_end_chop(self):
+        delta = Delta().insert('0123456789')
+
+        assert delta.slice(2, 7) == Delta().insert('23456')
+
+    def test_split_ops(self):
+        delta = (Delta()
+                 .insert('AB', {'bold': True})
+                 .insert('C')
+                 .insert('DE', {'italic': True}))
+
+        assert delta.slice(1, 4) == (Delta()
+                                     .insert('B', {'bold': True})
+                                     .insert('C')
+                                     .insert('D', {'italic': True}))
+
+    def test_embeds_and_deletes(self):
+        delta = Delta().insert({'image': 'a.png'}).delete(2).retain(3)
+
+        assert delta.slice(1, 4) == Delta().delete(2).retain(1)
@@ -0,0 +1,170 @@
+import sys
+import threading
+
+import pytest
+
+from quilldelta import Delta, instrumentation
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_by_default():
+    original = Delta.push
+
+    Delta().insert('Hello')
+
+    assert not instrumentation.is_enabled()
+    assert Delta.push is original
+    assert instrumentation.snapshot() == {}
+
+
+def test_enable_and_disable_swap_functions():
+    original = Delta.push
+
+    instrumentation.enable()
+    assert Delta.push is not original
+    assert Delta.push.__wrapped__ is original
+
+    instrumentation.disable()
+    assert Delta.push is original
+
+
+def test_counters():
+    instrumentation.enable()
+
+    delta = Delta().insert('Hello').insert(' World', {'bold': True})
+    delta.as_json()
+    delta.each_line(lambda line, attributes, index: None)
+
+    stats = instrumentation.snapshot()
+
+    assert stats['Delta.push']['calls'] >= 2
+    assert stats['Delta.as_json'] == {
+        'calls': 1, 'ops': 2, 'time': stats['Delta.as_json']['time']}
+    assert stats['Delta.as_json']['time'] >= 0
+    assert stats['Delta.each_line']['ops'] == 2
+
+
+def test_profile_context_manager():
+    Delta().insert('ignored')
+
+    with instrumentation.profile() as counters:
+        assert instrumentation.is_enabled()
+        Delta().insert('A').compose(Delta().insert('B'))
+
+    assert not instrumentation.is_enabled()
+
+    stats = counters.snapshot()
+    assert stats['Delta.compose']['calls'] == 1
+    assert stats['Delta.compose']['ops'] == 2
+
+
+def test_profile_is_per_thread():
+    with instrumentation.profile() as counters:
+        thread = threading.Thread(target=lambda: Delta().as_json())
+        thread.start()
+        thread.join()
+
+        assert 'Delta.as_json' not in counters.snapshot()
+        assert instrumentation.snapshot()['Delta.as_json']['calls'] == 1
+
+
+@pytest.mark.skipif(not hasattr(sys, 'audit'), reason='requires sys.audit')
+def test_audit_events():
+    events = []
+
+    def hook(event, args):
+        if event.startswith('quilldelta.'):
+            events.append((event, args[0]))
+
+    sys.addaudithook(hook)
+    instrumentation.enable(audit=True)
+
+    Delta().insert('Hello').as_json()
+
+    assert ('quilldelta.Delta.as_json', 1) in events
+
+
+def test_overlapping_profiles():
+    first_open, second_open, first_closed = (threading.Event()
+                                             for _ in range(3))
+    results = {}
+
+    def first():
+        with instrumentation.profile():
+            first_open.set()
+            second_open.wait()
+        first_closed.set()
+
+    def second():
+        first_open.wait()
+
+        with instrumentation.profile() as counters:
+            second_open.set()
+            first_closed.wait()
+            Delta().as_json()
+
+        results['second'] = counters.snapshot()
+
+    threads = [threading.Thread(target=first),
+               threading.Thread(target=second)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results['second']['Delta.as_json']['calls'] == 1
+    assert not instrumentation.is_enabled()
+
+
+def test_profile_keeps_explicit_enable():
+    instrumentation.enable()
+
+    with instrumentation.profile():
+        pass
+
+    assert instrumentation.is_enabled()
+
+
+def test_counters_are_thread_safe():
+    instrumentation.enable()
+
+    def work():
+        for _ in range(2000):
+            Delta().as_json()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert instrumentation.snapshot()['Delta.as_json']['calls'] == 8000
+
+
+@pytest.mark.skipif(not hasattr(sys, 'audit'), reason='requires sys.audit')
+def test_audit_after_enable():
+    events = []
+
+    def hook(event, args):
+        if event == 'quilldelta.Delta.as_json':
+            events.append(args[0])
+
+    sys.addaudithook(hook)
+    instrumentation.enable()
+    Delta().as_json()
+
+    assert events == []
+
+    instrumentation.enable(audit=True)
+    Delta().as_json()
+
+    assert events == [0]
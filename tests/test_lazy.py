@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from quilldelta import Delta, Insert, LazyDelta, Retain
+
+RAW = b'[{"insert": "Hello", "attributes": {"bold": true}}, ' \
+      b'{"insert": {"image": "a.png"}}, {"retain": 3}, {"delete": 2}]'
+
+
+@pytest.fixture
+def delta():
+    return Delta().insert('Hello', {'bold': True}).insert(
+        {'image': 'a.png'}).retain(3).delete(2)
+
+
+class TestLazyDelta:
+    def test_sources(self, delta):
+        data = json.loads(RAW)
+
+        for source in (RAW, RAW.decode(), bytearray(RAW), data,
+                       {'ops': data}):
+            assert LazyDelta(source) == delta
+
+    def test_invalid_source(self):
+        with pytest.raises(TypeError):
+            LazyDelta(42)
+
+    def test_index_loads_one_operation(self):
+        lazy = LazyDelta(RAW)
+
+        assert len(lazy) == 4
+        assert lazy[0] == Insert('Hello', {'bold': True})
+        assert lazy[-2] == Retain(3, None)
+        assert lazy[0] is lazy[0]
+        assert lazy[1:3] == [Insert({'image': 'a.png'}, None),
+                             Retain(3, None)]
+        assert not lazy.loaded
+
+    def test_iteration(self, delta):
+        lazy = LazyDelta(RAW)
+
+        assert list(lazy) == list(delta.ops)
+        assert not lazy.loaded
+
+    def test_length_scans_raw_operations(self, delta):
+        lazy = LazyDelta(RAW)
+
+        assert lazy.length() == delta.length() == 11
+        assert not lazy.loaded
+
+    def test_as_json_passes_raw_through(self):
+        raw = '[{"insert":"Hello"},  {"retain":3}]'
+        lazy = LazyDelta(raw)
+
+        assert lazy.as_json() is raw
+        assert LazyDelta(RAW).as_json() == RAW.decode()
+        assert not lazy.loaded
+
+    def test_as_bytes(self):
+        lazy = LazyDelta(RAW)
+
+        assert lazy.as_bytes() is lazy._raw
+
+    def test_reads_do_not_count_as_modifications(self):
+        lazy = LazyDelta(RAW)
+        lazy.compose(Delta().retain(1, {'italic': True}))
+
+        assert lazy.loaded
+        assert not lazy.modified()
+        assert lazy.as_json() == RAW.decode()
+
+    def test_modified(self, delta):
+        lazy = LazyDelta(RAW)
+        lazy.insert('!')
+
+        assert lazy.modified()
+        assert lazy == delta.copy().insert('!')
+        assert json.loads(lazy.as_json()) == lazy.as_data()
+        assert lazy.as_bytes() == lazy.as_json().encode()
+
+    def test_modified_with_same_hash(self):
+        lazy = LazyDelta('[{"insert": {"x": -1}}]')
+        before = hash(lazy.ops)
+        lazy.ops[0] = Insert({'x': -2}, None)
+
+        assert hash(lazy.ops) == before
+        assert lazy.modified()
+        assert json.loads(lazy.as_json()) == [{'insert': {'x': -2}}]
+
+    def test_replaced_ops_are_modified(self):
+        lazy = LazyDelta(RAW)
+        lazy.ops = Delta().insert('A').ops
+
+        assert lazy.modified()
+        assert lazy.as_json() == '[{"insert": "A"}]'
+
+    def test_ops_form_is_output_as_a_list(self, delta):
+        for raw in ('{"ops": [{"insert": "A"}]}', b' {"ops": []}'):
+            lazy = LazyDelta(raw)
+            assert lazy.as_json() == Delta(json.loads(raw)).as_json()
+            assert lazy.as_bytes() == lazy.as_json().encode()
+
+    def test_loading_keeps_indexed_operations(self):
+        lazy = LazyDelta(RAW)
+        first = lazy[0]
+
+        assert lazy.ops[0] is first
+
+    def test_copy(self, delta):
+        lazy = LazyDelta(RAW)
+        copy = lazy.copy()
+
+        assert isinstance(copy, LazyDelta)
+        assert copy.as_json() == RAW.decode()
+
+        lazy.insert('!')
+
+        assert not isinstance(lazy.copy(), LazyDelta)
+        assert copy == delta
+
+    def test_as_data(self, delta):
+        assert LazyDelta(RAW).as_data() == delta.as_data()
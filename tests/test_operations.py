@@ -1,8 +1,13 @@
+import os
+import pickle
+import subprocess
+import sys
 from functools import reduce
 
 import pytest
 
-from quilldelta import Delete, Insert, Retain
+from quilldelta import Delete, Delta, Insert, Retain
+from quilldelta.operations import OperationsIterator
 
 
 class TestInsert:
@@ -166,3 +171,82 @@ class TestDelete:
             Delete(1) + Insert('foo', None)
 
         assert err.match('Operations are not the same type')
+
+
+class TestOperationsIterator:
+    @pytest.fixture
+    def delta(self):
+        return Delta().insert('Hello', {'bold': True}).retain(3).insert(
+            {'image': 'a.png'}).delete(4)
+
+    def test_peek(self, delta):
+        iterator = OperationsIterator(delta.ops)
+
+        assert iterator.has_next()
+        assert iterator.peek_length() == 5
+        assert iterator.peek_type() is Insert
+
+        iterator.next(2)
+
+        assert iterator.peek_length() == 3
+        assert iterator.peek_type() is Insert
+
+    def test_next(self, delta):
+        iterator = OperationsIterator(delta.ops)
+
+        assert iterator.next(2) == Insert('He', {'bold': True})
+        assert iterator.next(10) == Insert('llo', {'bold': True})
+        assert iterator.next(1) == Retain(1, None)
+        assert iterator.next() == Retain(2, None)
+        assert iterator.next() == Insert({'image': 'a.png'}, None)
+        assert iterator.next(1) == Delete(1)
+        assert iterator.next() == Delete(3)
+        assert not iterator.has_next()
+
+    def test_end(self):
+        iterator = OperationsIterator(Delta().ops)
+
+        assert not iterator.has_next()
+        assert iterator.peek() is None
+        assert iterator.peek_type() is Retain
+        assert iterator.peek_length() == float('inf')
+        assert iterator.next().length == float('inf')
+
+    def test_whole_operations_are_not_copied(self, delta):
+        iterator = OperationsIterator(delta.ops)
+
+        assert iterator.next() is delta.ops[0]
+
+    def test_rest(self, delta):
+        iterator = OperationsIterator(delta.ops)
+
+        assert iterator.rest() == list(delta.ops)
+
+        iterator.next(2)
+
+        assert iterator.rest() == [Insert('llo', {'bold': True}),
+                                   *delta.ops[1:]]
+        assert iterator.peek_length() == 3
+
+        iterator.next(3)
+        iterator.next(3)
+        iterator.next()
+        iterator.next()
+
+        assert iterator.rest() == []
+
+
+def test_pickle_across_hash_seeds():
+    delta = Delta().insert('Hello', {'bold': True}).insert({'image': 'a'})
+    script = ('import pickle, sys; from quilldelta import Delta; '
+              'sys.stdout.buffer.write(pickle.dumps(Delta().insert('
+              '"Hello", {"bold": True}).insert({"image": "a"})))')
+    environ = dict(os.environ, PYTHONHASHSEED='1')
+    data = subprocess.check_output([sys.executable, '-c', script],
+                                   env=environ)
+
+    remote = pickle.loads(data)
+
+    assert remote == delta
+    assert hash(remote.ops) == hash(delta.ops)
+
@@ -0,0 +1,114 @@
+from quilldelta import Delta
+from quilldelta.utils import process_map
+
+
+class TestFromHtml:
+    def test_paragraphs(self):
+        delta = Delta.from_html('<p>Hello</p><p><br></p><p>World</p>')
+        expected = Delta().insert('Hello\n\nWorld\n')
+
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_whitespace(self):
+        delta = Delta.from_html('<p>\n  Hello \n  World  </p>')
+        expected = Delta().insert('Hello World\n')
+
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_nested_inline_formats(self):
+        delta = Delta.from_html(
+            '<p>a <b>b <i>c</i></b> <a href="https://quilljs.com">d</a></p>')
+        expected = (Delta()
+                    .insert('a ')
+                    .insert('b ', {'bold': True})
+                    .insert('c', {'bold': True, 'italic': True})
+                    .insert(' ')
+                    .insert('d', {'link': 'https://quilljs.com'})
+                    .insert('\n'))
+
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_attributes_are_interned(self):
+        delta = Delta.from_html('<p><b>a</b> <b>b</b></p>')
+
+        assert delta.ops[0].attributes is delta.ops[2].attributes
+
+    def test_block_formats(self):
+        delta = Delta.from_html(
+            '<h1>Title</h1>'
+            '<ul><li>One</li><li>Two<ol><li>Nested</li></ol></li></ul>'
+            '<blockquote>Quote</blockquote>'
+            '<pre>a &lt; b\nc</pre>')
+        expected = (Delta()
+                    .insert('Title')
+                    .insert('\n', {'header': 1})
+                    .insert('One')
+                    .insert('\n', {'list': 'bullet'})
+                    .insert('Two')
+                    .insert('\n', {'list': 'bullet'})
+                    .insert('Nested')
+                    .insert('\n', {'list': 'ordered', 'indent': 1})
+                    .insert('Quote')
+                    .insert('\n', {'blockquote': True})
+                    .insert('a < b')
+                    .insert('\n', {'code-block': True})
+                    .insert('c')
+                    .insert('\n', {'code-block': True}))
+
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_embeds(self):
+        delta = Delta.from_html('<p><img src="octocat.png" alt="Octocat"></p>')
+        expected = (Delta()
+                    .insert({'image': 'octocat.png'}, {'alt': 'Octocat'})
+                    .insert('\n'))
+
+        assert delta == expected, [delta.ops, expected.ops]
+
+    def test_ignored_tags(self):
+        delta = Delta.from_html(
+            '<head><title>x</title><style>p {}</style></head><p>Hi</p>')
+
+        assert delta == Delta().insert('Hi\n')
+
+    def test_head_without_end_tag(self):
+        delta = Delta.from_html(
+            '<html><head><title>T</title><meta charset="utf-8">'
+            '<base href="/"><body><p>Hello <b>world</b></p></body></html>')
+
+        assert delta == (Delta()
+                         .insert('Hello ')
+                         .insert('world', {'bold': True})
+                         .insert('\n'))
+
+    def test_nothing_inside_ignored_tags(self):
+        delta = Delta.from_html(
+            '<template><img src="x.png"><p>a</p><br>'
+            '<iframe src="v.mp4"></iframe></template>'
+            '<script><img src="y.png"></script>'
+            '<p><img src="z.png"></p>')
+
+        assert delta == Delta().insert({'image': 'z.png'}).insert('\n')
+
+    def test_streaming_chunks(self):
+        chunks = ['<p>Hel', 'lo <b', '>World</b></p>']
+        delta = Delta.from_html(iter(chunks))
+        expected = Delta().insert('Hello ').insert('World', {'bold': True})
+
+        assert delta == expected.insert('\n'), [delta.ops, expected.ops]
+
+    def test_round_trip(self):
+        delta = Delta.from_html('<p>a<strong>b</strong></p>')
+
+        assert delta.as_html() == '<p>a<strong>b</strong></p>'
+
+
+def test_process_map():
+    pages = ['<p>One</p>', '<p>Two</p>', '<p>Three</p>']
+    results = list(process_map(Delta.from_html, pages, processes=2))
+
+    assert results == [Delta().insert('One\n'),
+                       Delta().insert('Two\n'),
+                       Delta().insert('Three\n')]
+
+    assert list(process_map(len, pages, processes=1)) == [10, 10, 12]
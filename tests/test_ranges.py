@@ -0,0 +1,177 @@
+import random
+
+import pytest
+
+from quilldelta import Delta
+from quilldelta.ranges import Range, RangeSet
+
+
+@pytest.fixture
+def ranges():
+    ranges = RangeSet(Delta().insert('Hello World'))
+    ranges.add(0, 5, 'hello')
+    ranges.add(6, 11, 'world')
+    ranges.add(4, 7, 'middle')
+    return ranges
+
+
+class TestRangeSet:
+    def test_add(self, ranges):
+        key = ranges.add(2, 3)
+
+        assert key in ranges
+        assert ranges[key] == Range(2, 3, None)
+        assert len(ranges) == 4
+
+    def test_iteration_is_sorted(self, ranges):
+        assert [item.data for key, item in ranges] == \
+            ['hello', 'middle', 'world']
+
+    def test_invalid_ranges(self, ranges):
+        with pytest.raises(ValueError):
+            ranges.add(3, 2)
+        with pytest.raises(ValueError):
+            ranges.add(0, 12)
+
+    def test_remove(self, ranges):
+        key = ranges.add(1, 2, 'removed')
+
+        assert ranges.remove(key).data == 'removed'
+        assert key not in ranges
+        assert len(ranges.overlapping(1)) == 1
+
+    def test_overlapping(self, ranges):
+        def data(keys):
+            return sorted(ranges[key].data for key in keys)
+
+        assert data(ranges.overlapping(0)) == ['hello']
+        assert data(ranges.overlapping(5)) == ['hello', 'middle']
+        assert data(ranges.overlapping(8)) == ['world']
+        assert data(ranges.overlapping(5, 6)) == ['hello', 'middle', 'world']
+        assert data(ranges.overlapping(20)) == []
+
+    def test_insert_shifts_ranges(self, ranges):
+        ranges.apply(Delta().retain(5).insert(','))
+
+        assert [item[:2] for key, item in ranges] == [(0, 5), (4, 8), (7, 12)]
+        assert ranges.document == Delta().insert('Hello, World')
+
+    def test_delete_shrinks_ranges(self, ranges):
+        ranges.apply(Delta().retain(3).delete(5))
+
+        assert [item[:2] for key, item in ranges] == [(0, 3), (3, 3), (3, 6)]
+
+    def test_drop_empty(self):
+        ranges = RangeSet(drop_empty=True)
+        cursor = ranges.add(2, 2)
+        word = ranges.add(4, 6)
+
+        ranges.apply(Delta().retain(3).delete(5))
+
+        assert cursor in ranges
+        assert word not in ranges
+
+    def test_stickiness(self):
+        for expand_start, expand_end, expected in ((False, False, (3, 5)),
+                                                   (True, False, (2, 5)),
+                                                   (False, True, (3, 6)),
+                                                   (True, True, (2, 6))):
+            ranges = RangeSet(expand_start=expand_start,
+                              expand_end=expand_end)
+            key = ranges.add(2, 4)
+
+            ranges.apply(Delta().retain(2).insert('A').retain(2).insert('B'))
+
+            assert ranges[key][:2] == expected
+
+    def test_collapsed_range_stays_collapsed(self):
+        ranges = RangeSet(expand_start=False, expand_end=False)
+        key = ranges.add(2, 2)
+
+        ranges.apply(Delta().retain(2).insert('A'))
+
+        assert ranges[key][:2] == (2, 2)
+
+    def test_formatting_does_not_move_ranges(self, ranges):
+        ranges.apply(Delta().retain(5, {'bold': True}))
+
+        assert [item[:2] for key, item in ranges] == [(0, 5), (4, 7), (6, 11)]
+        assert ranges.document == Delta().insert(
+            'Hello', {'bold': True}).insert(' World')
+
+    def test_matches_transform_position(self):
+        rnd = random.Random(0)
+        ranges = RangeSet(expand_end=True)
+        expected = {}
+
+        for _ in range(200):
+            start = rnd.randint(0, 100)
+            end = rnd.randint(start, 110)
+            expected[ranges.add(start, end)] = (start, end)
+
+        for _ in range(20):
+            change = Delta().retain(rnd.randint(0, 100)).insert('abc').retain(
+                rnd.randint(0, 10)).delete(rnd.randint(0, 10))
+            ranges.apply(change)
+
+            for key, (start, end) in expected.items():
+                start = change.transform_position(start, False)
+                end = change.transform_position(end, False)
+                expected[key] = (min(start, end), end)
+
+            assert {key: item[:2] for key, item in ranges} == expected
+
+            point = rnd.randint(0, 120)
+            assert sorted(ranges.overlapping(point)) == sorted(
+                key for key, (start, end) in expected.items()
+                if start <= point <= end)
+
+    def test_interleaved_edits_match_transform_position(self):
+        rnd = random.Random(1)
+
+        for drop_empty in (False, True):
+            ranges = RangeSet(expand_start=True, drop_empty=drop_empty)
+            expected = {}
+
+            for _ in range(25):
+                for _ in range(rnd.randint(0, 9) ** 2):
+                    start = rnd.randint(0, 100)
+                    end = rnd.randint(start, start + 10)
+                    expected[ranges.add(start, end)] = (start, end)
+
+                if expected and rnd.random() < 0.3:
+                    key = rnd.choice(list(expected))
+                    assert ranges.remove(key)[:2] == expected.pop(key)
+
+                change = Delta().retain(rnd.randint(0, 100))
+                for _ in range(rnd.randint(1, 3)):
+                    if rnd.random() < 0.5:
+                        change.insert('ab')
+                    else:
+                        change.delete(rnd.randint(1, 5))
+                    change.retain(rnd.randint(0, 5))
+                ranges.apply(change)
+
+                for key, (start, end) in list(expected.items()):
+                    moved_start = change.transform_position(start, True)
+                    moved_end = change.transform_position(end, True)
+                    moved_start = min(moved_start, moved_end)
+
+                    if drop_empty and moved_start == moved_end and \
+                            start < end:
+                        del expected[key]
+                    else:
+                        expected[key] = (moved_start, moved_end)
+
+                assert {key: item[:2] for key, item in ranges} == expected
+                assert all(ranges[key][:2] == item
+                           for key, item in expected.items())
+
+    def test_length_follows_document(self, ranges):
+        ranges.apply(Delta().retain(5).delete(6))
+
+        with pytest.raises(ValueError):
+            ranges.add(0, 6)
+
+        ranges.document = Delta().insert('Hello World')
+        assert ranges.add(0, 11) in ranges
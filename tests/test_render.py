@@ -0,0 +1,285 @@
+import io
+from random import Random
+
+from quilldelta import Delta
+from quilldelta.render import HtmlRenderer, MarkdownRenderer
+
+
+class TestHtml:
+    def test_paragraphs(self):
+        delta = Delta().insert('Hello\n\nWorld\n')
+
+        assert delta.as_html() == '<p>Hello</p><p><br></p><p>World</p>'
+
+    def test_trailing_line(self):
+        delta = Delta().insert('Hello\nWorld')
+
+        assert delta.as_html() == '<p>Hello</p><p>World</p>'
+
+    def test_inline_formats(self):
+        delta = (Delta()
+                 .insert('bold', {'bold': True})
+                 .insert(' ')
+                 .insert('link', {'link': 'https://quilljs.com',
+                                  'italic': True})
+                 .insert(' <x>', {'color': 'red'})
+                 .insert('\n'))
+
+        assert delta.as_html() == (
+            '<p><strong>bold</strong> '
+            '<a href="https://quilljs.com"><em>link</em></a>'
+            '<span style="color:red"> &lt;x&gt;</span></p>')
+
+    def test_block_formats(self):
+        delta = (Delta()
+                 .insert('Title')
+                 .insert('\n', {'header': 1})
+                 .insert('Quote')
+                 .insert('\n', {'blockquote': True, 'align': 'center'}))
+
+        assert delta.as_html() == (
+            '<h1>Title</h1>'
+            '<blockquote class="ql-align-center">Quote</blockquote>')
+
+    def test_lists(self):
+        delta = (Delta()
+                 .insert('One')
+                 .insert('\n', {'list': 'ordered'})
+                 .insert('Two')
+                 .insert('\n', {'list': 'ordered'})
+                 .insert('Bullet')
+                 .insert('\n', {'list': 'bullet'})
+                 .insert('Text\n'))
+
+        assert delta.as_html() == (
+            '<ol><li>One</li><li>Two</li></ol>'
+            '<ul><li>Bullet</li></ul>'
+            '<p>Text</p>')
+
+    def test_code_block(self):
+        delta = (Delta()
+                 .insert('if a < b:')
+                 .insert('\n', {'code-block': True})
+                 .insert('    pass')
+                 .insert('\n', {'code-block': True}))
+
+        assert delta.as_html() == '<pre>if a &lt; b:\n    pass\n</pre>'
+
+    def test_embeds(self):
+        delta = (Delta()
+                 .insert({'image': 'octocat.png'}, {'alt': 'Octocat'})
+                 .insert({'video': 'https://example.com/v'})
+                 .insert('\n'))
+
+        assert delta.as_html() == (
+            '<p><img src="octocat.png" alt="Octocat">'
+            '<iframe class="ql-video" frameborder="0" allowfullscreen="true" '
+            'src="https://example.com/v"></iframe></p>')
+
+    def test_write_to_sink(self):
+        delta = Delta().insert('Hello\n')
+        sink = io.StringIO()
+        delta.write_html(sink)
+
+        assert sink.getvalue() == '<p>Hello</p>'
+
+
+class TestLineCache:
+    def test_only_changed_lines_render(self):
+        renderer = HtmlRenderer()
+        delta = Delta().insert('One\nTwo\nThree\n')
+
+        renderer.render(delta)
+        assert renderer.misses == 3
+        assert renderer.hits == 0
+
+        edited = Delta().insert('One\nTwo!\nThree\n')
+
+        assert renderer.render(edited) == '<p>One</p><p>Two!</p><p>Three</p>'
+        assert renderer.misses == 4
+        assert renderer.hits == 2
+
+    def test_cache_is_bounded(self):
+        renderer = HtmlRenderer(maxsize=2)
+        renderer.render(Delta().insert('One\nTwo\nThree\n'))
+
+        assert len(renderer._cache) == 2
+
+    def test_attributes_are_part_of_the_key(self):
+        renderer = HtmlRenderer()
+
+        assert renderer.render(Delta().insert('One\n')) == '<p>One</p>'
+        assert renderer.render(
+            Delta().insert('One').insert('\n', {'header': 2})
+        ) == '<h2>One</h2>'
+
+    def test_attribute_types_are_part_of_the_key(self):
+        renderer = HtmlRenderer()
+
+        assert renderer.render(
+            Delta().insert('One').insert('\n', {'header': 1})
+        ) == '<h1>One</h1>'
+        assert renderer.render(
+            Delta().insert('One').insert('\n', {'header': True})
+        ) == '<p>One</p>'
+
+    def test_invalid_header(self):
+        for header in ('1 onmouseover=alert(1)', True, 7, 0, '2'):
+            delta = Delta().insert('One').insert('\n', {'header': header})
+            assert delta.as_html() == '<p>One</p>'
+
+    def test_unsafe_urls(self):
+        delta = (Delta()
+                 .insert('a', {'link': 'javascript:alert(1)'})
+                 .insert('b', {'link': ' Java\tScript:alert(1)'})
+                 .insert('c', {'link': '/relative/path'})
+                 .insert('d', {'link': 'mailto:a@example.com'})
+                 .insert({'image': 'javascript:alert(1)'})
+                 .insert({'image': 'data:image/png;base64,AA=='})
+                 .insert('\n'))
+
+        assert delta.as_html() == (
+            '<p><a href="about:blank">a</a><a href="about:blank">b</a>'
+            '<a href="/relative/path">c</a>'
+            '<a href="mailto:a@example.com">d</a>'
+            '<img src="about:blank">'
+            '<img src="data:image/png;base64,AA=="></p>')
+
+
+class TestMarkdown:
+    def test_paragraphs(self):
+        delta = Delta().insert('Hello\n\nWorld\n')
+
+        assert delta.as_markdown() == 'Hello\n\nWorld\n\n'
+
+    def test_inline_formats(self):
+        delta = (Delta()
+                 .insert('bold ', {'bold': True})
+                 .insert('a*b')
+                 .insert(' link', {'link': 'https://quilljs.com'})
+                 .insert(' code', {'code': True})
+                 .insert('\n'))
+
+        assert delta.as_markdown() == (
+            '**bold** a\\*b [link](https://quilljs.com) `code`\n\n')
+
+    def test_block_formats(self):
+        delta = (Delta()
+                 .insert('Title')
+                 .insert('\n', {'header': 2})
+                 .insert('Quote')
+                 .insert('\n', {'blockquote': True})
+                 .insert('One')
+                 .insert('\n', {'list': 'bullet'})
+                 .insert('Two')
+                 .insert('\n', {'list': 'bullet', 'indent': 1})
+                 .insert('x = 1')
+                 .insert('\n', {'code-block': True})
+                 .insert({'image': 'octocat.png'}, {'alt': 'Octocat'})
+                 .insert('\n'))
+
+        assert delta.as_markdown() == (
+            '## Title\n\n'
+            '> Quote\n\n'
+            '- One\n'
+            '    - Two\n'
+            '\n'
+            '```\nx = 1\n```\n\n'
+            '![Octocat](octocat.png)\n\n')
+
+    def test_write_to_sink(self):
+        delta = Delta().insert('Hello\n')
+        sink = io.StringIO()
+        delta.write_markdown(sink)
+
+        assert sink.getvalue() == 'Hello\n\n'
+
+    def test_only_changed_lines_render(self):
+        renderer = MarkdownRenderer()
+        renderer.render(Delta().insert('One\nTwo\nThree\n'))
+        renderer.render(Delta().insert('One\nTwo!\nThree\n'))
+
+        assert renderer.misses == 4
+        assert renderer.hits == 2
+
+    def test_invalid_header_and_indent(self):
+        delta = (Delta()
+                 .insert('One')
+                 .insert('\n', {'header': 'x'})
+                 .insert('Two')
+                 .insert('\n', {'list': 'bullet', 'indent': 'x'}))
+
+        assert delta.as_markdown() == 'One\n\n- Two\n\n'
+
+    def test_unsafe_link(self):
+        delta = Delta().insert('a', {'link': 'javascript:alert(1)'})
+
+        assert delta.as_markdown() == '[a](about:blank)\n\n'
+
+    def test_unsafe_image(self):
+        delta = (Delta()
+                 .insert({'image': 'javascript:alert(1)'})
+                 .insert({'image': 'a b).png'})
+                 .insert({'video': 'https://x.test/a (1)'})
+                 .insert('\n'))
+
+        assert delta.as_markdown() == (
+            '![](about:blank)![](a%20b%29.png)'
+            '[https://x.test/a%20%281%29](https://x.test/a%20%281%29)\n\n')
+
+    def test_code_with_backticks(self):
+        delta = (Delta()
+                 .insert('a``b', {'code': True})
+                 .insert(' ')
+                 .insert('`c', {'code': True})
+                 .insert('\n'))
+
+        assert delta.as_markdown() == '```a``b``` `` `c ``\n\n'
+
+    def test_block_markers_are_escaped(self):
+        delta = Delta().insert('- a\n+ b\n* c\n1. d\n2) e\n---\nx - y\n')
+        delta.insert('- f').insert('\n', {'list': 'bullet'})
+
+        assert delta.as_markdown() == (
+            '\\- a\n\n\\+ b\n\n\\* c\n\n1\\. d\n\n2\\) e\n\n'
+            '\\---\n\nx - y\n\n- \\- f\n\n')
+
+
+class TestTracking:
+    def changes(self, document, random):
+        attributes = [None, {'bold': True}, {'header': 1}, {'bold': None},
+                      {'list': 'bullet'}, {'code-block': True}]
+        for _ in range(30):
+            length = document.length()
+            index = random.randint(0, length)
+            change = Delta().retain(index)
+            if random.random() < 0.4 or index == length:
+                change.insert(random.choice(['a', '\n', 'b\nc']),
+                              random.choice(attributes[:2]))
+            elif random.random() < 0.5:
+                change.delete(random.randint(1, min(3, length - index)))
+            else:
+                change.retain(random.randint(1, length - index),
+                              random.choice(attributes))
+            document = document.compose(change)
+            yield change, document
+
+    def test_matches_render(self):
+        random = Random(7)
+        for renderer in (HtmlRenderer(), MarkdownRenderer()):
+            for document in (Delta(), Delta().insert('One\nTwo\n')):
+                tracked = renderer.track(document)
+                for change, document in self.changes(document, random):
+                    tracked.apply(change)
+                    assert tracked.document() == document
+                    assert tracked.getvalue() == renderer.render(document)
+
+    def test_only_touched_lines_render(self):
+        renderer = MarkdownRenderer()
+        tracked = renderer.track(Delta().insert('One\nTwo\nThree\n'))
+        misses = renderer.misses
+
+        tracked.apply(Delta().retain(7).insert('!'))
+
+        assert renderer.misses == misses + 1
+        assert tracked.getvalue() == 'One\n\nTwo!\n\nThree\n\n'
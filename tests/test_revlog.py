@@ -0,0 +1,165 @@
+import io
+import json
+from random import Random
+
+import pytest
+
+from quilldelta import Delta
+from quilldelta.revlog import (LZMA, RevisionLogReader, RevisionLogWriter,
+                               decode, encode, read_varint, write_varint)
+
+
+@pytest.fixture
+def changes():
+    return [
+        Delta().insert('Hello World\n'),
+        Delta().retain(5).insert(','),
+        Delta().retain(6).retain(6, {'bold': True}),
+        Delta().retain(3).delete(2),
+        Delta().retain(10).insert({'image': 'a.png'}, {'alt': 'A'}),
+        Delta().retain(11).insert('\n', {'header': 1}),
+        Delta().retain(2, {'bold': True}).insert('é😀', {'bold': True}),
+        Delta().delete(1),
+    ]
+
+
+def test_varint():
+    buffer = bytearray()
+
+    for value in (0, 1, 127, 128, 300, 2 ** 40):
+        write_varint(buffer, value)
+
+    offset = 0
+    values = []
+
+    while offset < len(buffer):
+        value, offset = read_varint(buffer, offset)
+        values.append(value)
+
+    assert values == [0, 1, 127, 128, 300, 2 ** 40]
+
+
+class TestRevisionLog:
+    @pytest.mark.parametrize('compression', ['zlib', 'lzma'])
+    @pytest.mark.parametrize('block_size', [1, 3, 64])
+    def test_round_trip(self, changes, compression, block_size):
+        data = encode(changes, compression=compression, block_size=block_size)
+
+        assert decode(data) == changes
+
+    def test_replay(self, changes):
+        document = Delta()
+
+        for change in changes:
+            document = document.compose(change)
+
+        reader = RevisionLogReader(io.BytesIO(encode(changes, block_size=3)))
+
+        assert reader.replay() == document
+
+    def test_replay_onto_document(self, changes):
+        base = Delta().insert('Base\n')
+        reader = RevisionLogReader(io.BytesIO(encode(changes[1:])))
+        expected = base
+
+        for change in changes[1:]:
+            expected = expected.compose(change)
+
+        assert reader.replay(base) == expected
+
+    def test_replay_keeps_removed_attributes(self):
+        changes = [
+            Delta().insert('abcdef', {'bold': True}).insert('\n'),
+            Delta().retain(3).retain(2, {'bold': None}).insert('z'),
+            Delta().insert('x').retain(6, {'color': 'red'}),
+            Delta().retain(2).retain(3, {'bold': True, 'color': None}),
+            Delta().retain(4, {'italic': True}).delete(2),
+        ]
+        expected = Delta()
+
+        for change in changes:
+            expected = expected.compose(change)
+
+        for block_size in (1, 2, 3, 64):
+            data = encode(changes, block_size=block_size)
+            assert RevisionLogReader(io.BytesIO(data)).replay() == expected
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_replay_matches_sequential_compose(self, seed):
+        random = Random(seed)
+        attributes = [None, {'bold': True}, {'bold': None},
+                      {'color': 'red'}, {'bold': None, 'color': None}]
+        document = Delta().insert('Hello World\n')
+        expected, changes = document, []
+
+        for _ in range(40):
+            length, change = expected.length(), Delta()
+            index = random.randint(0, length)
+            change.retain(index).retain(random.randint(0, length - index),
+                                        random.choice(attributes))
+
+            if random.random() < 0.5 or change.length() == length:
+                change.insert('xy'[random.randrange(2)],
+                              random.choice(attributes[:2]))
+            else:
+                change.delete(min(random.randint(1, 3),
+                                  length - change.length()))
+
+            changes.append(change)
+            expected = expected.compose(change)
+
+        data = encode(changes, block_size=random.randint(2, 10))
+
+        assert RevisionLogReader(io.BytesIO(data)).replay(document) == \
+            expected
+
+    def test_blocks(self, changes):
+        reader = RevisionLogReader(io.BytesIO(encode(changes, block_size=3)))
+
+        assert [len(block) for block in reader.blocks()] == [3, 3, 2]
+
+    def test_decoded_attributes_are_copies(self, changes):
+        decoded = decode(encode(changes))
+        decoded[2].ops[1].attributes['italic'] = True
+
+        assert decoded[6].ops[0].attributes == {'bold': True}
+
+    def test_smaller_than_json(self):
+        changes = [Delta().retain(1000 + index).insert('x', {'bold': True})
+                   for index in range(500)]
+        stream = io.BytesIO()
+
+        with RevisionLogWriter(stream) as writer:
+            writer.extend(changes)
+
+        size = len(json.dumps([change.as_data() for change in changes]))
+
+        assert len(stream.getvalue()) * 20 < size
+        assert writer.stats()['changes'] == 500
+        assert writer.stats()['ratio'] > 1
+
+    def test_lzma_has_no_dictionary(self, changes):
+        data = encode(changes, compression=LZMA)
+
+        assert decode(data, dictionary=b'other') == changes
+
+    def test_dictionary_must_match(self, changes):
+        data = encode(changes, dictionary=b'custom')
+
+        assert decode(data, dictionary=b'custom') == changes
+
+        with pytest.raises(ValueError):
+            decode(data)
+
+    def test_invalid(self, changes):
+        with pytest.raises(ValueError):
+            decode(b'nope')
+
+        with pytest.raises(ValueError):
+            encode(changes, compression='bz2')
+
+        with pytest.raises(ValueError):
+            decode(encode(changes)[:-3])
+
+        with pytest.raises(ValueError):
+            decode(encode(changes)[:-3] + b'\xff' * 3)
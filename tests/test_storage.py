@@ -0,0 +1,120 @@
+import pytest
+
+from quilldelta import Delta, Insert, Retain
+from quilldelta.storage import CHUNK_SIZE, MmapDelta
+from quilldelta.unicode import UTF16, length_unit
+
+
+@pytest.fixture
+def document():
+    return (Delta()
+            .insert('Title')
+            .insert('\n', {'header': 1})
+            .insert('Hello ')
+            .insert('World', {'bold': True})
+            .insert({'image': 'a.png'}, {'alt': 'A'})
+            .insert('\n')
+            .insert('Last line'))
+
+
+@pytest.fixture
+def path(tmpdir, document):
+    path = str(tmpdir.join('document.qd'))
+    document.write_mmap(path)
+    return path
+
+
+class TestMmapDelta:
+    def test_round_trip(self, path, document):
+        with Delta.open_mmap(path) as stored:
+            assert isinstance(stored, MmapDelta)
+            assert len(stored) == len(document.ops)
+            assert stored.to_delta() == document
+            assert stored[3] == Insert('World', {'bold': True})
+            assert stored[-1] == Insert('\nLast line', None)
+
+    def test_length(self, path, document):
+        with Delta.open_mmap(path) as stored:
+            assert stored.length() == document.length()
+
+    def test_slice(self, path, document):
+        with Delta.open_mmap(path) as stored:
+            for start, end in ((0, 3), (2, 12), (8, 14), (17, 19), (18, None),
+                               (0, None), (5, 5), (10, 100)):
+                assert stored.slice(start, end) == document.slice(start, end)
+
+    def test_lines(self, path, document):
+        with Delta.open_mmap(path) as stored:
+            lines = []
+            document.each_line(lambda line, attributes, index:
+                               lines.append((line, attributes)))
+
+            assert stored.line_count() == len(lines) == 3
+            assert [stored.line(index) for index in range(3)] == lines
+            assert stored.line(-1) == lines[-1]
+
+    def test_line_at(self, path):
+        with Delta.open_mmap(path) as stored:
+            assert [stored.line_at(position) for position in
+                    (0, 5, 6, 18, 19, 28)] == [0, 0, 1, 1, 2, 2]
+            assert stored.line_range(1) == (6, 18)
+
+    def test_long_inserts_are_chunked(self, tmpdir):
+        path = str(tmpdir.join('long.qd'))
+        text = ('x' * 100 + '\n') * (CHUNK_SIZE // 25)
+        document = Delta().insert(text, {'bold': True})
+        document.write_mmap(path)
+
+        with Delta.open_mmap(path) as stored:
+            assert len(stored) > 1
+            assert stored.to_delta() == document
+            assert stored.line(20) == (Delta().insert('x' * 100,
+                                                      {'bold': True}),
+                                       {'bold': True})
+            assert stored.slice(4000, 4100) == document.slice(4000, 4100)
+
+    def test_changes(self, tmpdir):
+        path = str(tmpdir.join('change.qd'))
+        change = Delta().retain(3, {'bold': None}).delete(2).insert('A')
+        change.write_mmap(path)
+
+        with Delta.open_mmap(path) as stored:
+            assert stored.to_delta() == change
+            assert stored[0] == Retain(3, {'bold': None})
+
+    def test_empty(self, tmpdir):
+        path = str(tmpdir.join('empty.qd'))
+        Delta().write_mmap(path)
+
+        with Delta.open_mmap(path) as stored:
+            assert len(stored) == 0
+            assert stored.length() == 0
+            assert stored.line_count() == 0
+            assert stored.slice() == Delta()
+
+    def test_not_a_delta_file(self, tmpdir):
+        path = tmpdir.join('other.txt')
+        path.write('x' * 200)
+
+        with pytest.raises(ValueError):
+            Delta.open_mmap(str(path))
+
+    def test_truncated(self, tmpdir, path):
+        truncated = tmpdir.join('truncated.qd')
+        truncated.write_binary(open(path, 'rb').read()[:120])
+
+        with pytest.raises(ValueError):
+            Delta.open_mmap(str(truncated))
+
+    def test_length_unit_must_match(self, tmpdir):
+        path = str(tmpdir.join('utf16.qd'))
+
+        with length_unit(UTF16):
+            Delta().insert('😀\n').write_mmap(path)
+
+            with Delta.open_mmap(path) as stored:
+                assert stored.length() == 3
+                assert stored.line_range(0) == (0, 2)
+
+        with pytest.raises(ValueError):
+            Delta.open_mmap(path)
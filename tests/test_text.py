@@ -0,0 +1,78 @@
+import re
+
+from quilldelta import Delta
+
+
+class TestTextProjection:
+    def test_as_text(self):
+        delta = (Delta()
+                 .insert('Hello ', {'bold': True})
+                 .insert({'image': 'octocat.png'})
+                 .insert('World\n'))
+
+        assert delta.as_text() == 'Hello World\n'
+
+    def test_cached_until_mutation(self):
+        delta = Delta().insert('Hello')
+        projection = delta.text_projection()
+
+        assert delta.text_projection() is projection
+
+        delta.insert(' World')
+
+        assert delta.text_projection() is not projection
+        assert delta.as_text() == 'Hello World'
+
+    def test_copies_share_projection(self):
+        delta = Delta().insert('Hello')
+        projection = delta.text_projection()
+        copy = delta.copy()
+
+        assert copy.text_projection() is projection
+
+        copy.insert('!')
+
+        assert copy.as_text() == 'Hello!'
+        assert delta.text_projection() is projection
+
+    def test_offset_mapping(self):
+        delta = (Delta()
+                 .insert('ab')
+                 .insert({'image': 'a.png'})
+                 .insert({'image': 'b.png'})
+                 .insert('cd'))
+        projection = delta.text_projection()
+
+        assert [projection.to_document(i) for i in range(5)] == [0, 1, 4, 5, 6]
+        assert projection.to_document(2, end=True) == 2
+        assert [projection.to_text(i) for i in range(7)] == [0, 1, 2, 2, 2, 3, 4]
+
+
+class TestFind:
+    def test_find_string(self):
+        delta = (Delta()
+                 .insert('one ')
+                 .insert({'image': 'a.png'})
+                 .insert('two one'))
+
+        assert delta.find('one') == [(0, 3), (9, 12)]
+        assert delta.find('one', start=1) == [(9, 12)]
+        assert delta.find('three') == []
+        assert delta.find('') == []
+
+    def test_find_across_embed(self):
+        delta = (Delta()
+                 .insert('ab')
+                 .insert({'image': 'a.png'})
+                 .insert('cd'))
+
+        assert delta.find('bc') == [(1, 4)]
+
+    def test_find_regex(self):
+        delta = (Delta()
+                 .insert('Hi ')
+                 .insert('@mario', {'bold': True})
+                 .insert({'image': 'a.png'})
+                 .insert(' and @cesar\n'))
+
+        assert delta.find(re.compile(r'@\w+')) == [(3, 9), (15, 21)]
@@ -0,0 +1,156 @@
+import pytest
+
+from quilldelta import Delta
+
+
+class TestTransform:
+    def test_insert_insert(self):
+        a = Delta().insert('A')
+        b = Delta().insert('B')
+
+        assert a.transform(b, True) == Delta().retain(1).insert('B')
+        assert a.transform(b, False) == Delta().insert('B')
+
+    def test_insert_retain(self):
+        a = Delta().insert('A')
+        b = Delta().retain(1, {'bold': True, 'color': 'red'})
+        expected = Delta().retain(1).retain(1, {'bold': True, 'color': 'red'})
+
+        assert a.transform(b, True) == expected
+
+    def test_insert_delete(self):
+        a = Delta().insert('A')
+        b = Delta().delete(1)
+
+        assert a.transform(b, True) == Delta().retain(1).delete(1)
+
+    def test_delete_insert(self):
+        a = Delta().delete(1)
+        b = Delta().insert('B')
+
+        assert a.transform(b, True) == Delta().insert('B')
+
+    def test_delete_retain(self):
+        a = Delta().delete(1)
+        b = Delta().retain(1, {'bold': True, 'color': 'red'})
+
+        assert a.transform(b, True) == Delta()
+
+    def test_delete_delete(self):
+        a = Delta().delete(1)
+        b = Delta().delete(1)
+
+        assert a.transform(b, True) == Delta()
+
+    def test_retain_retain(self):
+        a = Delta().retain(1, {'color': 'blue'})
+        b = Delta().retain(1, {'bold': True, 'color': 'red'})
+
+        assert a.transform(b, True) == Delta().retain(1, {'bold': True})
+        assert b.transform(a, True) == Delta()
+
+    def test_retain_retain_without_priority(self):
+        a = Delta().retain(1, {'color': 'blue'})
+        b = Delta().retain(1, {'bold': True, 'color': 'red'})
+
+        assert a.transform(b, False) == \
+            Delta().retain(1, {'bold': True, 'color': 'red'})
+        assert b.transform(a, False) == Delta().retain(1, {'color': 'blue'})
+
+    def test_alternating_edits(self):
+        a = Delta().retain(2).insert('si').delete(5)
+        b = Delta().retain(1).insert('e').delete(5).retain(1).insert('ow')
+
+        assert a.transform(b, False) == \
+            Delta().retain(1).insert('e').delete(1).retain(2).insert('ow')
+        assert b.transform(a, False) == \
+            Delta().retain(2).insert('si').delete(1)
+
+    def test_tail_of_other_is_copied(self):
+        a = Delta().retain(1).insert('A')
+        b = Delta().retain(3).insert('B', {'bold': True}).delete(2)
+
+        assert a.transform(b, True) == \
+            Delta().retain(4).insert('B', {'bold': True}).delete(2)
+
+    def test_does_not_mutate(self):
+        a1 = Delta().insert('A')
+        a2 = Delta().insert('A')
+        b1 = Delta().insert('B')
+        b2 = Delta().insert('B')
+
+        a1.transform(b1, True)
+
+        assert a1 == a2
+        assert b1 == b2
+
+
+class TestTransformPosition:
+    def test_insert_before_position(self):
+        assert Delta().insert('A').transform_position(2) == 3
+
+    def test_insert_after_position(self):
+        assert Delta().retain(2).insert('A').transform_position(1) == 1
+
+    def test_insert_at_position(self):
+        delta = Delta().retain(2).insert('A')
+
+        assert delta.transform_position(2, True) == 2
+        assert delta.transform_position(2, False) == 3
+
+    def test_delete_before_position(self):
+        assert Delta().delete(2).transform_position(4) == 2
+
+    def test_delete_after_position(self):
+        assert Delta().retain(4).delete(2).transform_position(2) == 2
+
+    def test_delete_across_position(self):
+        assert Delta().retain(1).delete(4).transform_position(2) == 1
+
+    def test_insert_and_delete_before_position(self):
+        delta = Delta().retain(2).insert('A').delete(2)
+
+        assert delta.transform_position(4) == 3
+
+    def test_insert_before_and_delete_across_position(self):
+        delta = Delta().retain(2).insert('ABC').delete(4)
+
+        assert delta.transform_position(4) == 5
+
+    def test_delete_before_and_delete_across_position(self):
+        delta = Delta().delete(1).retain(1).delete(4)
+
+        assert delta.transform_position(4) == 1
+
+    def test_transform_accepts_a_position(self):
+        assert Delta().insert('A').transform(2) == 3
+
+
+class TestTransformPositions:
+    delta = Delta().insert('AB').retain(2).delete(3).insert('C').retain(
+        1).insert('D')
+    positions = list(range(12))
+
+    def test_matches_transform_position(self):
+        for priority in (True, False):
+            expected = [self.delta.transform_position(position, priority)
+                        for position in self.positions]
+
+            assert self.delta.transform_positions(
+                self.positions, priority) == expected
+
+    def test_numpy_array(self):
+        numpy = pytest.importorskip('numpy')
+
+        for priority in (True, False):
+            expected = [self.delta.transform_position(position, priority)
+                        for position in self.positions]
+            result = self.delta.transform_positions(
+                numpy.array(self.positions), priority)
+
+            assert isinstance(result, numpy.ndarray)
+            assert result.tolist() == expected
+
+    def test_empty(self):
+        assert Delta().transform_positions([1, 2]) == [1, 2]
+        assert self.delta.transform_positions([]) == []
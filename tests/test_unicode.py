@@ -0,0 +1,176 @@
+import threading
+
+import pytest
+
+from quilldelta import Delta, FrozenDelta, Insert
+from quilldelta.operations import OperationsIterator
+from quilldelta.unicode import (CODE_POINTS, UTF16, astral_index,
+                                get_length_unit, length_unit, set_length_unit,
+                                slice_text, text_length, to_code_points,
+                                to_units, TextView)
+
+
+@pytest.fixture
+def utf16():
+    with length_unit(UTF16):
+        yield
+
+
+def test_astral_index():
+    assert astral_index('abc') == ()
+    assert astral_index('a😀b😀') == (1, 4)
+
+
+def test_length_unit_context():
+    assert get_length_unit() == CODE_POINTS
+
+    with length_unit(UTF16):
+        assert get_length_unit() == UTF16
+
+    assert get_length_unit() == CODE_POINTS
+
+    with pytest.raises(ValueError):
+        set_length_unit('bytes')
+
+
+def test_length_unit_is_per_thread():
+    seen = []
+
+    with length_unit(UTF16):
+        thread = threading.Thread(
+            target=lambda: seen.append(get_length_unit()))
+        thread.start()
+        thread.join()
+
+        assert get_length_unit() == UTF16
+
+    assert seen == [CODE_POINTS]
+
+
+def test_explicit_unit():
+    assert text_length('a😀', UTF16) == 3
+    assert to_units('a😀b', 2, UTF16) == 3
+    assert slice_text('a😀b', 3, unit=UTF16) == 'b'
+
+    with length_unit(UTF16):
+        assert text_length('a😀', CODE_POINTS) == 2
+
+
+def test_frozen_length_follows_unit():
+    delta = FrozenDelta(Delta().insert('a😀'))
+
+    assert delta.length() == 2
+
+    with length_unit(UTF16):
+        assert delta.length() == 3
+
+    assert delta.length() == 2
+
+
+def test_insert_length():
+    op = Insert('a😀b', None)
+
+    assert op.length == 3
+
+    with length_unit(UTF16):
+        assert op.length == 4
+
+
+def test_offset_conversion(utf16):
+    text = 'a😀b😀c'
+
+    assert [to_code_points(text, i) for i in range(8)] == \
+        [0, 1, 1, 2, 3, 3, 4, 5]
+    assert [to_units(text, i) for i in range(6)] == [0, 1, 3, 4, 6, 7]
+    assert slice_text(text, 1, 3) == '😀b'
+    assert slice_text(text, 4) == '😀c'
+
+
+def test_iterator_splits_on_units(utf16):
+    iterator = OperationsIterator(Delta().insert('😀ab😀').ops)
+
+    assert iterator.peek_length() == 6
+    assert iterator.next(2) == Insert('😀', None)
+    assert iterator.peek_length() == 4
+    assert iterator.next(1) == Insert('a', None)
+    assert iterator.next() == Insert('b😀', None)
+    assert not iterator.has_next()
+
+
+def test_compose_retain_after_emoji(utf16):
+    a = Delta().insert('😀Hello')
+    b = Delta().retain(4).insert('X')
+
+    assert a.compose(b) == Delta().insert('😀HeXllo')
+
+
+def test_compose_code_points():
+    a = Delta().insert('😀Hello')
+    b = Delta().retain(3).insert('X')
+
+    assert a.compose(b) == Delta().insert('😀HeXllo')
+
+
+def test_slice(utf16):
+    delta = Delta().insert('😀Hello', {'bold': True}).insert('😀')
+
+    assert delta.length() == 9
+    assert delta.slice(2, 4) == Delta().insert('He', {'bold': True})
+    assert delta.slice(6) == Delta().insert('o', {'bold': True}).insert('😀')
+
+
+def test_find(utf16):
+    delta = Delta().insert('😀 hi ').insert({'image': 'a.png'}).insert('😀 hi')
+
+    assert delta.find('hi') == [(3, 5), (10, 12)]
+    assert delta.text_projection().to_text(10) == 7
+
+
+class TestTextView:
+    def test_partial_reads_share_the_text(self):
+        text = 'Hello World'
+        iterator = OperationsIterator(Delta().insert(text).ops)
+
+        first = iterator.next(5).value
+        rest = iterator.next().value
+
+        assert isinstance(first, TextView)
+        assert first.base is text and rest.base is text
+        assert (first.start, first.end, rest.start, rest.end) == (0, 5, 5, 11)
+        assert str(first) == 'Hello' and rest == ' World'
+
+    def test_contiguous_views_merge_without_copy(self):
+        text = 'Hello World'
+        merged = TextView(text, 0, 5) + TextView(text, 5, 11)
+
+        assert isinstance(merged, TextView)
+        assert str(merged) is text
+        assert TextView(text, 0, 2) + TextView(text, 6, 8) == 'HeWo'
+        assert 'a' + TextView(text, 0, 1) == 'aH'
+
+    def test_views_are_materialized_on_push(self):
+        delta = Delta()
+        delta.push(Insert(TextView('Hello World', 6), None))
+
+        assert type(delta.ops[0].value) is str
+        assert delta.ops[0] == Insert('World', None)
+
+    def test_serialization(self):
+        op = Insert(TextView('Hello World', 6), {'bold': True})
+
+        assert op.length == 5
+        assert op.as_json() == '{"insert": "World", "attributes": {"bold": true}}'
+
+    def test_units(self, utf16):
+        view = TextView('a😀b😀c').slice(1, 4)
+
+        assert str(view) == '😀b'
+        assert view.units() == 3
+        assert str(view.slice(2)) == 'b'
+
+    def test_slices_share_the_astral_index(self, utf16):
+        view = TextView('😀' * 1000)
+        index = view.astral_index()
+
+        assert view.slice(10, 20).astral_index() is index
+        assert view.slice(10).slice(2).units() == 1988
@@ -0,0 +1,142 @@
+import pytest
+
+from quilldelta import Delete, Delta, Insert, Retain
+from quilldelta.validation import (Limits, ValidationError, normalize,
+                                   validate)
+
+
+class TestValidate:
+    def test_merges_adjacent_operations(self):
+        delta = Delta.validate_and_normalize([
+            {'insert': 'Hello'},
+            {'insert': ' World'},
+            {'insert': '!', 'attributes': {'bold': True}},
+            {'retain': 2},
+            {'retain': 3, 'attributes': {}},
+            {'delete': 1},
+            {'delete': 2},
+        ])
+
+        assert delta.ops == [Insert('Hello World', None),
+                             Insert('!', {'bold': True}),
+                             Retain(5, None),
+                             Delete(3)]
+
+    def test_matches_push(self):
+        data = [{'insert': 'A'}, {'delete': 1}, {'insert': 'B'},
+                {'insert': {'image': 'a.png'}}, {'retain': 0},
+                {'insert': ''}, {'delete': 1}]
+        expected = Delta()
+
+        for op in data:
+            if op.get('insert') != '' and op.get('retain') != 0:
+                expected.push(op)
+
+        assert Delta.validate_and_normalize(data) == expected
+
+    def test_ops_form(self):
+        delta = Delta.validate_and_normalize({'ops': [{'insert': 'A'}]})
+
+        assert delta == Delta().insert('A')
+
+    def test_does_not_mutate_input(self):
+        data = [{'insert': 'A', 'attributes': {'bold': True}}]
+
+        delta = Delta.validate_and_normalize(data)
+        delta.ops[0].attributes['italic'] = True
+
+        assert data == [{'insert': 'A', 'attributes': {'bold': True}}]
+
+    @pytest.mark.parametrize('data', [
+        [{'retain': -1}],
+        [{'retain': 1.5}],
+        [{'retain': True}],
+        [{'delete': '1'}],
+        [{'insert': None}],
+        [{'insert': {}}],
+        [{'insert': 'A', 'bold': True}],
+        [{'insert': 'A', 'retain': 1}],
+        [{'attributes': {'bold': True}}],
+        [{'delete': 1, 'attributes': {'bold': True}}],
+        [{'insert': 'A', 'attributes': ['bold']}],
+        [{'insert': 'A', 'attributes': {'bold': object()}}],
+        ['insert'],
+        'insert',
+        {'insert': 'A'},
+    ])
+    def test_rejects_malformed(self, data):
+        with pytest.raises(ValidationError):
+            Delta.validate_and_normalize(data)
+
+    def test_error_has_index(self):
+        with pytest.raises(ValidationError) as error:
+            validate([{'insert': 'A'}, {'retain': -1}])
+
+        assert error.value.index == 1
+        assert str(error.value).startswith('ops[1]: ')
+
+    def test_limits(self):
+        limits = Limits(max_ops=3, max_text=5, max_length=10,
+                        max_attributes=1, max_attribute_length=4,
+                        allowed_attributes={'bold', 'link'})
+
+        assert validate([{'insert': 'Hello'}], limits) == \
+            [Insert('Hello', None)]
+
+        for data in ([{'retain': 1}] * 4,
+                     [{'insert': 'Hello!'}],
+                     [{'retain': 5}, {'delete': 6}],
+                     [{'insert': 'A', 'attributes': {'bold': True,
+                                                     'link': 'a'}}],
+                     [{'insert': 'A', 'attributes': {'link': 'https://'}}],
+                     [{'insert': 'A', 'attributes': {'italic': True}}]):
+            with pytest.raises(ValidationError):
+                validate(data, limits)
+
+    def test_nested_attribute_length(self):
+        limits = Limits(max_attribute_length=16)
+        nested = []
+        for _ in range(10_000):
+            nested = [nested]
+
+        assert validate([{'insert': 'A', 'attributes': {
+            'mention': {'id': 1, 'name': 'ab'}}}], limits)
+
+        for value in (['a' * 17], {'name': 'a' * 13},
+                      list(range(1_000_000)), nested):
+            with pytest.raises(ValidationError, match='longer than 16'):
+                validate([{'insert': 'A', 'attributes': {'a': value}}],
+                         limits)
+
+    def test_embed_size(self):
+        limits = Limits(max_text=100, max_embed_size=100)
+
+        assert validate([{'insert': {'image': 'a' * 40}},
+                         {'insert': {'image': 'b' * 40}}], limits)
+
+        for data in ([{'insert': {'image': 'x' * 5_000_000}}],
+                     [{'insert': {'table': list(range(10 ** 6))}}],
+                     [{'insert': {'image': 'a' * 60}},
+                      {'insert': {'image': 'b' * 60}}]):
+            with pytest.raises(ValidationError, match='size limit of 100'):
+                validate(data, limits)
+
+    def test_embed_has_one_type(self):
+        with pytest.raises(ValidationError, match='exactly one type'):
+            validate([{'insert': {'image': 'a.png', 'video': 'a.mp4'}}])
+
+        with pytest.raises(ValidationError, match='exactly one type'):
+            validate([{'retain': {'delta': [], 'table': {}}}])
+
+    def test_limits_are_reusable_keys(self):
+        assert Limits(max_ops=1) == Limits(max_ops=1)
+        assert hash(Limits(allowed_attributes=['bold'])) == \
+            hash(Limits(allowed_attributes={'bold'}))
+
+
+def test_normalize():
+    ops = [Insert('A', None), Insert('', None), Insert('B', None),
+           Retain(0, None), Delete(1), Insert('C', {}), Retain(2, None),
+           Retain(3, None)]
+
+    assert normalize(ops) == [Insert('ABC', None), Delete(1), Retain(5, None)]